@@ -0,0 +1,362 @@
+# @version 0.3.1
+# @notice Rewards manager for several Balancer Liquidity Gauges sharing one reward token.
+# @license MIT
+
+from vyper.interfaces import ERC20
+
+
+struct BalancerReward:
+    token: address
+    distributor: address
+    period_finish: uint256
+    rate: uint256
+    last_update: uint256
+    integral: uint256
+
+
+struct GaugeRewards:
+    # weekly_amount * WEEKS_PER_PERIOD + rewards_iteration, kept in one slot
+    rewards_state: uint256
+    min_rewards_amount: uint256
+    budget: uint256
+    is_enabled: bool
+
+
+interface BalancerLiquidityGauge:
+    def reward_data(addr: address) -> BalancerReward: view
+    def deposit_reward_token(_reward_token: address, _amount: uint256): nonpayable
+    def set_reward_distributor(_reward_token: address, _distributor: address): nonpayable
+
+
+event GaugeAdded:
+    gauge: indexed(address)
+    minRewardsAmount: uint256
+
+
+event GaugeRemoved:
+    gauge: indexed(address)
+
+
+event RewardsAllocated:
+    gauge: indexed(address)
+    amount: uint256
+
+
+event RewardsContractTransferred:
+    gauge: indexed(address)
+    newDistributor: indexed(address)
+
+
+event WeeklyRewardsAmountUpdated:
+    gauge: indexed(address)
+    newWeeklyRewardsAmount: uint256
+
+
+event NewRewardsPeriodStarted:
+    gauge: indexed(address)
+    amount: uint256
+
+
+event ERC20Recovered:
+    token: indexed(address)
+    amount: uint256
+    recipient: indexed(address)
+
+
+gauges: public(HashMap[address, GaugeRewards])
+total_allocated: public(uint256)
+reward_token: immutable(address)
+owner: immutable(address)
+MAX_GAUGES: constant(uint256) = 16
+SECONDS_PER_WEEK: constant(uint256) = 7 * 24 * 60 * 60
+WEEKS_PER_PERIOD: constant(uint256) = 4
+
+# Codes of the checks that make a period start fail, same as RewardsManager.status()
+STATUS_OK: constant(uint256) = 0
+STATUS_REWARDS_DISABLED: constant(uint256) = 1
+STATUS_PERIOD_NOT_FINISHED: constant(uint256) = 2
+STATUS_LOW_BALANCE: constant(uint256) = 3
+
+
+@external
+def __init__(_owner: address, _reward_token: address):
+    owner = _owner
+    reward_token = _reward_token
+
+
+@view
+@external
+def owner() -> address:
+    return owner
+
+
+@view
+@external
+def reward_token() -> address:
+    return reward_token
+
+
+@view
+@external
+def weekly_amount(_gauge: address) -> uint256:
+    return self.gauges[_gauge].rewards_state / WEEKS_PER_PERIOD
+
+
+@view
+@external
+def rewards_iteration(_gauge: address) -> uint256:
+    return self.gauges[_gauge].rewards_state % WEEKS_PER_PERIOD
+
+
+@view
+@external
+def unallocated_balance() -> uint256:
+    """
+    @notice Returns the reward token balance not allocated to any gauge.
+    """
+    return ERC20(reward_token).balanceOf(self) - self.total_allocated
+
+
+@internal
+def _set_allowance(_spender: address, _amount: uint256):
+    # LDO (MiniMe) only allows changing a non-zero allowance via zero
+    if ERC20(reward_token).allowance(self, _spender) != 0:
+        ERC20(reward_token).approve(_spender, 0)
+    if _amount != 0:
+        ERC20(reward_token).approve(_spender, _amount)
+
+
+@view
+@internal
+def _balancer_period_finish(_gauge: address) -> uint256:
+    reward_data: BalancerReward = BalancerLiquidityGauge(_gauge).reward_data(reward_token)
+    return reward_data.period_finish
+
+
+@view
+@external
+def balancer_period_finish(_gauge: address) -> uint256:
+    """
+    @notice Returns end of the rewards period of the gauge
+    """
+    return self._balancer_period_finish(_gauge)
+
+
+@view
+@internal
+def _period_finish(_gauge: address) -> uint256:
+    return self._balancer_period_finish(_gauge) + \
+        ((WEEKS_PER_PERIOD - self.gauges[_gauge].rewards_state % WEEKS_PER_PERIOD) % WEEKS_PER_PERIOD) * SECONDS_PER_WEEK
+
+
+@view
+@external
+def period_finish(_gauge: address) -> uint256:
+    """
+    @notice Returns estimated end of the rewards period of the gauge funded by the current allocation
+    """
+    return self._period_finish(_gauge)
+
+
+@view
+@external
+def is_rewards_period_finished(_gauge: address) -> bool:
+    """
+    @notice Whether the current rewards period of the gauge has finished.
+    """
+    return block.timestamp >= self._period_finish(_gauge)
+
+
+@internal
+def _start_next_rewards_period(_gauge: address) -> (uint256, uint256):
+    """
+    @notice
+        Starts the next rewards period of the gauge if possible. Returns the STATUS_* code
+        and the amount deposited. `total_allocated` is left for the caller to update.
+    """
+    if not self.gauges[_gauge].is_enabled:
+        return (STATUS_REWARDS_DISABLED, 0)
+    if block.timestamp < self._balancer_period_finish(_gauge):
+        return (STATUS_PERIOD_NOT_FINISHED, 0)
+
+    rewards_state: uint256 = self.gauges[_gauge].rewards_state
+    budget: uint256 = self.gauges[_gauge].budget
+    iteration: uint256 = rewards_state % WEEKS_PER_PERIOD
+    rewards_amount: uint256 = 0
+
+    if iteration == 0:
+        if budget < self.gauges[_gauge].min_rewards_amount:
+            return (STATUS_LOW_BALANCE, 0)
+        rewards_amount = budget / WEEKS_PER_PERIOD
+    else:
+        rewards_amount = rewards_state / WEEKS_PER_PERIOD
+
+    if rewards_amount == 0:
+        return (STATUS_REWARDS_DISABLED, 0)
+    if budget < rewards_amount:
+        return (STATUS_LOW_BALANCE, 0)
+
+    if iteration == 0:
+        log WeeklyRewardsAmountUpdated(_gauge, rewards_amount)
+
+    self.gauges[_gauge].rewards_state = rewards_amount * WEEKS_PER_PERIOD + (iteration + 1) % WEEKS_PER_PERIOD
+    self.gauges[_gauge].budget = budget - rewards_amount
+
+    if ERC20(reward_token).allowance(self, _gauge) < rewards_amount:
+        self._set_allowance(_gauge, MAX_UINT256)
+    BalancerLiquidityGauge(_gauge).deposit_reward_token(reward_token, rewards_amount)
+
+    log NewRewardsPeriodStarted(_gauge, rewards_amount)
+    return (STATUS_OK, rewards_amount)
+
+
+@external
+def start_next_rewards_period(_gauge: address):
+    """
+    @notice
+        Starts the next rewards period of the gauge, the same way RewardsManager does
+        for its rewards contract, reverting if it can't be started.
+    """
+    status: uint256 = 0
+    amount: uint256 = 0
+    status, amount = self._start_next_rewards_period(_gauge)
+
+    assert status != STATUS_REWARDS_DISABLED, "manager: rewards disabled"
+    assert status != STATUS_PERIOD_NOT_FINISHED, "manager: rewards period not finished"
+    assert status != STATUS_LOW_BALANCE, "manager: low balance"
+
+    self.total_allocated -= amount
+
+
+@external
+def start_next_rewards_periods(_gauges: address[MAX_GAUGES]) -> uint256:
+    """
+    @notice
+        Starts the next rewards period of every gauge in the list that can be started now,
+        skipping the others instead of reverting. The list ends at the first zero address.
+        Returns the number of started periods.
+    """
+    started: uint256 = 0
+    deposited: uint256 = 0
+
+    for gauge in _gauges:
+        if gauge == ZERO_ADDRESS:
+            break
+
+        status: uint256 = 0
+        amount: uint256 = 0
+        status, amount = self._start_next_rewards_period(gauge)
+
+        if status == STATUS_OK:
+            started += 1
+            deposited += amount
+
+    if deposited != 0:
+        self.total_allocated -= deposited
+
+    return started
+
+
+@external
+def add_gauge(_gauge: address, _min_rewards_amount: uint256):
+    """
+    @notice Enables the gauge. Can only be called by the owner.
+    """
+    assert msg.sender == owner, "not permitted"
+    assert _gauge != ZERO_ADDRESS, "zero address not allowed"
+    assert not self.gauges[_gauge].is_enabled, "gauge already added"
+
+    self.gauges[_gauge].min_rewards_amount = _min_rewards_amount
+    self.gauges[_gauge].is_enabled = True
+
+    log GaugeAdded(_gauge, _min_rewards_amount)
+
+
+@internal
+def _remove_gauge(_gauge: address):
+    assert self.gauges[_gauge].is_enabled, "gauge not added"
+
+    self.total_allocated -= self.gauges[_gauge].budget
+    self.gauges[_gauge] = empty(GaugeRewards)
+    self._set_allowance(_gauge, 0)
+
+    log GaugeRemoved(_gauge)
+
+
+@external
+def remove_gauge(_gauge: address):
+    """
+    @notice
+        Disables the gauge, returning its budget to the unallocated balance
+        and revoking its allowance. Can only be called by the owner.
+    """
+    assert msg.sender == owner, "not permitted"
+    self._remove_gauge(_gauge)
+
+
+@external
+def allocate(_gauge: address, _amount: uint256):
+    """
+    @notice
+        Adds `_amount` of the unallocated reward token balance to the gauge budget.
+        Can only be called by the owner.
+    """
+    assert msg.sender == owner, "not permitted"
+    assert self.gauges[_gauge].is_enabled, "gauge not added"
+
+    total_allocated: uint256 = self.total_allocated + _amount
+    assert total_allocated <= ERC20(reward_token).balanceOf(self), "manager: low balance"
+
+    self.total_allocated = total_allocated
+    self.gauges[_gauge].budget += _amount
+
+    log RewardsAllocated(_gauge, _amount)
+
+
+@external
+def replace_me_by_other_distributor(_gauge: address, _to: address):
+    """
+    @notice
+        Changes the gauge rewards distributor and removes the gauge, as `remove_gauge`
+        does, so batches listing it skip it. Can only be called by the owner.
+    """
+    assert msg.sender == owner, "not permitted"
+    assert _to != ZERO_ADDRESS, "zero address not allowed"
+    self._remove_gauge(_gauge)
+    BalancerLiquidityGauge(_gauge).set_reward_distributor(reward_token, _to)
+
+    log RewardsContractTransferred(_gauge, _to)
+
+
+@internal
+def _safe_transfer(_token: address, _to: address, _value: uint256) -> bool:
+    _response: Bytes[32] = raw_call(
+        _token,
+        concat(
+            method_id("transfer(address,uint256)"),
+            convert(_to, bytes32),
+            convert(_value, bytes32)
+        ),
+        max_outsize=32
+    )
+    if len(_response) > 0:
+        assert convert(_response, bool), "Transfer failed!"
+
+    return True
+
+
+@external
+def recover_erc20(_token: address, _amount: uint256, _recipient: address = msg.sender):
+    """
+    @notice
+        Transfers the given _amount of the given ERC20 token from self
+        to the recipient. Allocated reward tokens can't be recovered.
+        Can only be called by the owner.
+    """
+    assert msg.sender == owner, "not permitted"
+    assert _recipient != ZERO_ADDRESS, "zero address not allowed"
+    if _token == reward_token:
+        assert ERC20(reward_token).balanceOf(self) - self.total_allocated >= _amount, "manager: allocated balance"
+    if _amount != 0:
+        self._safe_transfer(_token, _recipient, _amount)
+        log ERC20Recovered(_token, _amount, _recipient)
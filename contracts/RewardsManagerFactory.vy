@@ -0,0 +1,109 @@
+# @version 0.3.1
+# @notice Deploys RewardsManager instances as EIP-1167 minimal proxies.
+# @license MIT
+
+
+interface RewardsManagerImplementation:
+    def initialize(
+        _owner: address,
+        _min_rewards_amount: uint256,
+        _rewards_contract: address
+    ): nonpayable
+
+
+event RewardsManagerDeployed:
+    manager: indexed(address)
+    owner: indexed(address)
+    rewardsContract: address
+    minRewardsAmount: uint256
+
+
+implementation: immutable(address)
+MAX_BATCH_SIZE: constant(uint256) = 32
+
+
+@external
+def __init__(_implementation: address):
+    implementation = _implementation
+
+
+@view
+@external
+def implementation() -> address:
+    return implementation
+
+
+@internal
+def _initialize(
+    _manager: address,
+    _owner: address,
+    _min_rewards_amount: uint256,
+    _rewards_contract: address
+):
+    RewardsManagerImplementation(_manager).initialize(_owner, _min_rewards_amount, _rewards_contract)
+
+    log RewardsManagerDeployed(_manager, _owner, _rewards_contract, _min_rewards_amount)
+
+
+@external
+def deploy_manager(
+    _owner: address,
+    _min_rewards_amount: uint256,
+    _rewards_contract: address
+) -> address:
+    """
+    @notice Deploys and initializes a new manager proxy.
+    """
+    manager: address = create_forwarder_to(implementation)
+    self._initialize(manager, _owner, _min_rewards_amount, _rewards_contract)
+    return manager
+
+
+@external
+def deploy_manager_deterministic(
+    _owner: address,
+    _min_rewards_amount: uint256,
+    _rewards_contract: address,
+    _salt: bytes32
+) -> address:
+    """
+    @notice
+        Deploys and initializes a new manager proxy with CREATE2. The salt is derived
+        from the manager parameters and `_salt`, so the predicted address can only be
+        taken by a manager initialized with these parameters.
+    """
+    salt: bytes32 = keccak256(
+        concat(
+            convert(_owner, bytes32),
+            convert(_min_rewards_amount, bytes32),
+            convert(_rewards_contract, bytes32),
+            _salt
+        )
+    )
+    manager: address = create_forwarder_to(implementation, salt=salt)
+    self._initialize(manager, _owner, _min_rewards_amount, _rewards_contract)
+    return manager
+
+
+@external
+def deploy_managers(
+    _owner: address,
+    _min_rewards_amount: uint256,
+    _rewards_contracts: address[MAX_BATCH_SIZE]
+) -> uint256:
+    """
+    @notice
+        Deploys a manager proxy for every rewards contract in the list, which ends
+        at the first zero address. Returns the number of deployed managers.
+    """
+    deployed: uint256 = 0
+
+    for rewards_contract in _rewards_contracts:
+        if rewards_contract == ZERO_ADDRESS:
+            break
+
+        manager: address = create_forwarder_to(implementation)
+        self._initialize(manager, _owner, _min_rewards_amount, rewards_contract)
+        deployed += 1
+
+    return deployed
@@ -0,0 +1,361 @@
+# @version 0.3.1
+# @notice
+#   Initializable RewardsManager to be used as an EIP-1167 minimal proxy
+#   implementation by RewardsManagerFactory. Behaves the same as RewardsManager.
+# @author bulbozaur <info@lido.fi>
+# @license MIT
+
+from vyper.interfaces import ERC20
+
+
+struct BalancerReward:
+    token: address
+    distributor: address
+    period_finish: uint256
+    rate: uint256
+    last_update: uint256
+    integral: uint256
+
+
+struct ManagerStatus:
+    rewards_contract: address
+    weekly_amount: uint256
+    rewards_iteration: uint256
+    min_rewards_amount: uint256
+    ldo_balance: uint256
+    balancer_period_finish: uint256
+    period_finish: uint256
+    is_balancer_rewards_period_finished: bool
+    is_rewards_period_finished: bool
+    can_start: bool
+    reason: uint256
+
+
+interface BalancerLiquidityGauge:
+    def reward_data(addr: address) -> BalancerReward: view
+    def deposit_reward_token(_reward_token: address, _amount: uint256): nonpayable
+    def set_reward_distributor(_reward_token: address, _distributor: address): nonpayable
+
+
+event RewardsContractUpdated:
+    newRewardsContract: indexed(address)
+
+
+event RewardsContractTransferred:
+    newDistributor: indexed(address)
+
+
+event WeeklyRewardsAmountUpdated:
+    newWeeklyRewardsAmount: uint256
+
+
+event NewRewardsPeriodStarted:
+    amount: uint256
+
+
+event ERC20Recovered:
+    token: indexed(address)
+    amount: uint256
+    recipient: indexed(address)
+
+
+rewards_contract: public(address)
+# weekly_amount * WEEKS_PER_PERIOD + rewards_iteration, kept in one slot
+rewards_state: uint256
+min_rewards_amount: uint256
+owner: public(address)
+LDO_TOKEN: constant(address) = 0x5A98FcBEA516Cf06857215779Fd812CA3beF1B32
+SECONDS_PER_WEEK: constant(uint256) = 7 * 24 * 60 * 60
+WEEKS_PER_PERIOD: constant(uint256) = 4
+
+# ManagerStatus.reason codes, the reverts start_next_rewards_period would hit
+STATUS_OK: constant(uint256) = 0
+STATUS_REWARDS_DISABLED: constant(uint256) = 1
+STATUS_PERIOD_NOT_FINISHED: constant(uint256) = 2
+STATUS_LOW_BALANCE: constant(uint256) = 3
+
+MAX_RECOVER_ITEMS: constant(uint256) = 16
+
+
+@external
+def __init__():
+    # the implementation itself can never be initialized
+    self.owner = self
+
+
+@external
+def initialize(
+    _owner: address, 
+    _min_rewards_amount: uint256, 
+    _rewards_contract: address
+):
+    assert self.owner == ZERO_ADDRESS, "already initialized"
+    assert _owner != ZERO_ADDRESS, "zero address not allowed"
+    self.owner = _owner
+    self.min_rewards_amount = _min_rewards_amount
+    self.rewards_contract = _rewards_contract
+
+    log RewardsContractUpdated(_rewards_contract)
+
+
+@view
+@external
+def weekly_amount() -> uint256:
+    return self.rewards_state / WEEKS_PER_PERIOD
+
+
+@view
+@external
+def rewards_iteration() -> uint256:
+    return self.rewards_state % WEEKS_PER_PERIOD
+
+
+@internal
+def _set_allowance(_spender: address, _amount: uint256):
+    # LDO (MiniMe) only allows changing a non-zero allowance via zero
+    if ERC20(LDO_TOKEN).allowance(self, _spender) != 0:
+        ERC20(LDO_TOKEN).approve(_spender, 0)
+    if _amount != 0:
+        ERC20(LDO_TOKEN).approve(_spender, _amount)
+
+
+@view
+@internal
+def _balancer_period_finish(rewards_contract: address) -> uint256:
+    reward_data: BalancerReward = BalancerLiquidityGauge(rewards_contract).reward_data(LDO_TOKEN)
+    return reward_data.period_finish
+
+
+@view
+@internal
+def _is_balancer_rewards_period_finished(rewards_contract: address) -> bool:
+    return block.timestamp >= self._balancer_period_finish(rewards_contract)
+
+
+@view
+@external
+def is_balancer_rewards_period_finished() -> bool:
+    """
+    @notice Whether the current rewards period has finished.
+    """
+    return self._is_balancer_rewards_period_finished(self.rewards_contract)
+
+
+@view
+@external
+def balancer_period_finish() -> uint256:
+    """
+    @notice Returns end of the rewards period of BalancerLiquidityGauge contract
+    """
+    return self._balancer_period_finish(self.rewards_contract)
+
+
+@external
+def start_next_rewards_period():
+    """
+    @notice
+        Starts the next rewards period of duration `rewards_contract.deposit_reward_token(address, uint256)`,
+        distributing `self.weekly_amount` tokens throughout each week of the period. The current
+        rewards period must be finished by this time and LDO balance not lower then `self.weekly_amount`.
+        Ones per 4 calls recalculates `self.weekly_amount` based on self LDO balance. Balance required 
+        not to be lower then `min_rewards_amount`. The rewards contract keeps a standing LDO allowance,
+        so it is only approved when the allowance runs out or the rewards contract changes.
+    """
+    rewards_contract: address = self.rewards_contract
+    amount: uint256 = ERC20(LDO_TOKEN).balanceOf(self)
+    rewards_state: uint256 = self.rewards_state
+    iteration: uint256 = rewards_state % WEEKS_PER_PERIOD
+    rewards_amount: uint256 = 0
+
+    assert rewards_contract != ZERO_ADDRESS, "manager: rewards disabled"
+    assert self._is_balancer_rewards_period_finished(rewards_contract), "manager: rewards period not finished"
+
+    if iteration == 0:
+        assert amount >= self.min_rewards_amount, "manager: low balance"
+        
+        rewards_amount = amount / WEEKS_PER_PERIOD
+
+        log WeeklyRewardsAmountUpdated(rewards_amount)
+    else:
+        rewards_amount = rewards_state / WEEKS_PER_PERIOD
+
+    assert rewards_amount > 0, "manager: rewards disabled"
+    assert amount >= rewards_amount, "manager: low balance"
+
+    self.rewards_state = rewards_amount * WEEKS_PER_PERIOD + (iteration + 1) % WEEKS_PER_PERIOD
+
+    if ERC20(LDO_TOKEN).allowance(self, rewards_contract) < rewards_amount:
+        self._set_allowance(rewards_contract, MAX_UINT256)
+    BalancerLiquidityGauge(rewards_contract).deposit_reward_token(LDO_TOKEN, rewards_amount)
+
+    log NewRewardsPeriodStarted(rewards_amount)
+
+
+@view
+@internal
+def _period_finish() -> uint256:
+    return self._balancer_period_finish(self.rewards_contract) + \
+        ((WEEKS_PER_PERIOD - self.rewards_state % WEEKS_PER_PERIOD) % WEEKS_PER_PERIOD) * SECONDS_PER_WEEK
+
+
+@view
+@external
+def period_finish() -> uint256:
+    """
+    @notice Returns end of the rewards period of BalancerLiquidityGauge contract
+    """
+    return self._period_finish()
+
+
+@view
+@external
+def is_rewards_period_finished() -> bool:
+    """
+    @notice Whether the current rewards period has finished.
+    """
+    return block.timestamp >= self._period_finish()
+
+
+@view
+@external
+def status() -> ManagerStatus:
+    """
+    @notice
+        Returns the manager state together with whether `start_next_rewards_period`
+        can be called now, reading `reward_data` of the rewards contract once.
+        `reason` is the STATUS_* code of the check that would make the call revert.
+    """
+    rewards_contract: address = self.rewards_contract
+    rewards_state: uint256 = self.rewards_state
+    iteration: uint256 = rewards_state % WEEKS_PER_PERIOD
+    weekly_amount: uint256 = rewards_state / WEEKS_PER_PERIOD
+    amount: uint256 = ERC20(LDO_TOKEN).balanceOf(self)
+
+    balancer_period_finish: uint256 = 0
+    period_finish: uint256 = 0
+    if rewards_contract != ZERO_ADDRESS:
+        balancer_period_finish = self._balancer_period_finish(rewards_contract)
+        period_finish = balancer_period_finish + \
+            ((WEEKS_PER_PERIOD - iteration) % WEEKS_PER_PERIOD) * SECONDS_PER_WEEK
+
+    rewards_amount: uint256 = weekly_amount
+    if iteration == 0:
+        rewards_amount = amount / WEEKS_PER_PERIOD
+
+    reason: uint256 = STATUS_OK
+    if rewards_contract == ZERO_ADDRESS:
+        reason = STATUS_REWARDS_DISABLED
+    elif block.timestamp < balancer_period_finish:
+        reason = STATUS_PERIOD_NOT_FINISHED
+    elif iteration == 0 and amount < self.min_rewards_amount:
+        reason = STATUS_LOW_BALANCE
+    elif rewards_amount == 0:
+        reason = STATUS_REWARDS_DISABLED
+    elif amount < rewards_amount:
+        reason = STATUS_LOW_BALANCE
+
+    return ManagerStatus({
+        rewards_contract: rewards_contract,
+        weekly_amount: weekly_amount,
+        rewards_iteration: iteration,
+        min_rewards_amount: self.min_rewards_amount,
+        ldo_balance: amount,
+        balancer_period_finish: balancer_period_finish,
+        period_finish: period_finish,
+        is_balancer_rewards_period_finished: block.timestamp >= balancer_period_finish,
+        is_rewards_period_finished: block.timestamp >= period_finish,
+        can_start: reason == STATUS_OK,
+        reason: reason
+    })
+    
+
+
+@external
+def replace_me_by_other_distributor(_to: address):
+    """
+    @notice Changes the reward contracts distributor. Can only be called by the current owner.
+    """
+    assert msg.sender == self.owner, "not permitted"
+    assert _to != ZERO_ADDRESS, "zero address not allowed"
+    rewards_contract: address = self.rewards_contract
+    BalancerLiquidityGauge(rewards_contract).set_reward_distributor(LDO_TOKEN, _to)
+    self._set_allowance(rewards_contract, 0)
+
+    log RewardsContractTransferred(_to)
+
+
+@external
+def set_rewards_contract(_rewards_contract: address):
+    """
+    @notice Sets the rewards contract. Can only be called by the owner.
+    """
+    assert msg.sender == self.owner, "not permitted"
+    self._set_allowance(self.rewards_contract, 0)
+    self.rewards_contract = _rewards_contract
+
+    log RewardsContractUpdated(_rewards_contract)
+
+
+@internal
+def _safe_transfer(_token: address, _to: address, _value: uint256) -> bool:
+    _response: Bytes[32] = raw_call(
+        _token,
+        concat(
+            method_id("transfer(address,uint256)"),
+            convert(_to, bytes32),
+            convert(_value, bytes32)
+        ),
+        max_outsize=32
+    )
+    if len(_response) > 0:
+        assert convert(_response, bool), "Transfer failed!"
+
+    return True
+
+
+@external
+def recover_erc20(_token: address, _amount: uint256, _recipient: address = msg.sender):
+    """
+    @notice
+        Transfers the given _amount of the given ERC20 token from self
+        to the recipient. Can only be called by the owner.
+    """
+    assert msg.sender == self.owner, "not permitted"
+    assert _recipient != ZERO_ADDRESS, "zero address not allowed"
+    if _amount != 0:
+        self._safe_transfer(_token, _recipient, _amount)
+        log ERC20Recovered(_token, _amount, _recipient)
+
+
+@external
+def recover_erc20_batch(
+    _tokens: address[MAX_RECOVER_ITEMS],
+    _amounts: uint256[MAX_RECOVER_ITEMS],
+    _recipients: address[MAX_RECOVER_ITEMS]
+) -> uint256:
+    """
+    @notice
+        Transfers _amounts[i] of _tokens[i] from self to _recipients[i] for every item,
+        the list ends at the first zero token address. An amount of MAX_UINT256 transfers
+        the entire balance of the token. Returns the number of transfers made.
+        Can only be called by the owner.
+    """
+    assert msg.sender == self.owner, "not permitted"
+    transfers: uint256 = 0
+
+    for i in range(MAX_RECOVER_ITEMS):
+        token: address = _tokens[i]
+        if token == ZERO_ADDRESS:
+            break
+        recipient: address = _recipients[i]
+        assert recipient != ZERO_ADDRESS, "zero address not allowed"
+
+        amount: uint256 = _amounts[i]
+        if amount == MAX_UINT256:
+            amount = ERC20(token).balanceOf(self)
+        if amount != 0:
+            self._safe_transfer(token, recipient, amount)
+            log ERC20Recovered(token, amount, recipient)
+            transfers += 1
+
+    return transfers
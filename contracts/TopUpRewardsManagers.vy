@@ -0,0 +1,216 @@
+# @version 0.3.1
+# @notice EasyTrack EVMScript factory topping up allow-listed rewards managers with LDO.
+# @license MIT
+
+
+event ManagerAdded:
+    manager: indexed(address)
+
+
+event ManagerRemoved:
+    manager: indexed(address)
+
+
+event LimitUpdated:
+    limit: uint256
+    periodDuration: uint256
+
+
+event SpentAmountUpdated:
+    amount: uint256
+    spentInPeriod: uint256
+
+
+MAX_MANAGERS: constant(uint256) = 16
+LDO_TOKEN: constant(address) = 0x5A98FcBEA516Cf06857215779Fd812CA3beF1B32
+EVM_SCRIPT_EXECUTOR_ID: constant(Bytes[4]) = b"\x00\x00\x00\x01"
+# Lengths of Finance.newImmediatePayment(LDO, manager, amount, "") and update_spent_amount(total) calldata
+PAYMENT_CALLDATA_LENGTH: constant(Bytes[4]) = b"\x00\x00\x00\xa4"
+UPDATE_CALLDATA_LENGTH: constant(Bytes[4]) = b"\x00\x00\x00\x24"
+
+owner: public(address)
+trusted_caller: public(address)
+finance: public(address)
+evm_script_executor: public(address)
+allowed_managers: public(HashMap[address, bool])
+limit: public(uint256)
+period_duration: public(uint256)
+period_start: public(uint256)
+spent: uint256
+
+
+@external
+def __init__(
+    _owner: address,
+    _trusted_caller: address,
+    _finance: address,
+    _evm_script_executor: address,
+    _limit: uint256,
+    _period_duration: uint256
+):
+    assert _owner != ZERO_ADDRESS, "zero address not allowed"
+    assert _period_duration != 0, "zero period duration"
+    self.owner = _owner
+    self.trusted_caller = _trusted_caller
+    self.finance = _finance
+    self.evm_script_executor = _evm_script_executor
+    self.limit = _limit
+    self.period_duration = _period_duration
+    self.period_start = block.timestamp
+
+
+@internal
+@view
+def _is_period_finished() -> bool:
+    return block.timestamp >= self.period_start + self.period_duration
+
+
+@internal
+@view
+def _spent_in_period() -> uint256:
+    if self._is_period_finished():
+        return 0
+    return self.spent
+
+
+@external
+@view
+def spent_in_period() -> uint256:
+    return self._spent_in_period()
+
+
+@external
+@view
+def spendable() -> uint256:
+    """
+    @notice Returns the amount that can still be sent in the current period.
+    """
+    spent: uint256 = self._spent_in_period()
+    if spent >= self.limit:
+        return 0
+    return self.limit - spent
+
+
+@internal
+@view
+def _payment(_manager: address, _amount: uint256) -> Bytes[188]:
+    if _manager == ZERO_ADDRESS:
+        return b""
+    return concat(
+        slice(convert(self.finance, bytes32), 12, 20),
+        PAYMENT_CALLDATA_LENGTH,
+        method_id("newImmediatePayment(address,address,uint256,string)"),
+        convert(LDO_TOKEN, bytes32),
+        convert(_manager, bytes32),
+        convert(_amount, bytes32),
+        convert(128, bytes32),
+        convert(0, bytes32)
+    )
+
+
+@external
+@view
+def createEVMScript(_creator: address, _evm_script_call_data: Bytes[1024]) -> Bytes[3072]:
+    """
+    @notice
+        Builds an EVM script paying LDO from the Agent through Finance to every listed
+        manager, followed by the update of the spent amount. The call data is
+        abi-encoded `(address[16] managers, uint256[16] amounts)`, the list ends at the
+        first zero address. Only the trusted caller can create motions.
+    """
+    assert _creator == self.trusted_caller, "creator not permitted"
+    assert len(_evm_script_call_data) == 2 * MAX_MANAGERS * 32, "wrong call data length"
+
+    managers: address[MAX_MANAGERS] = empty(address[MAX_MANAGERS])
+    amounts: uint256[MAX_MANAGERS] = empty(uint256[MAX_MANAGERS])
+    total: uint256 = 0
+
+    for i in range(MAX_MANAGERS):
+        manager: address = extract32(_evm_script_call_data, i * 32, output_type=address)
+        if manager == ZERO_ADDRESS:
+            break
+        amount: uint256 = extract32(_evm_script_call_data, (MAX_MANAGERS + i) * 32, output_type=uint256)
+        assert self.allowed_managers[manager], "manager not allowed"
+        assert amount != 0, "zero amount"
+        managers[i] = manager
+        amounts[i] = amount
+        total += amount
+
+    assert total != 0, "empty top up"
+    assert self._spent_in_period() + total <= self.limit, "limit exceeded"
+
+    return concat(
+        EVM_SCRIPT_EXECUTOR_ID,
+        self._payment(managers[0], amounts[0]),
+        self._payment(managers[1], amounts[1]),
+        self._payment(managers[2], amounts[2]),
+        self._payment(managers[3], amounts[3]),
+        self._payment(managers[4], amounts[4]),
+        self._payment(managers[5], amounts[5]),
+        self._payment(managers[6], amounts[6]),
+        self._payment(managers[7], amounts[7]),
+        self._payment(managers[8], amounts[8]),
+        self._payment(managers[9], amounts[9]),
+        self._payment(managers[10], amounts[10]),
+        self._payment(managers[11], amounts[11]),
+        self._payment(managers[12], amounts[12]),
+        self._payment(managers[13], amounts[13]),
+        self._payment(managers[14], amounts[14]),
+        self._payment(managers[15], amounts[15]),
+        slice(convert(self, bytes32), 12, 20),
+        UPDATE_CALLDATA_LENGTH,
+        method_id("update_spent_amount(uint256)"),
+        convert(total, bytes32)
+    )
+
+
+@external
+def update_spent_amount(_amount: uint256):
+    """
+    @notice
+        Adds the amount of an enacted top up to the current period, starting a new
+        period if the last one is over. Called by the EVM script executor as the
+        last action of every script from this factory.
+    """
+    assert msg.sender == self.evm_script_executor, "not permitted"
+
+    if self._is_period_finished():
+        elapsed: uint256 = block.timestamp - self.period_start
+        self.period_start += elapsed - elapsed % self.period_duration
+        self.spent = 0
+
+    spent: uint256 = self.spent + _amount
+    assert spent <= self.limit, "limit exceeded"
+    self.spent = spent
+
+    log SpentAmountUpdated(_amount, spent)
+
+
+@external
+def add_manager(_manager: address):
+    assert msg.sender == self.owner, "not permitted"
+    assert _manager != ZERO_ADDRESS, "zero address not allowed"
+    self.allowed_managers[_manager] = True
+
+    log ManagerAdded(_manager)
+
+
+@external
+def remove_manager(_manager: address):
+    assert msg.sender == self.owner, "not permitted"
+    self.allowed_managers[_manager] = False
+
+    log ManagerRemoved(_manager)
+
+
+@external
+def set_limit(_limit: uint256, _period_duration: uint256):
+    """
+    @notice Sets the amount that can be sent per period. The current period keeps its start.
+    """
+    assert msg.sender == self.owner, "not permitted"
+    assert _period_duration != 0, "zero period duration"
+    self.limit = _limit
+    self.period_duration = _period_duration
+
+    log LimitUpdated(_limit, _period_duration)
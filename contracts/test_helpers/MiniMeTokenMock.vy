@@ -0,0 +1,71 @@
+# @version 0.3.1
+# @license MIT
+
+# Stand-in for the LDO MiniMe token on a local chain: transfers return false
+# instead of reverting and approvals must go through zero.
+
+event Transfer:
+    _from: indexed(address)
+    _to: indexed(address)
+    _value: uint256
+
+event Approval:
+    _owner: indexed(address)
+    _spender: indexed(address)
+    _value: uint256
+
+
+name: public(String[64])
+symbol: public(String[32])
+decimals: public(uint256)
+totalSupply: public(uint256)
+balanceOf: public(HashMap[address, uint256])
+allowance: public(HashMap[address, HashMap[address, uint256]])
+
+
+@external
+def __init__():
+    self.name = "Lido DAO Token"
+    self.symbol = "LDO"
+    self.decimals = 18
+
+
+@internal
+def _transfer(_from: address, _to: address, _value: uint256) -> bool:
+    if _value == 0:
+        return True
+    assert _to != ZERO_ADDRESS and _to != self
+    if self.balanceOf[_from] < _value:
+        return False
+    self.balanceOf[_from] -= _value
+    self.balanceOf[_to] += _value
+    log Transfer(_from, _to, _value)
+    return True
+
+
+@external
+def transfer(_to: address, _value: uint256) -> bool:
+    return self._transfer(msg.sender, _to, _value)
+
+
+@external
+def transferFrom(_from: address, _to: address, _value: uint256) -> bool:
+    if self.allowance[_from][msg.sender] < _value:
+        return False
+    self.allowance[_from][msg.sender] -= _value
+    return self._transfer(_from, _to, _value)
+
+
+@external
+def approve(_spender: address, _value: uint256) -> bool:
+    assert _value == 0 or self.allowance[msg.sender][_spender] == 0
+    self.allowance[msg.sender][_spender] = _value
+    log Approval(msg.sender, _spender, _value)
+    return True
+
+
+@external
+def mint(_to: address, _value: uint256):
+    self.totalSupply += _value
+    self.balanceOf[_to] += _value
+    log Transfer(ZERO_ADDRESS, _to, _value)
@@ -0,0 +1,43 @@
+import sys
+from brownie import RewardsManagerImplementation, RewardsManagerFactory, network
+import json
+
+from utils.config import (
+    get_is_live,
+    get_deployer_account,
+    prompt_bool
+)
+
+
+def main():
+    is_live = get_is_live()
+    deployer = get_deployer_account(is_live)
+
+    print(f'Deployer: {deployer}')
+    sys.stdout.write('Deploy RewardsManager implementation and factory? [y/n]: ')
+
+    if not prompt_bool():
+        print('Aborting')
+        return
+
+    tx_params={"from": deployer, "priority_fee": "2 gwei"}
+    if not is_live: del tx_params["priority_fee"]
+
+    implementation = RewardsManagerImplementation.deploy(tx_params)
+    factory = RewardsManagerFactory.deploy(implementation, tx_params)
+
+    with open(f'deployed-factory-{network.show_active()}.json', 'w') as f:
+        json.dump({
+            "networkId": network.chain.id,
+            "rewardsManagerImplementation": {
+                "baseAddress": implementation.address,
+                "tx": implementation.tx.txid
+            },
+            "rewardsManagerFactory": {
+                "baseAddress": factory.address,
+                "tx": factory.tx.txid
+            }
+        }, f)
+
+    print('Implementation contract: ', implementation)
+    print('Factory contract: ', factory)
@@ -0,0 +1,72 @@
+import sys
+from brownie import RewardsManagerFactory, ZERO_ADDRESS, network
+import json
+
+from utils.config import (
+    lido_dao_agent_address,
+    min_rewards_amount,
+    get_is_live,
+    get_env,
+    get_deployer_account,
+    prompt_bool
+)
+
+MAX_BATCH_SIZE = 32
+
+
+def main():
+    is_live = get_is_live()
+    deployer = get_deployer_account(is_live)
+
+    with open(f'deployed-factory-{network.show_active()}.json', 'r') as f:
+        factory = RewardsManagerFactory.at(json.load(f)["rewardsManagerFactory"]["baseAddress"])
+
+    rewards_contracts = [
+        address.strip()
+        for address in get_env(
+            'REWARDS_CONTRACTS',
+            message='Please set REWARDS_CONTRACTS env variable to comma separated gauge addresses'
+        ).split(',')
+        if address.strip()
+    ]
+
+    print(f'Deployer: {deployer}')
+    print(f'FACTORY: {factory}')
+    print(f'OWNER: {lido_dao_agent_address}')
+    print(f'MINIMAL REWARDS AMOUNT: {min_rewards_amount}')
+    print(f'REWARDS CONTRACTS ({len(rewards_contracts)}):')
+    for rewards_contract in rewards_contracts:
+        print(f'  {rewards_contract}')
+    sys.stdout.write('Proceed? [y/n]: ')
+
+    if not prompt_bool():
+        print('Aborting')
+        return
+
+    tx_params={"from": deployer, "priority_fee": "2 gwei"}
+    if not is_live: del tx_params["priority_fee"]
+
+    managers = []
+    for i in range(0, len(rewards_contracts), MAX_BATCH_SIZE):
+        batch = rewards_contracts[i:i + MAX_BATCH_SIZE]
+        tx = factory.deploy_managers(
+            lido_dao_agent_address,
+            min_rewards_amount,
+            batch + [ZERO_ADDRESS] * (MAX_BATCH_SIZE - len(batch)),
+            tx_params
+        )
+        for event in tx.events["RewardsManagerDeployed"]:
+            managers.append({
+                "baseAddress": event["manager"],
+                "rewardsContract": event["rewardsContract"],
+                "tx": tx.txid
+            })
+
+    with open(f'deployed-managers-{network.show_active()}.json', 'w') as f:
+        json.dump({
+            "networkId": network.chain.id,
+            "balancerRewardsManagers": managers
+        }, f)
+
+    for manager in managers:
+        print('Manager contract: ', manager["baseAddress"], 'for', manager["rewardsContract"])
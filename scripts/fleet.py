@@ -0,0 +1,61 @@
+import sys
+import asyncio
+
+from utils.config import get_env
+from utils.keeper import STATUS_NAMES
+from utils.fleet import Fleet, load_deployments
+from utils.metrics import Metrics
+
+
+def endpoints_from_env(networks):
+    endpoints = {}
+    for network in networks:
+        url = get_env(f'RPC_URL_{network.upper().replace("-", "_")}', is_required=False)
+        if url is None:
+            print(f'Skipping {network}: RPC_URL_{network.upper().replace("-", "_")} is not set')
+            continue
+        endpoints[network] = url
+    return endpoints
+
+
+def print_status(status):
+    if 'error' in status:
+        print(f'{status["network"]:<12}{status["manager"]}  failed: {status["error"]!r}')
+        return
+    print(
+        f'{status["network"]:<12}{status["manager"]}  '
+        f'iteration {status["rewards_iteration"]}  '
+        f'period finish {status["period_finish"]}  '
+        f'{STATUS_NAMES[status["reason"]]}'
+    )
+
+
+async def run(command):
+    deployments = load_deployments()
+    private_key = get_env('KEEPER_PRIVATE_KEY') if command == 'start' else None
+    metrics = Metrics(log_path=get_env('FLEET_METRICS_LOG', is_required=False))
+
+    async with Fleet(endpoints_from_env(deployments.keys()), deployments, private_key, metrics=metrics) as fleet:
+        if command == 'status':
+            for status in await fleet.statuses():
+                print_status(status)
+            return
+
+        for status, result in await fleet.start_due():
+            print_status(status)
+            print(f'  {"failed: " if isinstance(result, Exception) else "tx: "}{result}')
+
+
+def main(command='status'):
+    """
+    Shows the status of every manager from deployed-*.json, or starts due rewards
+    periods with `start`. RPC_URL_<NETWORK> sets the endpoint of each network,
+    KEEPER_PRIVATE_KEY the account to sign with.
+    """
+    if command not in ('status', 'start'):
+        raise ValueError(f'Unknown command {command}, expected status or start')
+    asyncio.run(run(command))
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,28 @@
+import sys
+
+from utils.fuzzer import run_campaign
+
+
+def main(sequences='1000', length='50', workers='0', seed='0'):
+    """
+    Replays `sequences` random action sequences of `length` steps against
+    RewardsManager.vy in an in-process EVM on `workers` processes (one per
+    core by default), checking the invariants after every step. Prints the
+    throughput and every shrunk counterexample, exits with 1 if there are any.
+    """
+    result = run_campaign(int(sequences), int(length), int(workers) or None, int(seed))
+
+    print(f'{result["sequences"]} sequences, {result["steps"]} steps on {result["workers"]} workers '
+          f'in {result["seconds"]:.1f}s')
+    print(f'{result["executions"]} executions, {result["executions_per_second"]:.0f} per second')
+    for failure in result['failures']:
+        print(f'\nseed {failure["seed"]}: {failure["message"]}')
+        for step in failure['sequence']:
+            print(f'  {step}')
+
+    if result['failures']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,24 @@
+from brownie import network, web3
+import json
+
+from utils.config import get_env
+from utils.indexer import RewardsIndexer
+
+
+def main():
+    with open(f'deployed-{network.show_active()}.json', 'r') as f:
+        deployment = json.load(f)["balancerRewardsManager"]
+
+    start_block = web3.eth.get_transaction_receipt(deployment["tx"])["blockNumber"]
+    db_path = get_env('REWARDS_DB', is_required=False, default=f'rewards-{network.show_active()}.sqlite')
+
+    indexer = RewardsIndexer(web3, deployment["baseAddress"], db_path, start_block)
+    print(f'Manager: {indexer.address}')
+    print(f'Indexed up to: {indexer.cursor()[0] if indexer.cursor() else start_block - 1}')
+
+    stored = indexer.sync()
+    print(f'New events: {stored}, indexed up to {indexer.cursor()[0]}')
+
+    for block, _, tx_hash, name, args in indexer.events():
+        print(f'{block:>10} {tx_hash} {name} {args}')
+    indexer.close()
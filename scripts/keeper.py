@@ -0,0 +1,42 @@
+from brownie import RewardsManager, interface, accounts, network, web3
+import json
+
+from utils.config import (
+    ldo_token_address,
+    get_is_live,
+    get_env
+)
+from utils.keeper import RewardsKeeper
+from utils.metrics import Metrics, MetricsServer
+
+
+def main():
+    is_live = get_is_live()
+
+    manager_address = get_env('REWARDS_MANAGER', is_required=False)
+    if manager_address is None:
+        with open(f'deployed-{network.show_active()}.json', 'r') as f:
+            manager_address = json.load(f)["balancerRewardsManager"]["baseAddress"]
+
+    keeper = accounts.load(get_env('KEEPER')) if is_live else accounts[0]
+    tx_params = {"from": keeper, "priority_fee": "2 gwei"}
+    if not is_live: del tx_params["priority_fee"]
+
+    manager = RewardsManager.at(manager_address)
+    print(f'Keeper: {keeper}')
+    print(f'Manager: {manager}')
+
+    metrics = Metrics(log_path=get_env('KEEPER_METRICS_LOG', is_required=False))
+    metrics_port = get_env('KEEPER_METRICS_PORT', is_required=False)
+    if metrics_port is not None:
+        server = MetricsServer(metrics, host='0.0.0.0', port=int(metrics_port)).start()
+        print(f'Metrics: {server.url}')
+
+    RewardsKeeper(
+        manager,
+        interface.ERC20(ldo_token_address),
+        web3,
+        tx_params,
+        events_interval=int(get_env('KEEPER_EVENTS_INTERVAL', is_required=False, default=60)),
+        metrics=metrics
+    ).run()
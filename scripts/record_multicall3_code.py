@@ -0,0 +1,19 @@
+from brownie import network, web3
+
+from utils.multicall import MULTICALL3_ADDRESS
+
+multicall3_code_path = 'tests/multicall3_runtime.hex'
+
+
+def main():
+    """
+    Records the Multicall3 runtime code deployed at its canonical address,
+    the `multicall` test fixture puts it at the same address on the local EVM.
+    Run against mainnet: brownie run record_multicall3_code --network mainnet
+    """
+    code = web3.eth.get_code(MULTICALL3_ADDRESS)
+    assert len(code) > 0, f'no Multicall3 at {MULTICALL3_ADDRESS} on {network.show_active()}'
+
+    with open(multicall3_code_path, 'w') as f:
+        f.write(code.hex() + '\n')
+    print(f'Multicall3: {len(code)} bytes from {network.show_active()} written to {multicall3_code_path}')
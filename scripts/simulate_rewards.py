@@ -0,0 +1,28 @@
+import sys
+
+import numpy as np
+
+from utils.config import min_rewards_amount
+from utils.simulator import simulate, delayed_topups
+
+
+def main(topup='200000', every='4', years='1', max_delay='2', scenarios='1000'):
+    """
+    Simulates a manager topped up with `topup` LDO every `every` weeks for
+    `years`, every top-up arriving up to `max_delay` weeks late, and prints
+    stall weeks and emitted LDO per year over the scenarios.
+    """
+    weeks = int(years) * 52
+    topups = delayed_topups(int(topup) * 10**18, int(every), weeks, int(max_delay), int(scenarios))
+    result = simulate(topups, min_rewards_amount)
+
+    stalls = result['stalled'].sum(axis=1)
+    emitted = result['emitted'].reshape(len(topups), int(years), 52).sum(axis=2) // 10**18
+    print(f'{len(topups)} scenarios, {weeks} weeks')
+    print(f'stall weeks: min {stalls.min()}, median {int(np.median(stalls))}, max {stalls.max()}')
+    for year in range(int(years)):
+        print(f'year {year + 1} emitted LDO: min {emitted[:, year].min()}, max {emitted[:, year].max()}')
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
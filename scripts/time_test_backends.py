@@ -0,0 +1,61 @@
+import sys
+import time
+import shutil
+import subprocess
+
+TEST_FILES = ['tests/test_manager.py', 'tests/test_recover.py']
+BACKENDS = {
+    'ganache fork': [],
+    'local EVM': ['--local-evm'],
+}
+
+
+def run_tests(brownie, args):
+    start = time.perf_counter()
+    result = subprocess.run([brownie, 'test', *TEST_FILES, *args], capture_output=True, text=True)
+    return time.perf_counter() - start, result
+
+
+def summary_line(output):
+    lines = [line.strip('= ') for line in output.splitlines() if line.startswith('=')]
+    return lines[-1] if lines else ''
+
+
+def failure_reason(result):
+    errors = [line.strip() for line in (result.stdout + result.stderr).splitlines() if 'Error' in line]
+    return errors[-1] if errors else summary_line(result.stdout)
+
+
+def main(runs='3'):
+    """
+    Runs test_manager.py and test_recover.py `runs` times on the ganache fork
+    and on the local EVM, brownie startup included, and prints the best wall
+    time of each backend and the speedup. Contracts are compiled beforehand.
+    Exits with 1 if a run fails, a fork run needs ganache-cli and a mainnet node.
+    """
+    brownie = shutil.which('brownie')
+    if brownie is None:
+        sys.exit('brownie is not installed')
+    subprocess.run([brownie, 'compile'], capture_output=True, check=True)
+
+    best = {}
+    for backend, args in BACKENDS.items():
+        times = []
+        for _ in range(int(runs)):
+            seconds, result = run_tests(brownie, args)
+            if result.returncode != 0:
+                print(f'{backend}: failed, {failure_reason(result)}')
+                break
+            times.append(seconds)
+            summary = summary_line(result.stdout)
+        if times:
+            best[backend] = min(times)
+            print(f'{backend}: {best[backend]:.1f}s best of {", ".join(f"{t:.1f}s" for t in times)}, {summary}')
+
+    if len(best) < len(BACKENDS):
+        sys.exit(1)
+    print(f'speedup: {best["ganache fork"] / best["local EVM"]:.1f}x')
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,121 @@
+import os
+import sys
+import json
+import timeit
+import statistics
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+baselines_path = os.path.join(os.path.dirname(__file__), 'baselines.json')
+
+# Seconds each timed sample of the relative measurement runs for, at least
+sample_seconds = 0.01
+
+
+def reference_workload():
+    """
+    Fixed pure-Python work every benchmark is measured against, so baselines
+    carry over between hosts: packing and hex-encoding words like the call
+    script helpers do.
+    """
+    data = bytearray()
+    for value in range(1000):
+        data += value.to_bytes(32, 'big')
+    return data.hex()
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--skip-baselines',
+        action='store_true',
+        help='Only report relative times, for hosts too noisy to compare them with baselines.json'
+    )
+    parser.addoption(
+        '--update-baselines',
+        action='store_true',
+        help='Record current relative times into baselines.json instead of comparing'
+    )
+    parser.addoption(
+        '--baseline-tolerance',
+        type=float,
+        default=25.0,
+        help='Allowed slowdown against baselines.json, in percent'
+    )
+
+
+def pytest_configure(config):
+    config._benchmark_baselines = {}
+    if os.path.exists(baselines_path):
+        with open(baselines_path, 'r') as f:
+            config._benchmark_baselines = json.load(f)
+    config._benchmark_results = {}
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if not config.getoption('--update-baselines') or not config._benchmark_results:
+        return
+
+    baselines = dict(config._benchmark_baselines)
+    baselines.update(config._benchmark_results)
+    with open(baselines_path, 'w') as f:
+        json.dump(dict(sorted(baselines.items())), f, indent=2)
+        f.write('\n')
+
+
+def min_time(timer, number, repeat=3):
+    return min(timer.repeat(repeat, number)) / number
+
+
+def relative_time(fn, seconds, pairs=9):
+    """
+    Returns the median ratio of `fn`, taking about `seconds` per call, to
+    `reference_workload` timed right before it. The host speed changes within
+    a run, each pair is timed in one speed regime and the median drops the
+    pairs that straddle a change.
+    """
+    fn_timer = timeit.Timer(fn)
+    reference_timer = timeit.Timer(reference_workload)
+    reference_number = max(1, round(sample_seconds / min_time(reference_timer, 1)))
+    number = max(1, round(sample_seconds / seconds))
+
+    ratios = []
+    for _ in range(pairs):
+        reference = min_time(reference_timer, reference_number)
+        ratios.append(min_time(fn_timer, number) / reference)
+    return statistics.median(ratios)
+
+
+@pytest.fixture
+def bench(benchmark, request):
+    """
+    Benchmarks `fn` and compares its time in reference workloads, see
+    `relative_time`, with the baseline recorded the same way. Latency-bound
+    benchmarks pass `unit`, their minimum time is counted in `unit` seconds.
+    """
+    config = request.config
+
+    def run(fn, *args, unit=None, **kwargs):
+        result = benchmark(fn, *args, **kwargs)
+        if benchmark.disabled:
+            return result
+
+        name = request.node.name
+        if unit is not None:
+            relative = benchmark.stats.stats.min / unit
+            units = 'units'
+        else:
+            relative = relative_time(lambda: fn(*args, **kwargs), benchmark.stats.stats.min)
+            units = 'reference workloads'
+        config._benchmark_results[name] = float(f'{relative:.4g}')
+
+        baseline = config._benchmark_baselines.get(name)
+        if baseline is not None and not config.getoption('--update-baselines') \
+                and not config.getoption('--skip-baselines'):
+            limit = baseline * (1 + config.getoption('--baseline-tolerance') / 100)
+            assert relative <= limit, \
+                f'{name}: {relative:.4g} {units}, baseline {baseline:.4g}'
+        return result
+
+    return run
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import eth_abi
+import pytest
+from aiohttp import web
+
+from utils.fleet import Fleet, STATUS_FIELDS, STATUS_SELECTOR
+
+networks_count = 4
+rpc_latency = 0.02
+fleet_sizes = [1, 10, 100]
+
+status_result = '0x' + eth_abi.encode_abi(
+    [t for _, t in STATUS_FIELDS],
+    ['0xb842afd82d940ff5d8f6ef3399572592ebf182b0', 10**18, 1, 10**18, 3 * 10**18, 1, 1, True, True, True, 0]
+).hex()
+
+
+async def handle_rpc(request):
+    payload = await request.json()
+    await asyncio.sleep(rpc_latency)
+
+    if payload['method'] == 'eth_getBlockByNumber':
+        result = {'number': '0x1', 'timestamp': '0x2'}
+    elif payload['method'] == 'eth_call' and payload['params'][0]['data'] == STATUS_SELECTOR:
+        result = status_result
+    else:
+        return web.json_response({'jsonrpc': '2.0', 'id': payload['id'], 'error': {'message': 'unsupported'}})
+
+    return web.json_response({'jsonrpc': '2.0', 'id': payload['id'], 'result': result})
+
+
+@pytest.fixture(scope='module')
+def rpc_stand_ins():
+    """
+    Local JSON-RPC stand-ins answering `status()` with a fixed latency, one per network.
+    """
+    loop = asyncio.new_event_loop()
+    runners = []
+    urls = []
+
+    async def start():
+        for _ in range(networks_count):
+            app = web.Application()
+            app.router.add_post('/', handle_rpc)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            runners.append(runner)
+            urls.append(f'http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/')
+
+    loop.run_until_complete(start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    yield urls
+
+    async def stop():
+        for runner in runners:
+            await runner.cleanup()
+
+    asyncio.run_coroutine_threadsafe(stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+def make_fleet(urls, size):
+    endpoints = {f'network-{i}': url for i, url in enumerate(urls)}
+    deployments = {network: [] for network in endpoints}
+    for i in range(size):
+        network = f'network-{i % len(urls)}'
+        deployments[network].append('0x' + f'{i + 1:040x}')
+    return Fleet(endpoints, deployments)
+
+
+@pytest.mark.parametrize('size', fleet_sizes)
+def test_fleet_statuses(bench, rpc_stand_ins, size):
+    async def query():
+        async with make_fleet(rpc_stand_ins, size) as fleet:
+            return await fleet.statuses()
+
+    # RPC latency dominates, the time is counted in round trips to a stand-in
+    statuses = bench(lambda: asyncio.run(query()), unit=rpc_latency)
+    assert len(statuses) == size
+    assert all(status['can_start'] for status in statuses)
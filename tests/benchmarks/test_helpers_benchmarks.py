@@ -0,0 +1,82 @@
+import pytest
+import eth_abi
+
+from utils.config import get_env
+from utils.evm_script import (
+    encode_call_script,
+    decode_call_script
+)
+from utils.voting import create_vote
+from utils.metrics import Metrics
+
+actions_counts = [1, 10, 100, 1000, 10_000]
+
+target_address = '0xb842afd82d940ff5d8f6ef3399572592ebf182b0'
+voting_address = '0x2e59A20f205bB85a89C53f1936454680651E618e'
+transfer_calldata = (
+    '0xa9059cbb'
+    + eth_abi.encode_abi(['address', 'uint256'], [target_address, 10**18]).hex()
+)
+
+
+class MockVoting:
+    address = voting_address
+
+
+class MockTransaction:
+    events = {'StartVote': {'voteId': 1}}
+
+
+class MockTokenManager:
+    def forward(self, script, tx_params):
+        return MockTransaction()
+
+
+def make_actions(count):
+    return [(target_address, transfer_calldata)] * count
+
+
+@pytest.mark.parametrize('count', actions_counts)
+def test_encode_call_script(bench, count):
+    actions = make_actions(count)
+    script = bench(encode_call_script, actions)
+    assert len(script) == 2 + 8 + count * 2 * (20 + 4 + 68)
+
+
+@pytest.mark.parametrize('count', actions_counts)
+def test_decode_call_script(bench, count):
+    script = encode_call_script(make_actions(count))
+    actions = bench(lambda: list(decode_call_script(script)))
+    assert len(actions) == count
+
+
+@pytest.mark.parametrize('count', actions_counts)
+def test_create_vote(bench, count):
+    voting = MockVoting()
+    token_manager = MockTokenManager()
+    actions = make_actions(count)
+
+    def assemble_and_create_vote():
+        evm_script = encode_call_script(actions)
+        return create_vote(voting, token_manager, 'benchmark', evm_script, {})
+
+    (vote_id, _) = bench(assemble_and_create_vote)
+    assert vote_id == 1
+
+
+def test_get_env(bench, monkeypatch):
+    monkeypatch.setenv('BENCHMARK_ENV', 'value')
+    assert bench(get_env, 'BENCHMARK_ENV') == 'value'
+
+
+def test_metrics_timer(bench):
+    # 1000 timed RPC calls, the keeper's per-call overhead
+    metrics = Metrics()
+
+    def timed_calls():
+        for _ in range(1000):
+            with metrics.timer('keeper_rpc_seconds', call='status', manager=voting_address):
+                pass
+
+    bench(timed_calls)
+    assert metrics.summary('keeper_rpc_seconds', call='status', manager=voting_address)[0] >= 1000
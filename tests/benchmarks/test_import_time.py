@@ -0,0 +1,58 @@
+import os
+import sys
+import subprocess
+import pytest
+
+root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# Cumulative import time budget for the modules CLI tools load before doing any
+# work, in imports of `reference_module` measured in the same run. They leave
+# about twice the current time, importing brownie alone takes hundreds.
+reference_module = 'json'
+import_budgets = {
+    'utils.config': 1,
+    'utils.evm_script': 3,
+    'utils.voting': 3,
+    'utils.keeper': 6,
+}
+
+heavy_modules = ['brownie', 'web3', 'vyper', 'solcx', 'eth_abi']
+
+
+def import_times(module):
+    """
+    Imports `module` in a fresh interpreter with `-X importtime` and returns
+    the cumulative time of every imported module in microseconds along with
+    the names of all imported modules.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def min_import_time(module, runs=3):
+    # best of a few runs, a cold disk cache only slows down the first one
+    return min(import_times(module)[module] for _ in range(runs))
+
+
+@pytest.mark.parametrize('module', list(import_budgets))
+def test_import_time(module):
+    imported = import_times(module)
+
+    for heavy in heavy_modules:
+        assert heavy not in imported, f'{module} imports {heavy}'
+
+    relative = min_import_time(module) / min_import_time(reference_module)
+    assert relative <= import_budgets[module], \
+        f'{module}: {relative:.2f} imports of {reference_module}, budget {import_budgets[module]}'
@@ -1,13 +1,257 @@
+import os
+import json
 import time
 import pytest
-from brownie import chain, accounts, BalancerLiquidityGaugeMock, RewardsManager
+from brownie import (
+    chain,
+    web3,
+    accounts,
+    BalancerLiquidityGaugeMock,
+    MiniMeTokenMock,
+    RewardsManager,
+    MultiGaugeRewardsManager,
+    RewardsManagerImplementation,
+    RewardsManagerFactory,
+    TopUpRewardsManagers
+)
+from brownie._config import CONFIG
 from utils.config import lido_dao_voting_address, balancer_rewards_contract
+from utils.rpc_cache import RpcCache, CachingRpcProxy
+from utils.chain_state import ChainStateCache
+from utils.multicall import MULTICALL3_ADDRESS
 
 from utils.config import (
     ldo_token_address,
-    lido_dao_agent_address
+    lido_dao_agent_address,
+    lido_dao_finance_address,
+    easy_track_address,
+    easy_track_evm_script_executor_address
 )
 
+# Benchmarks run offline through plain pytest, see tests/benchmarks/pytest.ini
+collect_ignore = ['benchmarks']
+
+gas_snapshot_path = os.path.join(os.path.dirname(__file__), 'gas_snapshot.json')
+# The local EVM runs the mocks instead of the mainnet contracts, its gas is kept apart
+local_evm_gas_snapshot_path = os.path.join(os.path.dirname(__file__), 'gas_snapshot_local_evm.json')
+rpc_cache_path = os.path.join(os.path.dirname(__file__), '.rpc_cache', 'mainnet.json.gz')
+chain_state_path = os.path.join(os.path.dirname(__file__), '.chain_state')
+# Recorded from mainnet by scripts/record_multicall3_code.py
+multicall3_code_path = os.path.join(os.path.dirname(__file__), 'multicall3_runtime.hex')
+durations_cache_key = 'balancer-rewards-manager/durations'
+
+# Seconds spent in setup, call and teardown of every test module in this session
+module_durations = {}
+session_start = time.perf_counter()
+
+# Fixtures reading mainnet contracts, tests using them are skipped with --local-evm
+fork_only_fixtures = {
+    'dao_voting',
+    'rewards_contract',
+    'balancer_admin',
+    'easytrack_contract',
+    'rewards_multisig',
+    'usdt_holder',
+    'usdt_token',
+}
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--update-gas-snapshot',
+        action='store_true',
+        help='Record the measured gas in the gas snapshot, required for new entries'
+    )
+    parser.addoption(
+        '--gas-breakdown',
+        action='store_true',
+        help='Print per-opcode gas of every measured transaction'
+    )
+    parser.addoption(
+        '--rpc-cache',
+        action='store_true',
+        help='Fork mainnet through a local proxy that records and replays state reads'
+    )
+    parser.addoption(
+        '--rpc-cache-offline',
+        action='store_true',
+        help='Fail on state reads missing from the RPC cache instead of fetching them'
+    )
+    parser.addoption(
+        '--fork-block',
+        type=int,
+        default=None,
+        help='Block to fork at, defaults to the cached block or the latest one'
+    )
+    parser.addoption(
+        '--local-evm',
+        action='store_true',
+        help='Run against an in-process EVM instead of a ganache mainnet fork'
+    )
+    parser.addoption(
+        '--no-chain-states',
+        action='store_true',
+        help='Run every fixture setup instead of loading its stored chain state'
+    )
+
+
+def is_xdist_master(config):
+    return bool(getattr(config.option, 'numprocesses', None))
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'local_evm_only: needs the local EVM, skipped on a ganache fork')
+
+    # With xdist the chains run in the workers, the master only schedules
+    if is_xdist_master(config) or config.getoption('--local-evm'):
+        return
+    if not config.getoption('--rpc-cache') and not config.getoption('--rpc-cache-offline'):
+        return
+
+    mainnet = CONFIG.networks['mainnet']
+    development = CONFIG.networks['development']
+    cache = RpcCache(rpc_cache_path, block=config.getoption('--fork-block'))
+    proxy = CachingRpcProxy(
+        os.path.expandvars(mainnet['host']),
+        cache,
+        offline=config.getoption('--rpc-cache-offline')
+    ).start()
+
+    development['cmd_settings']['fork'] = f'{proxy.url}@{cache.block}'
+    development['cmd_settings'].setdefault('chain_id', int(mainnet['chainid']))
+    development['chainid'] = mainnet['chainid']
+    config.rpc_cache_proxy = proxy
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionstart(session):
+    global session_start
+    session_start = time.perf_counter()
+
+    config = session.config
+    if is_xdist_master(config) or not config.getoption('--local-evm'):
+        return
+    # Started here rather than in pytest_configure, brownie moves every xdist worker to its own port there.
+    # py-evm is installed apart from the locked dependencies, see README
+    from utils.local_evm import LocalEvm, LocalEvmServer
+
+    development = CONFIG.networks['development']
+    config.local_evm = LocalEvmServer(
+        LocalEvm(
+            mnemonic=development['cmd_settings'].get('mnemonic', 'brownie'),
+            gas_limit=development['cmd_settings'].get('gas_limit', 12_000_000),
+            hardfork=development['cmd_settings'].get('evm_version', 'istanbul')
+        ),
+        port=development['cmd_settings']['port']
+    ).start()
+
+
+@pytest.hookimpl(tryfirst=True, optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    # Only called with -n, xdist is imported here so runs without it don't need it installed
+    from xdist.scheduler import LoadFileScheduling
+
+    class DurationScheduling(LoadFileScheduling):
+        """
+        Hands test modules to xdist workers longest first, by the durations of the
+        previous run, so a slow module doesn't start last. Modules without a
+        recorded duration go first.
+        """
+
+        def __init__(self, config, log=None, durations=None):
+            super().__init__(config, log)
+            self.durations = durations or {}
+
+        def _assign_work_unit(self, node):
+            scope = max(self.workqueue, key=lambda scope: self.durations.get(scope, float('inf')))
+            self.workqueue.move_to_end(scope, last=False)
+            super()._assign_work_unit(node)
+
+    return DurationScheduling(config, log, config.cache.get(durations_cache_key, {}))
+
+
+def pytest_runtest_logreport(report):
+    module = report.nodeid.split('::', 1)[0]
+    module_durations[module] = module_durations.get(module, 0) + report.duration
+
+
+def pytest_sessionfinish(session):
+    cache = getattr(session.config, 'cache', None)
+    if cache is None or hasattr(session.config, 'workerinput') or not module_durations:
+        return
+    recorded = cache.get(durations_cache_key, {})
+    # Workers sharing cores run slower, only single process runs replace recorded durations
+    if is_xdist_master(session.config):
+        cache.set(durations_cache_key, {**module_durations, **recorded})
+    else:
+        cache.set(durations_cache_key, {**recorded, **module_durations})
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    chain_states = getattr(config, 'chain_states', None)
+    if chain_states is not None and chain_states.loaded + chain_states.recorded > 0:
+        terminalreporter.write_line(
+            f'Chain states: {chain_states.loaded} loaded, {chain_states.recorded} recorded, '
+            f'{chain_states.ran} run without storing'
+        )
+
+    if not is_xdist_master(config) or not module_durations:
+        return
+    recorded = config.cache.get(durations_cache_key, {})
+    serial_time = sum(recorded.get(module, duration) for module, duration in module_durations.items())
+    wall_time = time.perf_counter() - session_start
+    terminalreporter.write_line(
+        f'{config.option.numprocesses} workers: {wall_time:.1f}s, '
+        f'{serial_time:.1f}s in a single process, {serial_time / wall_time:.1f}x speedup'
+    )
+
+
+def gas_snapshot_file(config):
+    return local_evm_gas_snapshot_path if config.getoption('--local-evm') else gas_snapshot_path
+
+
+def pytest_collection_modifyitems(config, items):
+    path = gas_snapshot_file(config)
+    if not os.path.exists(path) and not config.getoption('--update-gas-snapshot'):
+        skip_gas = pytest.mark.skip(
+            reason=f'{os.path.basename(path)} is not recorded, record it with --update-gas-snapshot'
+        )
+        for item in items:
+            if 'gas_snapshot' in getattr(item, 'fixturenames', []):
+                item.add_marker(skip_gas)
+
+    if not config.getoption('--local-evm'):
+        skip_local = pytest.mark.skip(reason='needs the local EVM, run with --local-evm')
+        for item in items:
+            if item.get_closest_marker('local_evm_only') is not None:
+                item.add_marker(skip_local)
+        return
+    skip = pytest.mark.skip(reason='needs a mainnet fork')
+    for item in items:
+        if fork_only_fixtures.intersection(getattr(item, 'fixturenames', [])):
+            item.add_marker(skip)
+
+
+def pytest_unconfigure(config):
+    local_evm = getattr(config, 'local_evm', None)
+    if local_evm is not None:
+        local_evm.stop()
+
+    proxy = getattr(config, 'rpc_cache_proxy', None)
+    if proxy is not None:
+        proxy.stop()
+        print(f'\nRPC cache at block {proxy.cache.block}: {proxy.hits} hits, {proxy.misses} misses')
+
+
+@pytest.fixture(scope='module', autouse=True)
+def local_ldo_token(request, module_isolation):
+    # The LDO address has no code on a fresh chain, put a MiniMe lookalike there
+    if not request.config.getoption('--local-evm'):
+        return
+    mock = MiniMeTokenMock.deploy({"from": accounts[0]})
+    web3.provider.make_request('evm_setAccountCode', [ldo_token_address, web3.eth.get_code(mock.address).hex()])
+    MiniMeTokenMock.at(ldo_token_address).mint(lido_dao_agent_address, 10**27, {"from": accounts[0]})
+
 
 @pytest.fixture(scope="function", autouse=True)
 def shared_setup(fn_isolation):
@@ -24,9 +268,24 @@ def stranger(accounts):
     return accounts[9]
 
 
+@pytest.fixture(scope='session')
+def chain_states(request):
+    # Only the local EVM can dump and load states, a ganache fork runs every setup
+    cache = ChainStateCache(
+        web3,
+        chain_state_path,
+        enabled=request.config.getoption('--local-evm') and not request.config.getoption('--no-chain-states')
+    )
+    request.config.chain_states = cache
+    return cache
+
+
 @pytest.fixture(scope='module')
-def ldo_holder(accounts, ldo_token, dao_treasury):
-    ldo_token.transfer(accounts[7], 10**18, {"from": dao_treasury})
+def ldo_holder(accounts, ldo_token, dao_treasury, chain_states):
+    def fund_holder():
+        ldo_token.transfer(accounts[7], 10**18, {"from": dao_treasury})
+
+    chain_states.load_or_run('ldo_holder', fund_holder)
     return accounts[7]
 
 
@@ -77,9 +336,71 @@ def rewards_manager(rewards_contract_mock, ldo_agent, deployer, ldo_token):
     return manager
 
 
+@pytest.fixture(scope='module')
+def multi_gauge_manager(ldo_agent, deployer, ldo_token):
+    return MultiGaugeRewardsManager.deploy(ldo_agent, ldo_token, {"from": deployer})
+
+
+@pytest.fixture(scope='module')
+def rewards_contract_mocks(multi_gauge_manager, deployer, ldo_token, chain_states):
+    def deploy_mocks():
+        mocks = []
+        for _ in range(3):
+            mock = BalancerLiquidityGaugeMock.deploy(deployer, ldo_token_address, {"from": deployer})
+            mock.set_reward_distributor(ldo_token, multi_gauge_manager, {"from": deployer})
+            mocks.append(mock.address)
+        return mocks
+
+    return [BalancerLiquidityGaugeMock.at(mock) for mock in chain_states.load_or_run('rewards_contract_mocks', deploy_mocks)]
+
+
+@pytest.fixture(scope='module')
+def multicall(request):
+    # Mainnet forks have Multicall3, a fresh chain gets its recorded runtime code at the same address
+    if request.config.getoption('--local-evm'):
+        if not os.path.exists(multicall3_code_path):
+            pytest.skip('no recorded Multicall3 code, run `brownie run record_multicall3_code --network mainnet`')
+        with open(multicall3_code_path) as f:
+            web3.provider.make_request('evm_setAccountCode', [MULTICALL3_ADDRESS, f.read().strip()])
+    return MULTICALL3_ADDRESS
+
+
+@pytest.fixture(scope='module')
+def rewards_manager_implementation(deployer):
+    return RewardsManagerImplementation.deploy({"from": deployer})
+
+
+@pytest.fixture(scope='module')
+def rewards_manager_factory(rewards_manager_implementation, deployer):
+    return RewardsManagerFactory.deploy(rewards_manager_implementation, {"from": deployer})
+
+
 @pytest.fixture(scope='module')
 def easytrack_contract(interface):
-    return interface.EasyTrack('0xF0211b7660680B49De1A7E9f25C65660F0a13Fea')
+    return interface.EasyTrack(easy_track_address)
+
+
+@pytest.fixture(scope='module')
+def top_up_trusted_caller(accounts):
+    return accounts[1]
+
+
+@pytest.fixture(scope='module')
+def evm_script_executor():
+    return accounts.at(easy_track_evm_script_executor_address, force=True)
+
+
+@pytest.fixture(scope='module')
+def top_up_factory(ldo_agent, top_up_trusted_caller, deployer):
+    return TopUpRewardsManagers.deploy(
+        ldo_agent,
+        top_up_trusted_caller,
+        lido_dao_finance_address,
+        easy_track_evm_script_executor_address,
+        1000 * 10**18,
+        30 * 24 * 3600,
+        {"from": deployer}
+    )
 
 
 @pytest.fixture(scope='module')
@@ -135,6 +456,80 @@ class Helpers:
     def assert_no_events_named(evt_name, tx):
         assert evt_name not in tx.events
 
+    @staticmethod
+    def warp_to(timestamp):
+        """
+        Mines one block at `timestamp`, the chain time continues from there.
+        Does nothing if the latest block is already past it.
+        """
+        if timestamp > chain[-1].timestamp:
+            chain.mine(timestamp=timestamp)
+
+    @staticmethod
+    def warp_to_balancer_period_finish(rewards_manager, before=0):
+        Helpers.warp_to(rewards_manager.balancer_period_finish() - before)
+
+    @staticmethod
+    def warp_to_period_finish(rewards_manager, before=0):
+        Helpers.warp_to(rewards_manager.period_finish() - before)
+
 @pytest.fixture(scope='module')
 def helpers():
     return Helpers
+
+
+class GasSnapshot:
+    def __init__(self, path, update=False, breakdown=False):
+        self.path = path
+        self.update = update
+        self.breakdown = breakdown
+        self.changed = False
+        self.snapshot = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.snapshot = json.load(f)
+
+    def check(self, name, tx):
+        gas_used = tx.gas_used
+        if self.breakdown:
+            print(f'\n{name}: {gas_used} gas')
+            for op, gas in self.opcode_breakdown(tx):
+                print(f'  {op:<16}{gas:>10}')
+
+        recorded = self.snapshot.get(name)
+        if self.update:
+            self.changed = self.changed or recorded != gas_used
+            self.snapshot[name] = gas_used
+            return gas_used
+
+        assert recorded is not None, (
+            f'{name}: {gas_used} gas used, missing from {os.path.basename(self.path)}, '
+            'record it with --update-gas-snapshot'
+        )
+        assert gas_used <= recorded, f'{name}: {gas_used} gas used, snapshot has {recorded}'
+        return gas_used
+
+    @staticmethod
+    def opcode_breakdown(tx):
+        costs = {}
+        for step in tx.trace:
+            costs[step['op']] = costs.get(step['op'], 0) + step['gasCost']
+        return sorted(costs.items(), key=lambda item: item[1], reverse=True)
+
+    def save(self):
+        if not self.changed:
+            return
+        with open(self.path, 'w') as f:
+            json.dump(dict(sorted(self.snapshot.items())), f, indent=2)
+            f.write('\n')
+
+
+@pytest.fixture(scope='session')
+def gas_snapshot(request):
+    snapshot = GasSnapshot(
+        gas_snapshot_file(request.config),
+        update=request.config.getoption('--update-gas-snapshot'),
+        breakdown=request.config.getoption('--gas-breakdown')
+    )
+    yield snapshot
+    snapshot.save()
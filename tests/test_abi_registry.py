@@ -0,0 +1,59 @@
+import json
+from brownie import web3, MiniMeTokenMock
+from utils.abi_registry import AbiRegistry, INTERFACES_PATH, encode_call
+
+
+def test_encode_call_matches_web3():
+    with open(f'{INTERFACES_PATH}/Voting.json', 'r') as f:
+        voting = web3.eth.contract(abi=json.load(f))
+    script = b'\x00\x00\x00\x01'
+
+    assert encode_call('Voting', 'newVote', [script, 'desc', False, False]) == \
+        voting.encodeABI(fn_name='newVote', args=[script, 'desc', False, False])
+    assert encode_call('Voting', 'newVote(bytes,string)', [script, 'desc']) == \
+        voting.encodeABI(fn_name='newVote', args=[script, 'desc'])
+    assert encode_call('Voting', 'executeVote', [1]) == voting.encodeABI(fn_name='executeVote', args=[1])
+
+
+def test_decode_call_roundtrip():
+    registry = AbiRegistry(cache_path=None)
+    calldata = registry.encode_call('Agent', 'execute', ['0x' + '11' * 20, 0, b'\x01\x02'])
+
+    assert registry.decode_call(calldata) == (
+        'execute(address,uint256,bytes)', ('0x' + '11' * 20, 0, b'\x01\x02')
+    )
+    assert registry.decode_call('0xdeadbeef') is None
+
+
+def test_registry_cache_is_keyed_by_file_hash(tmp_path):
+    cache_path = tmp_path / 'abi_registry.json'
+    interfaces = tmp_path / 'interfaces'
+    interfaces.mkdir()
+    with open(f'{INTERFACES_PATH}/Agent.json', 'r') as f:
+        (interfaces / 'Agent.json').write_text(f.read())
+
+    registry = AbiRegistry(path=str(interfaces), cache_path=str(cache_path))
+    cached = json.loads(cache_path.read_text())['files']
+    assert len(cached) == 1
+
+    # a cached entry is used as is
+    digest = next(iter(cached))
+    cached[digest]['functions'].append(['cached', '0x12345678', 'cached()', []])
+    cache_path.write_text(json.dumps({'version': 1, 'files': cached}))
+    assert AbiRegistry(path=str(interfaces), cache_path=str(cache_path)).selectors['0x12345678'] == ('cached()', [])
+
+    # a changed file is parsed again
+    (interfaces / 'Agent.json').write_text('[]')
+    assert AbiRegistry(path=str(interfaces), cache_path=str(cache_path)).selectors == {}
+    assert len(json.loads(cache_path.read_text())['files']) == 2
+    assert len(registry.selectors) > 0
+
+
+def test_decode_event(ldo_token, ldo_agent, stranger):
+    registry = AbiRegistry(names=(), abis={'MiniMeToken': MiniMeTokenMock.abi}, cache_path=None)
+    tx = ldo_token.transfer(stranger, 10**18, {"from": ldo_agent})
+
+    assert registry.decode_event(tx.logs[0]) == (
+        'Transfer', {'_from': ldo_agent.address, '_to': stranger.address, '_value': 10**18}
+    )
+    assert registry.decode_event({'topics': ['0x' + '00' * 32], 'data': '0x'}) is None
@@ -0,0 +1,121 @@
+import pytest
+from brownie import chain, web3, BalancerLiquidityGaugeMock
+from eth_utils import to_checksum_address
+
+from utils.chain_state import ChainStateCache
+from utils.config import ldo_token_address
+
+LocalEvm = pytest.importorskip('utils.local_evm', reason='needs py-evm 0.5.0a3, see README').LocalEvm
+
+contract_address = '0x' + '42' * 20
+
+
+def accounts_of(evm):
+    return [to_checksum_address(address) for address in evm.keys]
+
+
+def change_state(evm):
+    sender, recipient = accounts_of(evm)[:2]
+    evm.send_transaction({'from': sender, 'to': recipient, 'value': hex(10**18)})
+    evm.set_storage(contract_address, '0x1', '0x' + '07'.rjust(64, '0'))
+
+
+@pytest.fixture(scope='function')
+def recorded_state():
+    evm = LocalEvm(accounts=2)
+    evm.set_code(contract_address, '0x6000')
+    evm.record_state()
+    change_state(evm)
+    return evm, evm.dump_state()
+
+
+def fresh_evm():
+    evm = LocalEvm(accounts=2)
+    evm.set_code(contract_address, '0x6000')
+    return evm
+
+
+def test_dumped_state_loads_on_another_chain(recorded_state):
+    source, dump = recorded_state
+    evm = fresh_evm()
+    sender, recipient = accounts_of(evm)
+    number = evm.head().block_number
+
+    assert evm.load_state(dump)
+
+    state = evm.state_at('latest')
+    assert evm.head().block_number == number + 1
+    assert evm.head().timestamp >= source.head().timestamp
+    assert state.get_balance(bytes.fromhex(recipient[2:])) == 101 * 10**18
+    assert state.get_nonce(bytes.fromhex(sender[2:])) == 1
+    assert state.get_storage(bytes.fromhex(contract_address[2:]), 1) == 7
+    assert state.get_code(bytes.fromhex(contract_address[2:])) == bytes.fromhex('6000')
+
+
+def test_dump_keeps_only_changed_accounts(recorded_state):
+    evm = fresh_evm()
+    evm.set_storage(ldo_token_address, '0x0', '0x' + '01'.rjust(64, '0'))
+
+    assert evm.load_state(recorded_state[1])
+    assert evm.state_at('latest').get_storage(bytes.fromhex(ldo_token_address[2:]), 0) == 1
+
+
+def test_dump_does_not_load_over_changed_accounts(recorded_state):
+    evm = fresh_evm()
+    change_state(evm)
+    head = evm.head()
+
+    assert not evm.load_state(recorded_state[1])
+    assert evm.head() == head
+
+
+@pytest.mark.local_evm_only
+def test_cache_loads_stored_setup(deployer, tmp_path):
+    cache = ChainStateCache(web3, str(tmp_path), sources='sources')
+    calls = []
+
+    def deploy_gauge(owner):
+        calls.append(owner)
+        return BalancerLiquidityGaugeMock.deploy(owner, ldo_token_address, {"from": owner}).address
+
+    chain.snapshot()
+    address = cache.load_or_run('gauge', deploy_gauge, deployer)
+    assert cache.recorded == 1
+    chain.revert()
+    assert web3.eth.get_code(address) == b''
+
+    assert cache.load_or_run('gauge', deploy_gauge, deployer) == address
+    assert (cache.loaded, len(calls)) == (1, 1)
+    assert BalancerLiquidityGaugeMock.at(address).reward()[1] == deployer
+
+
+@pytest.mark.local_evm_only
+def test_cache_runs_setup_when_state_differs(deployer, stranger, tmp_path):
+    cache = ChainStateCache(web3, str(tmp_path), sources='sources')
+
+    def deploy_gauge(owner):
+        return BalancerLiquidityGaugeMock.deploy(owner, ldo_token_address, {"from": owner}).address
+
+    chain.snapshot()
+    first = cache.load_or_run('gauge', deploy_gauge, deployer)
+    chain.revert()
+    # the deployer nonce moves the next contract elsewhere, the stored state doesn't apply
+    stranger.transfer(deployer, 0)
+    deployer.transfer(stranger, 0)
+
+    assert cache.load_or_run('gauge', deploy_gauge, deployer) != first
+    assert (cache.loaded, cache.recorded) == (0, 2)
+
+
+def test_cache_key_covers_setup_code_and_sources(tmp_path):
+    def setup():
+        return 1
+
+    def other_setup():
+        return 2
+
+    cache = ChainStateCache(web3, str(tmp_path), sources='sources')
+    assert cache.key('name', setup) == cache.key('name', setup)
+    assert cache.key('name', setup) != cache.key('name', other_setup)
+    assert cache.key('name', setup) != cache.key('name', setup, key_args=(1,))
+    assert cache.key('name', setup) != ChainStateCache(web3, str(tmp_path), sources='other').key('name', setup)
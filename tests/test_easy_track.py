@@ -0,0 +1,185 @@
+import pytest
+from brownie import accounts, chain, reverts, RewardsManager
+from utils.config import lido_dao_voting_address
+from utils.easy_track import (
+    MAX_MANAGERS,
+    encode_top_up_calldata,
+    top_up_script,
+    top_up_permissions,
+    create_top_up_motion
+)
+from utils.evm_script import decode_call_script_calls
+
+period_duration = 30 * 24 * 3600
+
+
+def allow(factory, managers, ldo_agent):
+    for manager in managers:
+        factory.add_manager(manager, {"from": ldo_agent})
+
+
+def test_create_evm_script_matches_helper(top_up_factory, top_up_trusted_caller, ldo_agent, accounts):
+    managers = [accounts[2], accounts[3], accounts[4]]
+    amounts = [10**18, 2 * 10**18, 3 * 10**18]
+    allow(top_up_factory, managers, ldo_agent)
+
+    script = top_up_factory.createEVMScript(top_up_trusted_caller, encode_top_up_calldata(managers, amounts))
+
+    assert script == top_up_script(top_up_factory, managers, amounts)
+    calls = list(decode_call_script_calls(script))
+    assert len(calls) == len(managers) + 1
+
+
+def test_create_evm_script_for_max_managers(top_up_factory, top_up_trusted_caller, ldo_agent, accounts):
+    managers = [accounts.add() for _ in range(MAX_MANAGERS)]
+    amounts = [10**18] * MAX_MANAGERS
+    allow(top_up_factory, managers, ldo_agent)
+
+    script = top_up_factory.createEVMScript(top_up_trusted_caller, encode_top_up_calldata(managers, amounts))
+
+    assert script == top_up_script(top_up_factory, managers, amounts)
+
+
+def test_create_evm_script_checks_creator(top_up_factory, ldo_agent, stranger, accounts):
+    allow(top_up_factory, [accounts[2]], ldo_agent)
+    with reverts("creator not permitted"):
+        top_up_factory.createEVMScript(stranger, encode_top_up_calldata([accounts[2]], [10**18]))
+
+
+def test_create_evm_script_checks_allow_list(top_up_factory, top_up_trusted_caller, ldo_agent, accounts):
+    allow(top_up_factory, [accounts[2]], ldo_agent)
+    calldata = encode_top_up_calldata([accounts[2], accounts[3]], [10**18, 10**18])
+    with reverts("manager not allowed"):
+        top_up_factory.createEVMScript(top_up_trusted_caller, calldata)
+
+    top_up_factory.add_manager(accounts[3], {"from": ldo_agent})
+    top_up_factory.createEVMScript(top_up_trusted_caller, calldata)
+
+    top_up_factory.remove_manager(accounts[2], {"from": ldo_agent})
+    with reverts("manager not allowed"):
+        top_up_factory.createEVMScript(top_up_trusted_caller, calldata)
+
+
+def test_create_evm_script_checks_amounts(top_up_factory, top_up_trusted_caller, ldo_agent, accounts):
+    allow(top_up_factory, [accounts[2], accounts[3]], ldo_agent)
+    with reverts("zero amount"):
+        top_up_factory.createEVMScript(
+            top_up_trusted_caller,
+            encode_top_up_calldata([accounts[2], accounts[3]], [10**18, 0])
+        )
+    with reverts("wrong call data length"):
+        top_up_factory.createEVMScript(top_up_trusted_caller, '0x' + '00' * 64)
+    with reverts("empty top up"):
+        top_up_factory.createEVMScript(top_up_trusted_caller, '0x' + '00' * 1024)
+
+
+def test_create_evm_script_checks_limit(top_up_factory, top_up_trusted_caller, ldo_agent, accounts):
+    limit = top_up_factory.limit()
+    allow(top_up_factory, [accounts[2], accounts[3]], ldo_agent)
+
+    top_up_factory.createEVMScript(
+        top_up_trusted_caller,
+        encode_top_up_calldata([accounts[2], accounts[3]], [limit // 2, limit // 2])
+    )
+    with reverts("limit exceeded"):
+        top_up_factory.createEVMScript(
+            top_up_trusted_caller,
+            encode_top_up_calldata([accounts[2], accounts[3]], [limit // 2, limit // 2 + 1])
+        )
+
+
+def test_update_spent_amount(top_up_factory, evm_script_executor, stranger):
+    limit = top_up_factory.limit()
+    with reverts("not permitted"):
+        top_up_factory.update_spent_amount(1, {"from": stranger})
+
+    tx = top_up_factory.update_spent_amount(limit - 1, {"from": evm_script_executor})
+    assert tx.events["SpentAmountUpdated"]["spentInPeriod"] == limit - 1
+    assert top_up_factory.spendable() == 1
+
+    with reverts("limit exceeded"):
+        top_up_factory.update_spent_amount(2, {"from": evm_script_executor})
+
+
+def test_limit_resets_every_period(top_up_factory, evm_script_executor, helpers):
+    limit = top_up_factory.limit()
+    period_start = top_up_factory.period_start()
+    top_up_factory.update_spent_amount(limit, {"from": evm_script_executor})
+    assert top_up_factory.spendable() == 0
+
+    # skipped periods are not carried over, the new one starts on the period grid
+    helpers.warp_to(period_start + 2 * period_duration + 100)
+    assert top_up_factory.spendable() == limit
+
+    top_up_factory.update_spent_amount(1, {"from": evm_script_executor})
+    assert top_up_factory.period_start() == period_start + 2 * period_duration
+    assert top_up_factory.spent_in_period() == 1
+
+
+def test_admin_functions_are_owner_only(top_up_factory, stranger, ldo_agent):
+    with reverts("not permitted"):
+        top_up_factory.add_manager(stranger, {"from": stranger})
+    with reverts("not permitted"):
+        top_up_factory.remove_manager(stranger, {"from": stranger})
+    with reverts("not permitted"):
+        top_up_factory.set_limit(1, 1, {"from": stranger})
+
+    tx = top_up_factory.set_limit(10**18, 7 * 24 * 3600, {"from": ldo_agent})
+    assert tx.events["LimitUpdated"]["limit"] == 10**18
+    assert top_up_factory.limit() == 10**18
+    assert top_up_factory.period_duration() == 7 * 24 * 3600
+
+
+def test_encode_top_up_calldata_checks_lengths(accounts):
+    with pytest.raises(ValueError):
+        encode_top_up_calldata([accounts[2]], [1, 2])
+    with pytest.raises(ValueError):
+        encode_top_up_calldata([], [])
+    with pytest.raises(ValueError):
+        encode_top_up_calldata([accounts[2]] * (MAX_MANAGERS + 1), [1] * (MAX_MANAGERS + 1))
+
+
+def test_top_up_motion_lifecycle(
+    easytrack_contract,
+    top_up_factory,
+    top_up_trusted_caller,
+    rewards_contract_mock,
+    ldo_agent,
+    ldo_token,
+    deployer
+):
+    managers = [
+        RewardsManager.deploy(ldo_agent, 10**18, rewards_contract_mock, {"from": deployer})
+        for _ in range(3)
+    ]
+    amounts = [100 * 10**18, 200 * 10**18, 300 * 10**18]
+    allow(top_up_factory, managers, ldo_agent)
+
+    dao_voting = accounts.at(lido_dao_voting_address, force=True)
+    easytrack_contract.addEVMScriptFactory(
+        top_up_factory,
+        top_up_permissions(top_up_factory),
+        {"from": dao_voting}
+    )
+
+    motion_id, calldata, tx = create_top_up_motion(
+        easytrack_contract, top_up_factory, managers, amounts, {"from": top_up_trusted_caller}
+    )
+    assert tx.events["MotionCreated"]["_evmScript"] == top_up_script(top_up_factory, managers, amounts)
+
+    chain.sleep(easytrack_contract.motionDuration() + 1)
+    chain.mine()
+
+    balances = [ldo_token.balanceOf(manager) for manager in managers]
+    easytrack_contract.enactMotion(motion_id, calldata, {"from": top_up_trusted_caller})
+
+    for manager, amount, balance in zip(managers, amounts, balances):
+        assert ldo_token.balanceOf(manager) == balance + amount
+    assert top_up_factory.spent_in_period() == sum(amounts)
+
+    with reverts("limit exceeded"):
+        easytrack_contract.createMotion(
+            top_up_factory,
+            encode_top_up_calldata(managers[:1], [top_up_factory.spendable() + 1]),
+            {"from": top_up_trusted_caller}
+        )
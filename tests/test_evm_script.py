@@ -0,0 +1,97 @@
+import pytest
+import eth_abi
+from eth_utils import function_signature_to_4byte_selector
+from utils.evm_script import (
+    EMPTY_CALLSCRIPT,
+    create_executor_id,
+    encode_call_script,
+    encode_call_script_bytes,
+    decode_call_script,
+    decode_call_script_calls,
+    validate_call_script
+)
+
+target_address = '0xb842afd82d940ff5d8f6ef3399572592ebf182b0'
+calldata = '0xa9059cbb' + '00' * 12 + 'b842afd82d940ff5d8f6ef3399572592ebf182b0' + '00' * 31 + '01'
+
+
+def test_encode_empty_call_script():
+    assert encode_call_script([]) == EMPTY_CALLSCRIPT
+    assert encode_call_script([]) == create_executor_id(1)
+
+
+def test_encode_call_script_layout():
+    script = encode_call_script([(target_address, calldata), (target_address, '0x')])
+    assert script == (
+        '0x00000001'
+        + target_address[2:] + '00000044' + calldata[2:]
+        + target_address[2:] + '00000000'
+    )
+
+
+def test_encode_call_script_accepts_bytes():
+    script = encode_call_script([(bytes.fromhex(target_address[2:]), bytes.fromhex(calldata[2:]))])
+    assert script == encode_call_script([(target_address, calldata[2:])])
+
+
+def test_encode_call_script_bytes_matches_hex():
+    actions = [(target_address, calldata)] * 100
+    script = encode_call_script_bytes(actions)
+    assert isinstance(script, bytes)
+    assert '0x' + script.hex() == encode_call_script(actions)
+    assert len(script) == 4 + 100 * (20 + 4 + 68)
+
+
+def test_decode_call_script_round_trip():
+    actions = [(target_address, calldata), (target_address, '0x')]
+    decoded = list(decode_call_script(encode_call_script(actions)))
+
+    assert len(decoded) == 2
+    assert decoded[0][0] == target_address
+    assert decoded[0][1] == calldata[:10]
+    assert '0x' + decoded[0][2].hex() == calldata
+    assert decoded[1][2].nbytes == 0
+
+
+def test_decode_call_script_does_not_copy_calldata():
+    script = encode_call_script_bytes([(target_address, calldata)] * 1000)
+    for _, _, data in decode_call_script(script):
+        assert isinstance(data, memoryview)
+        assert data.obj is script
+
+
+def test_decode_call_script_rejects_malformed_scripts():
+    script = encode_call_script([(target_address, calldata)])
+
+    with pytest.raises(ValueError, match='unexpected executor id'):
+        list(decode_call_script('0x00000002' + script[10:]))
+
+    with pytest.raises(ValueError, match='truncated calldata'):
+        list(decode_call_script(script[:-2]))
+
+    with pytest.raises(ValueError, match='truncated action header'):
+        list(decode_call_script(EMPTY_CALLSCRIPT + target_address[2:]))
+
+
+def test_validate_call_script():
+    assert validate_call_script(EMPTY_CALLSCRIPT) == 0
+    assert validate_call_script(encode_call_script([(target_address, calldata)] * 3)) == 3
+
+
+def test_decode_call_script_calls_with_interface_abis():
+    vote_calldata = (
+        '0x' + function_signature_to_4byte_selector('newVote(bytes,string,bool,bool)').hex()
+        + eth_abi.encode_abi(
+            ['bytes', 'string', 'bool', 'bool'],
+            [bytes.fromhex(EMPTY_CALLSCRIPT[2:]), 'desc', False, False]
+        ).hex()
+    )
+    script = encode_call_script([(target_address, vote_calldata), (target_address, '0xdeadbeef')])
+    calls = list(decode_call_script_calls(script))
+
+    assert calls[0] == (
+        target_address,
+        'newVote(bytes,string,bool,bool)',
+        (bytes.fromhex(EMPTY_CALLSCRIPT[2:]), 'desc', False, False)
+    )
+    assert calls[1] == (target_address, '0xdeadbeef', None)
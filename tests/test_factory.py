@@ -0,0 +1,174 @@
+import re
+from pathlib import Path
+
+import pytest
+
+from brownie import reverts, ZERO_ADDRESS, RewardsManagerImplementation, BalancerLiquidityGaugeMock
+from utils.proxy import predict_manager_address
+
+salt = "0x" + "01" * 32
+
+
+def deploy_manager(factory, owner, rewards_contract, deployer):
+    tx = factory.deploy_manager(owner, 10**18, rewards_contract, {"from": deployer})
+    return RewardsManagerImplementation.at(tx.events["RewardsManagerDeployed"]["manager"]), tx
+
+
+def test_deploy_manager(
+    rewards_manager_factory,
+    rewards_contract_mock,
+    ldo_agent,
+    deployer,
+    helpers
+):
+    manager, tx = deploy_manager(rewards_manager_factory, ldo_agent, rewards_contract_mock, deployer)
+
+    assert manager.owner() == ldo_agent
+    assert manager.rewards_contract() == rewards_contract_mock
+    assert manager.weekly_amount() == 0
+    assert manager.status()["min_rewards_amount"] == 10**18
+    helpers.assert_single_event_named(
+        "RewardsManagerDeployed",
+        tx,
+        {
+            "manager": manager,
+            "owner": ldo_agent,
+            "rewardsContract": rewards_contract_mock,
+            "minRewardsAmount": 10**18
+        }
+    )
+
+
+def test_manager_can_not_be_initialized_twice(
+    rewards_manager_factory,
+    rewards_manager_implementation,
+    rewards_contract_mock,
+    ldo_agent,
+    deployer,
+    stranger
+):
+    manager, _ = deploy_manager(rewards_manager_factory, ldo_agent, rewards_contract_mock, deployer)
+
+    with reverts("already initialized"):
+        manager.initialize(stranger, 0, rewards_contract_mock, {"from": stranger})
+    with reverts("already initialized"):
+        rewards_manager_implementation.initialize(stranger, 0, rewards_contract_mock, {"from": stranger})
+
+
+def test_deploy_manager_fails_on_zero_owner(rewards_manager_factory, rewards_contract_mock, deployer):
+    with reverts("zero address not allowed"):
+        rewards_manager_factory.deploy_manager(ZERO_ADDRESS, 10**18, rewards_contract_mock, {"from": deployer})
+
+
+def test_deploy_manager_deterministic(
+    rewards_manager_factory,
+    rewards_manager_implementation,
+    rewards_contract_mock,
+    ldo_agent,
+    deployer
+):
+    tx = rewards_manager_factory.deploy_manager_deterministic(
+        ldo_agent, 10**18, rewards_contract_mock, salt, {"from": deployer}
+    )
+
+    assert tx.events["RewardsManagerDeployed"]["manager"] == predict_manager_address(
+        rewards_manager_factory, rewards_manager_implementation, ldo_agent, 10**18, rewards_contract_mock, salt
+    )
+
+    with reverts():
+        rewards_manager_factory.deploy_manager_deterministic(
+            ldo_agent, 10**18, rewards_contract_mock, salt, {"from": deployer}
+        )
+
+
+def test_deploy_manager_deterministic_address_depends_on_owner(
+    rewards_manager_factory,
+    rewards_manager_implementation,
+    rewards_contract_mock,
+    ldo_agent,
+    deployer,
+    stranger
+):
+    tx = rewards_manager_factory.deploy_manager_deterministic(
+        stranger, 10**18, rewards_contract_mock, salt, {"from": stranger}
+    )
+    taken = tx.events["RewardsManagerDeployed"]["manager"]
+    predicted = predict_manager_address(
+        rewards_manager_factory, rewards_manager_implementation, ldo_agent, 10**18, rewards_contract_mock, salt
+    )
+    assert taken != predicted
+
+    # the same salt with another owner doesn't block the predicted manager
+    tx = rewards_manager_factory.deploy_manager_deterministic(
+        ldo_agent, 10**18, rewards_contract_mock, salt, {"from": deployer}
+    )
+    assert tx.events["RewardsManagerDeployed"]["manager"] == predicted
+    assert RewardsManagerImplementation.at(predicted).owner() == ldo_agent
+
+
+def test_deploy_managers(rewards_manager_factory, ldo_agent, ldo_token, deployer):
+    gauges = [
+        BalancerLiquidityGaugeMock.deploy(deployer, ldo_token, {"from": deployer})
+        for _ in range(3)
+    ]
+    tx = rewards_manager_factory.deploy_managers(
+        ldo_agent, 10**18, gauges + [ZERO_ADDRESS] * (32 - len(gauges)), {"from": deployer}
+    )
+
+    assert tx.return_value == len(gauges)
+    events = tx.events["RewardsManagerDeployed"]
+    assert [e["rewardsContract"] for e in events] == gauges
+    assert len(set(e["manager"] for e in events)) == len(gauges)
+
+
+def test_cloned_manager_starts_rewards_period(
+    rewards_manager_factory,
+    rewards_contract_mock,
+    ldo_agent,
+    ldo_token,
+    dao_treasury,
+    deployer,
+    stranger,
+    helpers
+):
+    manager, _ = deploy_manager(rewards_manager_factory, ldo_agent, rewards_contract_mock, deployer)
+    rewards_contract_mock.set_reward_distributor(ldo_token, manager, {"from": deployer})
+    ldo_token.transfer(manager, 10**18, {"from": dao_treasury})
+
+    tx = manager.start_next_rewards_period({"from": stranger})
+
+    helpers.assert_single_event_named("NewRewardsPeriodStarted", tx, {"amount": 10**18 // 4})
+    assert ldo_token.balanceOf(rewards_contract_mock) == 10**18 // 4
+    assert manager.rewards_iteration() == 1
+
+    with reverts("manager: rewards period not finished"):
+        manager.start_next_rewards_period({"from": stranger})
+
+
+def contract_blocks(name):
+    """Top level definitions of a contract source, blocks are separated by two blank lines."""
+    source = (Path(__file__).parent.parent / "contracts" / f"{name}.vy").read_text()
+    return source.split("\n\n\n")
+
+
+def test_implementation_matches_rewards_manager():
+    # the implementation keeps owner and min_rewards_amount in storage instead of immutables
+    # and is set up by initialize(), everything else is expected to be a copy of RewardsManager
+    storage = {
+        "self.min_rewards_amount": "min_rewards_amount",
+        "self.owner": "owner",
+        "min_rewards_amount: uint256": "min_rewards_amount: immutable(uint256)",
+        "owner: public(address)": "owner: immutable(address)",
+    }
+    setup = re.compile(r"^def (__init__|initialize|owner)\(", re.MULTILINE)
+
+    def body(name):
+        blocks = []
+        for block in contract_blocks(name)[1:]:
+            for old, new in storage.items():
+                block = block.replace(old, new)
+            if not setup.search(block):
+                blocks.append(block)
+        return blocks
+
+    assert body("RewardsManagerImplementation") == body("RewardsManager")
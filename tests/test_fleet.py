@@ -0,0 +1,185 @@
+import json
+import asyncio
+
+import aiohttp
+import pytest
+from brownie import web3, BalancerLiquidityGaugeMock, LegacyRewardsManager, RewardsManager
+from eth_abi.exceptions import DecodingError
+
+from utils.config import ldo_token_address
+from utils.fleet import Fleet, RpcError, load_deployments
+from utils.keeper import STATUS_OK, STATUS_PERIOD_NOT_FINISHED
+from utils.metrics import Metrics
+
+
+def write_json(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+
+def test_load_deployments(tmp_path):
+    write_json(tmp_path / 'deployed-mainnet.json', {'balancerRewardsManager': {'baseAddress': '0x01'}})
+    write_json(tmp_path / 'deployed-managers-mainnet.json', {
+        'balancerRewardsManagers': [{'baseAddress': '0x02'}, {'baseAddress': '0x03'}]
+    })
+    write_json(tmp_path / 'deployed-factory-goerli.json', {'rewardsManagerFactory': {'baseAddress': '0x04'}})
+
+    assert load_deployments(str(tmp_path)) == {'mainnet': ['0x01', '0x02', '0x03']}
+
+
+def deploy_manager(owner, deployer):
+    gauge = BalancerLiquidityGaugeMock.deploy(deployer, ldo_token_address, {"from": deployer})
+    manager = RewardsManager.deploy(owner, 10**18, gauge, {"from": deployer})
+    gauge.set_reward_distributor(ldo_token_address, manager, {"from": deployer})
+    return manager
+
+
+def deploy_legacy_manager(owner, deployer):
+    gauge = BalancerLiquidityGaugeMock.deploy(deployer, ldo_token_address, {"from": deployer})
+    manager = LegacyRewardsManager.deploy(owner, 10**18, gauge, {"from": deployer})
+    gauge.set_reward_distributor(ldo_token_address, manager, {"from": deployer})
+    return manager
+
+
+def run_fleet(managers, action, keeper=None, endpoints=None, metrics=None):
+    endpoints = endpoints if endpoints is not None else {'development': web3.provider.endpoint_uri}
+    deployments = {network: [str(manager) for manager in managers] for network in endpoints}
+
+    async def run():
+        async with Fleet(endpoints, deployments, keeper and keeper.private_key, metrics=metrics) as fleet:
+            return await action(fleet)
+
+    return asyncio.run(run())
+
+
+@pytest.fixture(scope='function')
+def keeper(accounts, deployer):
+    account = accounts.add()
+    deployer.transfer(account, 10**18)
+    return account
+
+
+def test_statuses_read_current_and_legacy_managers(ldo_agent, ldo_token, dao_treasury, deployer):
+    managers = [deploy_manager(ldo_agent, deployer), deploy_legacy_manager(ldo_agent, deployer)]
+    for manager in managers:
+        ldo_token.transfer(manager, 10**18, {"from": dao_treasury})
+
+    current, legacy = run_fleet(managers, lambda fleet: fleet.statuses())
+
+    for status, manager in zip((current, legacy), managers):
+        assert 'error' not in status
+        assert status['manager'] == manager
+        assert status['rewards_contract'] == manager.rewards_contract()
+        assert status['ldo_balance'] == 10**18
+        assert status['reason'] == STATUS_OK
+        assert status['can_start']
+
+
+def test_legacy_status_follows_started_period(ldo_agent, ldo_token, dao_treasury, deployer, stranger):
+    manager = deploy_legacy_manager(ldo_agent, deployer)
+    ldo_token.transfer(manager, 10**18, {"from": dao_treasury})
+    manager.start_next_rewards_period({"from": stranger})
+
+    async def legacy_status(fleet):
+        now = await fleet.chain_time('development')
+        return await fleet.legacy_status('development', str(manager), now)
+
+    status = run_fleet([manager], legacy_status)
+
+    assert status['rewards_iteration'] == 1
+    assert status['weekly_amount'] == 10**18 // 4
+    assert status['period_finish'] == manager.period_finish()
+    assert status['balancer_period_finish'] == manager.balancer_period_finish()
+    assert status['reason'] == STATUS_PERIOD_NOT_FINISHED
+    assert not status['can_start']
+
+
+def test_statuses_report_failures_per_entry(ldo_agent, deployer, stranger):
+    manager = deploy_manager(ldo_agent, deployer)
+    metrics = Metrics()
+    endpoints = {'development': web3.provider.endpoint_uri, 'offline': 'http://127.0.0.1:1'}
+
+    # an account without code returns empty data, its legacy views can't be decoded either
+    statuses = run_fleet([manager, stranger], lambda fleet: fleet.statuses(), endpoints=endpoints, metrics=metrics)
+    by_entry = {(status['network'], status['manager']): status for status in statuses}
+
+    assert 'error' not in by_entry[('development', str(manager))]
+    assert isinstance(by_entry[('development', str(stranger))]['error'], DecodingError)
+    assert isinstance(by_entry[('offline', str(manager))]['error'], aiohttp.ClientError)
+    assert not any(status['can_start'] for status in statuses if 'error' in status)
+    assert metrics.value('fleet_status_failures_total', network='offline') == 2
+
+
+def test_rpc_error_is_revert():
+    assert RpcError('execution reverted', code=3).is_revert
+    assert RpcError('execution reverted', code=-32000).is_revert
+    assert RpcError('VM Exception while processing transaction: revert', code=-32000).is_revert
+    assert not RpcError('header not found', code=-32000).is_revert
+    assert not RpcError('rate limited', code=429).is_revert
+
+
+def test_start_due_starts_due_managers(ldo_agent, ldo_token, dao_treasury, deployer, keeper):
+    managers = [deploy_manager(ldo_agent, deployer) for _ in range(3)]
+    for manager in managers[:2]:
+        ldo_token.transfer(manager, 10**18, {"from": dao_treasury})
+
+    results = run_fleet(managers, lambda fleet: fleet.start_due(), keeper=keeper)
+
+    assert sorted(status['manager'] for status, _ in results) == sorted(str(m) for m in managers[:2])
+    for status, tx_hash in results:
+        assert web3.eth.get_transaction_receipt(tx_hash)['status'] == 1
+    assert [manager.rewards_iteration() for manager in managers] == [1, 1, 0]
+    assert keeper.nonce == 2
+
+
+def test_start_does_not_send_reverting_transactions(ldo_agent, deployer, keeper):
+    manager = deploy_manager(ldo_agent, deployer)
+
+    async def start(fleet):
+        with pytest.raises(RpcError):
+            await fleet.start('development', str(manager))
+        return fleet.nonces['development'].nonce
+
+    assert run_fleet([manager], start, keeper=keeper) is None
+    assert keeper.nonce == 0
+
+
+def test_failed_send_leaves_no_nonce_gap(ldo_agent, ldo_token, dao_treasury, deployer, keeper):
+    managers = [deploy_manager(ldo_agent, deployer) for _ in range(2)]
+    for manager in managers:
+        ldo_token.transfer(manager, 10**18, {"from": dao_treasury})
+    metrics = Metrics()
+
+    async def start(fleet):
+        await fleet.start('development', str(managers[0]))
+        # another tool takes the nonce the fleet has handed out next
+        keeper.transfer(deployer, 0)
+        with pytest.raises(RpcError):
+            await fleet.start('development', str(managers[1]))
+        assert fleet.nonces['development'].nonce is None
+        return await fleet.start('development', str(managers[1]))
+
+    tx_hash = run_fleet(managers, start, keeper=keeper, metrics=metrics)
+
+    assert web3.eth.get_transaction(tx_hash)['nonce'] == 2
+    assert [manager.rewards_iteration() for manager in managers] == [1, 1]
+    assert keeper.nonce == 3
+    assert metrics.value('fleet_tx_failures_total', network='development') == 1
+
+
+def test_nonce_manager_hands_out_consecutive_nonces(deployer, keeper):
+    metrics = Metrics()
+    keeper.transfer(deployer, 0)
+
+    async def nonces(fleet):
+        nonce_manager = fleet.nonces['development']
+        first = await asyncio.gather(*[nonce_manager.next() for _ in range(3)])
+        nonce_manager.reset()
+        return first, await nonce_manager.next()
+
+    first, after_reset = run_fleet([], nonces, keeper=keeper, metrics=metrics)
+
+    assert first == [1, 2, 3]
+    # nothing was sent, the reset reads the same nonce from the node again
+    assert after_reset == 1
+    assert metrics.summary('fleet_rpc_seconds', network='development', method='eth_getTransactionCount')[0] == 2
@@ -0,0 +1,71 @@
+import pytest
+
+pytest.importorskip('utils.local_evm', reason='needs py-evm 0.5.0a3, see README')
+
+from utils.fuzzer import (  # noqa: E402
+    Harness,
+    Runner,
+    InvariantViolation,
+    SECONDS_PER_WEEK,
+    run_batch,
+    run_campaign,
+    shrink
+)
+
+
+@pytest.fixture(scope='module')
+def harness():
+    return Harness()
+
+
+def test_random_sequences_hold_invariants(harness):
+    result = run_batch(0, 3, 30, harness=harness)
+
+    assert result['failure'] is None
+    assert result['steps'] == 90
+    assert result['executions'] > result['steps']
+
+
+def test_replay_starts_from_deployed_state(harness):
+    runner = Runner(harness)
+    sequence = [('top_up', 4 * 10**18), ('start',), ('sleep', SECONDS_PER_WEEK), ('start',)]
+
+    assert runner.replay(sequence) is None
+    assert harness.status()['rewards_iteration'] == 2
+    assert runner.replay([]) is None
+    assert harness.status()['rewards_iteration'] == 0
+    assert harness.ldo_balance(harness.manager) == 0
+
+
+def test_broken_invariant_is_shrunk(harness):
+    def at_most_one_period(runner):
+        if runner.harness.status()['rewards_iteration'] >= 2:
+            raise InvariantViolation('one period', 'second period started')
+
+    runner = Runner(harness, invariants=[at_most_one_period])
+    sequence = [
+        ('top_up', 7 * 10**18),
+        ('set_rewards_contract', 1),
+        ('sleep', 3 * SECONDS_PER_WEEK),
+        ('start',),
+        ('recover', 1),
+        ('sleep', 2 * SECONDS_PER_WEEK),
+        ('hand_back',),
+        ('start',),
+        ('start',),
+    ]
+    index, error = runner.replay(sequence)
+    assert (index, error.invariant) == (7, 'one period')
+
+    shrunk = shrink(runner, sequence, 'one period')
+
+    assert shrunk == [('top_up', 10**18), ('start',), ('sleep', SECONDS_PER_WEEK), ('start',)]
+
+
+def test_campaign_runs_on_a_process_pool():
+    result = run_campaign(sequences=4, length=10, workers=2, batch_size=2)
+
+    assert result['workers'] == 2
+    assert result['sequences'] == 4
+    assert result['failures'] == []
+    assert result['executions_per_second'] > 0
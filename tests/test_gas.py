@@ -0,0 +1,265 @@
+import pytest
+from brownie import (
+    chain,
+    ZERO_ADDRESS,
+    BalancerLiquidityGaugeMock,
+    LegacyRewardsManager,
+    MiniMeTokenMock,
+    RewardsManager
+)
+from eth_utils import to_canonical_address, to_checksum_address
+from utils.config import lido_dao_voting_address, ldo_token_address
+from utils.easy_track import encode_top_up_calldata, top_up_permissions, create_top_up_motion
+from utils.voting import encode_calldata
+
+random_address = "0xb842afd82d940ff5d8f6ef3399572592ebf182b0"
+rewards_period = 3600 * 24 * 7
+
+
+def test_gas_start_next_rewards_period_recalculation(
+    rewards_manager,
+    ldo_token,
+    dao_treasury,
+    stranger,
+    gas_snapshot
+):
+    ldo_token.transfer(rewards_manager, 4 * 10**18, {"from": dao_treasury})
+    assert rewards_manager.rewards_iteration() == 0
+
+    tx = rewards_manager.start_next_rewards_period({"from": stranger})
+    assert "WeeklyRewardsAmountUpdated" in tx.events
+
+    gas_snapshot.check("start_next_rewards_period_recalculation", tx)
+
+
+def test_gas_start_next_rewards_period_steady_state(
+    rewards_manager,
+    ldo_token,
+    dao_treasury,
+    stranger,
+    gas_snapshot
+):
+    ldo_token.transfer(rewards_manager, 4 * 10**18, {"from": dao_treasury})
+    rewards_manager.start_next_rewards_period({"from": stranger})
+    chain.sleep(rewards_period)
+    chain.mine()
+    assert rewards_manager.rewards_iteration() == 1
+
+    tx = rewards_manager.start_next_rewards_period({"from": stranger})
+    assert "WeeklyRewardsAmountUpdated" not in tx.events
+
+    gas_snapshot.check("start_next_rewards_period_steady_state", tx)
+
+
+def weekly_start_gas_used(manager_contract):
+    """
+    Gas of the second, weekly, `start_next_rewards_period` of a fresh manager
+    on a London local EVM. The test chains run Istanbul, where clearing the
+    per-week allowance of the old contract is refunded in full, on mainnet
+    EIP-3529 caps that refund.
+    """
+    local_evm = pytest.importorskip('utils.local_evm', reason='needs py-evm 0.5.0a3, see README')
+    evm = local_evm.LocalEvm(accounts=2, hardfork='london')
+    owner, stranger = [to_checksum_address(address) for address in evm.keys]
+
+    def deploy(container, *args):
+        return evm.receipt(evm.send_transaction({'from': owner, 'data': container.deploy.encode_input(*args)}))['contractAddress']
+
+    def transact(sender, to, signature, types=(), args=()):
+        tx_hash = evm.send_transaction({'from': sender, 'to': to, 'data': encode_calldata(signature, types, args)})
+        return int(evm.receipt(tx_hash)['gasUsed'], 16)
+
+    token = deploy(MiniMeTokenMock)
+    evm.set_code(ldo_token_address, local_evm.hex_data(evm.state_at('latest').get_code(to_canonical_address(token))))
+    gauge = deploy(BalancerLiquidityGaugeMock, owner, ldo_token_address)
+    manager = deploy(manager_contract, owner, 10**18, gauge)
+    transact(owner, gauge, 'set_reward_distributor(address,address)', ['address', 'address'], [ldo_token_address, manager])
+    transact(owner, ldo_token_address, 'mint(address,uint256)', ['address', 'uint256'], [manager, 4 * 10**18])
+
+    transact(stranger, manager, 'start_next_rewards_period()')
+    evm.increase_time(rewards_period)
+    return transact(stranger, manager, 'start_next_rewards_period()')
+
+
+def test_gas_start_next_rewards_period_steady_state_saving():
+    # LegacyRewardsManager is RewardsManager before the packed state and the standing allowance
+    legacy_gas_used = weekly_start_gas_used(LegacyRewardsManager)
+    gas_used = weekly_start_gas_used(RewardsManager)
+
+    print(f"\nweekly start: {legacy_gas_used} -> {gas_used} gas, {legacy_gas_used - gas_used} saved")
+    assert gas_used < legacy_gas_used
+
+
+def test_gas_recover_erc20(
+    rewards_manager,
+    ldo_token,
+    ldo_agent,
+    dao_treasury,
+    stranger,
+    gas_snapshot
+):
+    ldo_token.transfer(rewards_manager, 10**18, {"from": dao_treasury})
+
+    tx = rewards_manager.recover_erc20(ldo_token, 10**18, stranger, {"from": ldo_agent})
+
+    gas_snapshot.check("recover_erc20", tx)
+
+
+def test_gas_set_rewards_contract(rewards_manager, ldo_agent, gas_snapshot):
+    tx = rewards_manager.set_rewards_contract(random_address, {"from": ldo_agent})
+
+    gas_snapshot.check("set_rewards_contract", tx)
+
+
+def test_gas_replace_me_by_other_distributor(
+    rewards_manager,
+    ldo_agent,
+    stranger,
+    gas_snapshot
+):
+    tx = rewards_manager.replace_me_by_other_distributor(stranger, {"from": ldo_agent})
+
+    gas_snapshot.check("replace_me_by_other_distributor", tx)
+
+
+@pytest.mark.parametrize("gauges_count", [1, 4, 16])
+def test_gas_start_next_rewards_periods_per_gauge(
+    multi_gauge_manager,
+    ldo_token,
+    ldo_agent,
+    dao_treasury,
+    deployer,
+    stranger,
+    gauges_count,
+    gas_snapshot
+):
+    gauges = []
+    for _ in range(gauges_count):
+        gauge = BalancerLiquidityGaugeMock.deploy(deployer, ldo_token, {"from": deployer})
+        gauge.set_reward_distributor(ldo_token, multi_gauge_manager, {"from": deployer})
+        gauges.append(gauge)
+
+    ldo_token.transfer(multi_gauge_manager, 4 * 10**18 * gauges_count, {"from": dao_treasury})
+    for gauge in gauges:
+        multi_gauge_manager.add_gauge(gauge, 10**18, {"from": ldo_agent})
+        multi_gauge_manager.allocate(gauge, 4 * 10**18, {"from": ldo_agent})
+
+    gauges_list = gauges + [ZERO_ADDRESS] * (16 - gauges_count)
+    multi_gauge_manager.start_next_rewards_periods(gauges_list, {"from": stranger})
+    chain.sleep(rewards_period)
+    chain.mine()
+
+    tx = multi_gauge_manager.start_next_rewards_periods(gauges_list, {"from": stranger})
+    assert tx.return_value == gauges_count
+
+    gas_used = gas_snapshot.check(f"start_next_rewards_periods_{gauges_count}_gauges", tx)
+    print(f"\n{gauges_count} gauges: {gas_used // gauges_count} gas per gauge")
+
+
+def test_gas_deploy_rewards_manager(rewards_contract_mock, ldo_agent, deployer, gas_snapshot):
+    manager = RewardsManager.deploy(ldo_agent, 10**18, rewards_contract_mock, {"from": deployer})
+
+    gas_snapshot.check("deploy_rewards_manager", manager.tx)
+
+
+def test_gas_deploy_rewards_manager_clone(
+    rewards_manager_factory,
+    rewards_contract_mock,
+    ldo_agent,
+    deployer,
+    gas_snapshot
+):
+    tx = rewards_manager_factory.deploy_manager(ldo_agent, 10**18, rewards_contract_mock, {"from": deployer})
+
+    gas_snapshot.check("deploy_rewards_manager_clone", tx)
+
+
+def test_gas_deploy_rewards_managers_batch(
+    rewards_manager_factory,
+    rewards_contract_mock,
+    ldo_agent,
+    deployer,
+    gas_snapshot
+):
+    batch_size = 16
+    rewards_contracts = [rewards_contract_mock] * batch_size + [ZERO_ADDRESS] * (32 - batch_size)
+    tx = rewards_manager_factory.deploy_managers(ldo_agent, 10**18, rewards_contracts, {"from": deployer})
+
+    gas_used = gas_snapshot.check(f"deploy_rewards_managers_{batch_size}_batch", tx)
+    print(f"\n{batch_size} managers: {gas_used // batch_size} gas per manager")
+
+
+@pytest.mark.parametrize("items_count", [1, 4, 16])
+def test_gas_recover_erc20_batch(
+    rewards_manager,
+    ldo_token,
+    ldo_agent,
+    dao_treasury,
+    accounts,
+    items_count,
+    gas_snapshot
+):
+    ldo_token.transfer(rewards_manager, items_count * 10**18, {"from": dao_treasury})
+
+    tokens = [ldo_token] * items_count + [ZERO_ADDRESS] * (16 - items_count)
+    amounts = [10**18] * 16
+    recipients = [accounts[i % 10] for i in range(16)]
+    tx = rewards_manager.recover_erc20_batch(tokens, amounts, recipients, {"from": ldo_agent})
+    assert tx.return_value == items_count
+
+    gas_used = gas_snapshot.check(f"recover_erc20_batch_{items_count}_items", tx)
+    print(f"\n{items_count} items: {gas_used // items_count} gas per item")
+
+
+@pytest.mark.parametrize("managers_count", [1, 4, 16])
+def test_gas_create_top_up_evm_script(
+    top_up_factory,
+    top_up_trusted_caller,
+    ldo_agent,
+    accounts,
+    managers_count,
+    gas_snapshot
+):
+    managers = [accounts.add() for _ in range(managers_count)]
+    for manager in managers:
+        top_up_factory.add_manager(manager, {"from": ldo_agent})
+
+    calldata = encode_top_up_calldata(managers, [10**18] * managers_count)
+    tx = top_up_factory.createEVMScript.transact(top_up_trusted_caller, calldata, {"from": accounts[0]})
+
+    gas_used = gas_snapshot.check(f"create_top_up_evm_script_{managers_count}_managers", tx)
+    print(f"\n{managers_count} managers: {gas_used // managers_count} gas per manager")
+
+
+@pytest.mark.parametrize("managers_count", [1, 4, 16])
+def test_gas_enact_top_up_motion(
+    easytrack_contract,
+    top_up_factory,
+    top_up_trusted_caller,
+    ldo_agent,
+    accounts,
+    managers_count,
+    gas_snapshot
+):
+    managers = [accounts.add() for _ in range(managers_count)]
+    for manager in managers:
+        top_up_factory.add_manager(manager, {"from": ldo_agent})
+    easytrack_contract.addEVMScriptFactory(
+        top_up_factory,
+        top_up_permissions(top_up_factory),
+        {"from": accounts.at(lido_dao_voting_address, force=True)}
+    )
+    motion_id, calldata, _ = create_top_up_motion(
+        easytrack_contract,
+        top_up_factory,
+        managers,
+        [10**18] * managers_count,
+        {"from": top_up_trusted_caller}
+    )
+    chain.sleep(easytrack_contract.motionDuration() + 1)
+    chain.mine()
+
+    tx = easytrack_contract.enactMotion(motion_id, calldata, {"from": top_up_trusted_caller})
+
+    gas_used = gas_snapshot.check(f"enact_top_up_motion_{managers_count}_managers", tx)
+    print(f"\n{managers_count} managers: {gas_used // managers_count} gas per manager")
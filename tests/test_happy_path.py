@@ -66,16 +66,14 @@ def test_happy_path(
             {"newWeeklyRewardsAmount": rewards_amount}
         )
 
-        chain.sleep(rewards_period - 10) 
-        chain.mine()
+        helpers.warp_to_balancer_period_finish(rewards_manager, before=10)
 
         with reverts("manager: rewards period not finished"):
             rewards_manager.start_next_rewards_period({"from": stranger})
 
         assert ldo_token.balanceOf(rewards_contract) == balance_before + rewards_amount
 
-        chain.sleep(10) 
-        chain.mine()
+        helpers.warp_to_balancer_period_finish(rewards_manager)
 
         for week in range (3):
 
@@ -94,16 +92,14 @@ def test_happy_path(
                 {"amount": rewards_amount}
             )
 
-            chain.sleep(rewards_period - 10) 
-            chain.mine()
+            helpers.warp_to_balancer_period_finish(rewards_manager, before=10)
 
             with reverts("manager: rewards period not finished"):
                 rewards_manager.start_next_rewards_period({"from": stranger})
 
             assert ldo_token.balanceOf(rewards_contract) == balance_before + rewards_amount
 
-            chain.sleep(10) 
-            chain.mine()
+            helpers.warp_to_balancer_period_finish(rewards_manager)
 
 
 def test_acceptance(
@@ -157,16 +153,14 @@ def test_acceptance(
             {"newWeeklyRewardsAmount": rewards_amount}
         )
 
-        chain.sleep(rewards_period - 10) 
-        chain.mine()
+        helpers.warp_to_balancer_period_finish(rewards_manager, before=10)
 
         with reverts("manager: rewards period not finished"):
             rewards_manager.start_next_rewards_period({"from": stranger})
 
         assert ldo_token.balanceOf(rewards_contract) == balance_before + rewards_amount
 
-        chain.sleep(10) 
-        chain.mine()
+        helpers.warp_to_balancer_period_finish(rewards_manager)
 
         for week in range (3):
 
@@ -185,13 +179,11 @@ def test_acceptance(
                 {"amount": rewards_amount}
             )
 
-            chain.sleep(rewards_period - 10) 
-            chain.mine()
+            helpers.warp_to_balancer_period_finish(rewards_manager, before=10)
 
             with reverts("manager: rewards period not finished"):
                 rewards_manager.start_next_rewards_period({"from": stranger})
 
             assert ldo_token.balanceOf(rewards_contract) == balance_before + rewards_amount
 
-            chain.sleep(10) 
-            chain.mine()
\ No newline at end of file
+            helpers.warp_to_balancer_period_finish(rewards_manager)
\ No newline at end of file
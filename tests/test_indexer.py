@@ -0,0 +1,89 @@
+import pytest
+from brownie import chain, web3
+
+from utils.indexer import RewardsIndexer, decode_log
+
+rewards_period = 3600 * 24 * 7
+
+
+@pytest.fixture(scope='function')
+def indexer(rewards_manager, tmp_path):
+    start_block = web3.eth.get_transaction_receipt(rewards_manager.tx.txid)['blockNumber']
+    indexer = RewardsIndexer(web3, rewards_manager.address, str(tmp_path / 'rewards.sqlite'), start_block, confirmations=0)
+    yield indexer
+    indexer.close()
+
+
+def start_periods(rewards_manager, ldo_token, dao_treasury, stranger, count):
+    ldo_token.transfer(rewards_manager, 4 * 10**18, {"from": dao_treasury})
+    for _ in range(count):
+        rewards_manager.start_next_rewards_period({"from": stranger})
+        chain.sleep(rewards_period)
+        chain.mine()
+
+
+def test_indexer_stores_events(indexer, rewards_manager, ldo_token, dao_treasury, stranger, ldo_agent):
+    start_periods(rewards_manager, ldo_token, dao_treasury, stranger, 2)
+    tx = rewards_manager.recover_erc20(ldo_token, 10**18, stranger, {"from": ldo_agent})
+
+    assert indexer.sync() == 5
+    assert [event[3] for event in indexer.events()] == [
+        'RewardsContractUpdated',
+        'WeeklyRewardsAmountUpdated',
+        'NewRewardsPeriodStarted',
+        'NewRewardsPeriodStarted',
+        'ERC20Recovered',
+    ]
+    assert indexer.events('ERC20Recovered')[0][4] == {
+        'token': ldo_token.address,
+        'recipient': stranger.address,
+        'amount': 10**18
+    }
+    assert indexer.events('ERC20Recovered')[0][2] == tx.txid
+    assert indexer.cursor()[0] == web3.eth.block_number
+
+
+def test_indexer_only_fetches_new_blocks(indexer, rewards_manager, ldo_token, dao_treasury, stranger):
+    start_periods(rewards_manager, ldo_token, dao_treasury, stranger, 1)
+    assert indexer.sync() == 3
+    assert indexer.sync() == 0
+
+    start_periods(rewards_manager, ldo_token, dao_treasury, stranger, 1)
+    assert indexer.sync() == 1
+    assert len(indexer.events()) == 4
+
+
+def test_indexer_shrinks_block_range(indexer, rewards_manager, ldo_token, dao_treasury, stranger):
+    start_periods(rewards_manager, ldo_token, dao_treasury, stranger, 3)
+    ranges = []
+    get_logs = indexer.get_logs
+
+    def limited_get_logs(from_block, to_block):
+        ranges.append(to_block - from_block + 1)
+        if to_block - from_block + 1 > 2:
+            raise ValueError({'code': -32005, 'message': 'query returned more than 10000 results'})
+        return get_logs(from_block, to_block)
+
+    indexer.get_logs = limited_get_logs
+    assert indexer.sync() == 5
+    assert max(ranges) > 2
+    assert min(ranges) <= 2
+    assert indexer.block_range < indexer.max_range
+
+
+def test_indexer_rolls_back_reorged_blocks(indexer, rewards_manager, ldo_token, dao_treasury, stranger, ldo_agent):
+    ldo_token.transfer(rewards_manager, 4 * 10**18, {"from": dao_treasury})
+    rewards_manager.start_next_rewards_period({"from": stranger})
+    assert indexer.sync() == 3
+
+    chain.undo()
+    rewards_manager.recover_erc20(ldo_token, 10**18, stranger, {"from": ldo_agent})
+    chain.mine()
+    indexer.sync()
+
+    assert [event[3] for event in indexer.events()] == ['RewardsContractUpdated', 'ERC20Recovered']
+
+
+def test_decode_log_skips_unknown_events(rewards_manager, ldo_token, dao_treasury):
+    tx = ldo_token.transfer(rewards_manager, 10**18, {"from": dao_treasury})
+    assert decode_log(tx.logs[0]) is None
@@ -0,0 +1,172 @@
+import json
+import pytest
+from brownie import chain, Contract, LegacyRewardsManager, RewardsManager
+
+from utils.keeper import (
+    RewardsKeeper,
+    read_status,
+    STATUS_OK,
+    STATUS_PERIOD_NOT_FINISHED,
+    STATUS_LOW_BALANCE
+)
+from utils.metrics import Metrics
+
+rewards_period = 3600 * 24 * 7
+events_interval = 2 * 24 * 3600
+
+
+@pytest.fixture(scope='function')
+def sleeps():
+    return []
+
+
+@pytest.fixture(scope='function')
+def keeper(rewards_manager, ldo_token, web3, stranger, sleeps):
+    def sleep(seconds):
+        sleeps.append(seconds)
+        chain.sleep(seconds)
+        chain.mine()
+
+    return RewardsKeeper(
+        rewards_manager,
+        ldo_token,
+        web3,
+        {"from": stranger},
+        sleep=sleep,
+        events_interval=events_interval
+    )
+
+
+def test_keeper_waits_for_balance(keeper, rewards_manager, ldo_token, dao_treasury, stranger, sleeps):
+    assert keeper.step() is None
+    assert keeper.status["reason"] == STATUS_LOW_BALANCE
+    assert sleeps == [events_interval]
+
+    assert keeper.step() is None
+    assert stranger.nonce == 0
+
+    ldo_token.transfer(rewards_manager, 10**18, {"from": dao_treasury})
+    assert keeper.step() is None
+    assert keeper.status is None
+
+    tx = keeper.step()
+    assert tx.events["NewRewardsPeriodStarted"]["amount"] == 10**18 // 4
+
+
+def test_keeper_sleeps_until_period_finish(keeper, rewards_manager, ldo_token, dao_treasury, sleeps):
+    ldo_token.transfer(rewards_manager, 10**18, {"from": dao_treasury})
+    assert keeper.step() is not None
+
+    status = keeper.refresh()
+    assert status["reason"] == STATUS_PERIOD_NOT_FINISHED
+    period_finish = status["balancer_period_finish"]
+
+    started = []
+    while not started:
+        tx = keeper.step()
+        if tx is not None:
+            started.append(tx)
+
+    assert chain[started[0].block_number].timestamp >= period_finish
+    assert all(seconds <= events_interval for seconds in sleeps)
+    assert rewards_manager.rewards_iteration() == 2
+
+
+def test_keeper_does_not_send_reverting_transactions(keeper, rewards_manager, stranger, sleeps):
+    keeper.status = {"reason": STATUS_OK}
+
+    assert keeper.step() is None
+    assert stranger.nonce == 0
+    assert sleeps == [keeper.retry_interval]
+    assert keeper.status is None
+
+
+def test_keeper_records_metrics(rewards_manager, ldo_token, dao_treasury, web3, stranger, tmp_path):
+    log_path = tmp_path / 'keeper.jsonl'
+    metrics = Metrics(log_path=str(log_path))
+    keeper = RewardsKeeper(
+        rewards_manager,
+        ldo_token,
+        web3,
+        {"from": stranger},
+        sleep=lambda seconds: (chain.sleep(seconds), chain.mine()),
+        events_interval=events_interval,
+        metrics=metrics
+    )
+    ldo_token.transfer(rewards_manager, 10**18, {"from": dao_treasury})
+    balancer_period_finish = rewards_manager.balancer_period_finish()
+
+    tx = keeper.step()
+    metrics.close()
+
+    labels = {'manager': rewards_manager.address}
+    assert metrics.value('keeper_periods_started_total', **labels) == 1
+    assert metrics.value('keeper_start_gas_used', **labels) == tx.gas_used
+    assert metrics.value('keeper_start_fee_wei', **labels) == tx.gas_used * tx.gas_price
+    assert metrics.value('keeper_rewards_amount_wei', **labels) == 10**18 // 4
+    assert metrics.value('keeper_start_delay_seconds', **labels) == tx.timestamp - balancer_period_finish
+    assert metrics.summary('keeper_rpc_seconds', call='status', **labels)[0] == 1
+    assert metrics.summary('keeper_rpc_seconds', call='dry_run', **labels)[0] == 1
+    assert metrics.summary('keeper_tx_seconds', **labels)[0] == 1
+
+    [record] = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert record['event'] == 'rewards_period_started'
+    assert record['tx'] == tx.txid
+    assert record['amount'] == 10**18 // 4
+    assert record['gas_used'] == tx.gas_used
+
+
+def test_keeper_counts_failed_dry_runs(rewards_manager, ldo_token, web3, stranger):
+    metrics = Metrics()
+    keeper = RewardsKeeper(
+        rewards_manager, ldo_token, web3, {"from": stranger}, sleep=lambda seconds: None, metrics=metrics
+    )
+    keeper.status = {"reason": STATUS_OK, "balancer_period_finish": 0}
+
+    assert keeper.step() is None
+    assert metrics.value('keeper_dry_run_failures_total', manager=rewards_manager.address) == 1
+    assert 'keeper_periods_started_total' not in metrics.render()
+
+
+def test_read_status_of_legacy_manager(ldo_agent, ldo_token, dao_treasury, rewards_contract_mock, deployer):
+    legacy = LegacyRewardsManager.deploy(ldo_agent, 10**18, rewards_contract_mock, {"from": deployer})
+    ldo_token.transfer(legacy, 10**18, {"from": dao_treasury})
+
+    # the current ABI calls status(), which the legacy manager reverts on
+    manager = Contract.from_abi("RewardsManager", legacy.address, RewardsManager.abi)
+    status = read_status(manager, ldo_token, chain[-1].timestamp)
+
+    assert status["rewards_contract"] == rewards_contract_mock
+    assert status["ldo_balance"] == 10**18
+    assert status["rewards_iteration"] == 0
+    assert status["reason"] == STATUS_OK
+
+
+def test_read_status_does_not_hide_connection_errors(rewards_manager, ldo_token):
+    class Unreachable:
+        def status(self):
+            raise ConnectionError("node unreachable")
+
+        def rewards_contract(self):
+            raise AssertionError("legacy views must not be read")
+
+    with pytest.raises(ConnectionError):
+        read_status(Unreachable(), ldo_token, chain[-1].timestamp)
+
+
+def test_keeper_keeps_polling_after_reverted_start(rewards_manager, ldo_token, web3, stranger):
+    metrics = Metrics()
+    sleeps = []
+    keeper = RewardsKeeper(
+        rewards_manager, ldo_token, web3, {"from": stranger}, sleep=sleeps.append, metrics=metrics
+    )
+    # the dry run passes, the manager has nothing to start a period with
+    keeper.dry_run = lambda: True
+    keeper.status = {"reason": STATUS_OK, "balancer_period_finish": 0}
+
+    keeper.run(max_steps=2)
+
+    assert metrics.value('keeper_tx_failures_total', manager=rewards_manager.address) == 1
+    assert sleeps[0] == keeper.retry_interval
+    assert len(sleeps) == 2
+    assert rewards_manager.rewards_iteration() == 0
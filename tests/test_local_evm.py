@@ -0,0 +1,66 @@
+import pytest
+from eth_utils import to_checksum_address
+
+LocalEvm = pytest.importorskip('utils.local_evm', reason='needs py-evm 0.5.0a3, see README').LocalEvm
+
+
+def send(evm, **params):
+    sender, recipient = [to_checksum_address(address) for address in evm.keys]
+    return evm.send_transaction({'from': sender, 'to': recipient, 'value': hex(1), **params})
+
+
+def test_senders_are_kept_per_chain_and_pruned_on_revert():
+    evm, other = LocalEvm(accounts=2), LocalEvm(accounts=2)
+    snapshot = evm.snapshot()
+    tx_hash = send(evm)
+
+    assert list(evm.senders) == [bytes.fromhex(tx_hash[2:])]
+    assert other.senders == {}
+    assert evm.trace(tx_hash)['failed'] is False
+
+    evm.revert(snapshot)
+    assert evm.senders == {}
+    assert evm.format_transaction(tx_hash) is None
+
+
+def test_failed_send_drops_sender():
+    evm = LocalEvm(accounts=2)
+    sender = to_checksum_address(next(iter(evm.keys)))
+    response = evm.handle({'id': 1, 'method': 'eth_sendTransaction', 'params': [
+        {'from': sender, 'to': sender, 'value': hex(10**30)}
+    ]})
+
+    assert 'error' in response
+    assert evm.senders == {}
+
+
+def test_future_nonce_waits_for_the_gap():
+    evm = LocalEvm(accounts=2)
+    later = send(evm, nonce=hex(1))
+
+    assert evm.receipt(later) is None
+    first = send(evm, nonce=hex(0))
+
+    assert int(evm.receipt(first)['blockNumber'], 16) == 1
+    assert int(evm.receipt(later)['blockNumber'], 16) == 2
+    assert evm.queued[next(iter(evm.keys))] == {}
+
+
+def test_unexpected_errors_are_returned_as_rpc_errors():
+    evm = LocalEvm(accounts=1)
+    response = evm.handle({'id': 7, 'method': 'eth_getBalance', 'params': ['0x1234']})
+
+    assert response['id'] == 7
+    assert response['error']['code'] == -32603
+    assert 'result' not in response
+
+
+def test_london_hardfork_starts_without_base_fee():
+    evm = LocalEvm(accounts=2, hardfork='london')
+    tx_hash = send(evm)
+
+    assert evm.head().base_fee_per_gas == 0
+    assert evm.receipt(tx_hash)['gasUsed'] == hex(21_000)
+
+    with pytest.raises(ValueError, match='unsupported hardfork'):
+        LocalEvm(hardfork='shanghai')
@@ -5,6 +5,11 @@ from brownie import reverts, ZERO_ADDRESS, chain
 random_address = "0xb842afd82d940ff5d8f6ef3399572592ebf182b0"
 rewards_period = 3600 * 24 * 7
 
+STATUS_OK = 0
+STATUS_REWARDS_DISABLED = 1
+STATUS_PERIOD_NOT_FINISHED = 2
+STATUS_LOW_BALANCE = 3
+
 def test_init(rewards_manager, rewards_contract_mock, ldo_agent):
     assert rewards_manager.owner() == ldo_agent
     assert rewards_manager.rewards_contract() == rewards_contract_mock
@@ -111,3 +116,116 @@ def test_notify_reward_amount_fails_on_low_balance(
     ldo_token.transfer(rewards_manager, 10**18 - 1, {"from": dao_treasury})
     with reverts("manager: low balance"):
         rewards_manager.start_next_rewards_period({"from": stranger})
+
+
+def test_start_reward_period_keeps_standing_allowance(
+    rewards_manager,
+    rewards_contract_mock,
+    dao_treasury,
+    stranger,
+    ldo_token
+):
+    ldo_token.transfer(rewards_manager, 10**18, {"from": dao_treasury})
+    rewards_manager.start_next_rewards_period({"from": stranger})
+    allowance = ldo_token.allowance(rewards_manager, rewards_contract_mock)
+    assert allowance > 0
+
+    chain.sleep(rewards_period)
+    chain.mine()
+
+    tx = rewards_manager.start_next_rewards_period({"from": stranger})
+    assert "Approval" not in tx.events
+    assert ldo_token.allowance(rewards_manager, rewards_contract_mock) == allowance - 10**18 // 4
+
+
+def test_set_rewards_contract_revokes_allowance(
+    rewards_manager,
+    rewards_contract_mock,
+    dao_treasury,
+    stranger,
+    ldo_token,
+    ldo_agent
+):
+    ldo_token.transfer(rewards_manager, 10**18, {"from": dao_treasury})
+    rewards_manager.start_next_rewards_period({"from": stranger})
+    assert ldo_token.allowance(rewards_manager, rewards_contract_mock) > 0
+
+    rewards_manager.set_rewards_contract(random_address, {"from": ldo_agent})
+    assert ldo_token.allowance(rewards_manager, rewards_contract_mock) == 0
+
+
+def test_replace_me_by_other_distributor_revokes_allowance(
+    rewards_manager,
+    rewards_contract_mock,
+    dao_treasury,
+    stranger,
+    ldo_token,
+    ldo_agent
+):
+    ldo_token.transfer(rewards_manager, 10**18, {"from": dao_treasury})
+    rewards_manager.start_next_rewards_period({"from": stranger})
+    assert ldo_token.allowance(rewards_manager, rewards_contract_mock) > 0
+
+    rewards_manager.replace_me_by_other_distributor(stranger, {"from": ldo_agent})
+    assert ldo_token.allowance(rewards_manager, rewards_contract_mock) == 0
+
+
+def test_status_reports_low_balance(rewards_manager, rewards_contract_mock, stranger):
+    status = rewards_manager.status({"from": stranger})
+    assert status["rewards_contract"] == rewards_contract_mock
+    assert status["ldo_balance"] == 0
+    assert status["period_finish"] == rewards_manager.period_finish()
+    assert status["balancer_period_finish"] == rewards_manager.balancer_period_finish()
+    assert status["can_start"] == False
+    assert status["reason"] == STATUS_LOW_BALANCE
+
+
+def test_status_reports_period_not_finished(
+    rewards_manager,
+    dao_treasury,
+    stranger,
+    ldo_token
+):
+    ldo_token.transfer(rewards_manager, 10**18, {"from": dao_treasury})
+    status = rewards_manager.status()
+    assert status["can_start"] == True
+    assert status["reason"] == STATUS_OK
+
+    rewards_manager.start_next_rewards_period({"from": stranger})
+    status = rewards_manager.status()
+    assert status["weekly_amount"] == rewards_manager.weekly_amount()
+    assert status["rewards_iteration"] == rewards_manager.rewards_iteration()
+    assert status["period_finish"] == rewards_manager.period_finish()
+    assert status["is_rewards_period_finished"] == rewards_manager.is_rewards_period_finished()
+    assert status["can_start"] == False
+    assert status["reason"] == STATUS_PERIOD_NOT_FINISHED
+
+
+def test_status_reports_disabled_rewards(rewards_manager, ldo_agent):
+    rewards_manager.set_rewards_contract(ZERO_ADDRESS, {"from": ldo_agent})
+    status = rewards_manager.status()
+    assert status["can_start"] == False
+    assert status["reason"] == STATUS_REWARDS_DISABLED
+
+
+def test_rewards_schedule_over_a_year(
+    rewards_manager,
+    rewards_contract_mock,
+    dao_treasury,
+    stranger,
+    ldo_token,
+    helpers
+):
+    for _ in range(13):
+        ldo_token.transfer(rewards_manager, 4 * 10**18, {"from": dao_treasury})
+        for week in range(4):
+            helpers.warp_to_balancer_period_finish(rewards_manager)
+            tx = rewards_manager.start_next_rewards_period({"from": stranger})
+            assert tx.events["NewRewardsPeriodStarted"]["amount"] == 10**18
+            assert rewards_manager.rewards_iteration() == (week + 1) % 4
+
+        helpers.warp_to_balancer_period_finish(rewards_manager, before=60)
+        assert rewards_manager.status()["reason"] == STATUS_PERIOD_NOT_FINISHED
+
+    assert ldo_token.balanceOf(rewards_contract_mock) == 52 * 10**18
+    assert ldo_token.balanceOf(rewards_manager) == 0
@@ -0,0 +1,56 @@
+import json
+import requests
+
+from utils.metrics import Metrics, MetricsServer
+
+
+def test_metrics_render_prometheus_text():
+    metrics = Metrics(clock=iter([1.0, 1.25, 2.0, 2.5]).__next__)
+    metrics.inc('keeper_periods_started_total', manager='0x01')
+    metrics.inc('keeper_periods_started_total', manager='0x01')
+    metrics.set('keeper_start_gas_used', 90000, manager='0x01')
+    with metrics.timer('keeper_rpc_seconds', call='status'):
+        pass
+    with metrics.timer('keeper_rpc_seconds', call='status'):
+        pass
+
+    assert metrics.render() == '\n'.join([
+        '# TYPE keeper_periods_started_total counter',
+        'keeper_periods_started_total{manager="0x01"} 2',
+        '# TYPE keeper_rpc_seconds summary',
+        'keeper_rpc_seconds_count{call="status"} 2',
+        'keeper_rpc_seconds_sum{call="status"} 0.75',
+        '# TYPE keeper_start_gas_used gauge',
+        'keeper_start_gas_used{manager="0x01"} 90000',
+    ]) + '\n'
+
+
+def test_metrics_timer_records_failures():
+    metrics = Metrics()
+    try:
+        with metrics.timer('keeper_rpc_seconds', call='status'):
+            raise ValueError()
+    except ValueError:
+        pass
+
+    assert metrics.summary('keeper_rpc_seconds', call='status')[0] == 1
+
+
+def test_metrics_log_and_server(tmp_path):
+    metrics = Metrics(log_path=str(tmp_path / 'metrics.jsonl'))
+    metrics.set('keeper_start_delay_seconds', 12)
+    metrics.record('rewards_period_started', delay=12)
+    metrics.close()
+
+    server = MetricsServer(metrics).start()
+    try:
+        response = requests.get(server.url)
+        assert response.status_code == 200
+        assert 'keeper_start_delay_seconds 12' in response.text
+        assert requests.get(server.url[:-len('metrics')]).status_code == 404
+    finally:
+        server.stop()
+
+    [record] = [json.loads(line) for line in (tmp_path / 'metrics.jsonl').read_text().splitlines()]
+    assert record['event'] == 'rewards_period_started'
+    assert record['delay'] == 12
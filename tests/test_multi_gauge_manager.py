@@ -0,0 +1,188 @@
+import pytest
+
+from brownie import reverts, ZERO_ADDRESS, chain
+
+rewards_period = 3600 * 24 * 7
+max_gauges = 16
+
+
+def gauges_list(gauges):
+    return list(gauges) + [ZERO_ADDRESS] * (max_gauges - len(gauges))
+
+
+@pytest.fixture(scope='function')
+def funded_gauges(multi_gauge_manager, rewards_contract_mocks, ldo_token, ldo_agent, dao_treasury):
+    ldo_token.transfer(multi_gauge_manager, 4 * 10**18 * len(rewards_contract_mocks), {"from": dao_treasury})
+    for mock in rewards_contract_mocks:
+        multi_gauge_manager.add_gauge(mock, 10**18, {"from": ldo_agent})
+        multi_gauge_manager.allocate(mock, 4 * 10**18, {"from": ldo_agent})
+    return rewards_contract_mocks
+
+
+def test_init(multi_gauge_manager, ldo_agent, ldo_token):
+    assert multi_gauge_manager.owner() == ldo_agent
+    assert multi_gauge_manager.reward_token() == ldo_token
+    assert multi_gauge_manager.total_allocated() == 0
+
+
+def test_stranger_can_not_manage_gauges(multi_gauge_manager, rewards_contract_mocks, stranger):
+    with reverts("not permitted"):
+        multi_gauge_manager.add_gauge(rewards_contract_mocks[0], 10**18, {"from": stranger})
+    with reverts("not permitted"):
+        multi_gauge_manager.allocate(rewards_contract_mocks[0], 10**18, {"from": stranger})
+    with reverts("not permitted"):
+        multi_gauge_manager.remove_gauge(rewards_contract_mocks[0], {"from": stranger})
+    with reverts("not permitted"):
+        multi_gauge_manager.replace_me_by_other_distributor(rewards_contract_mocks[0], stranger, {"from": stranger})
+
+
+def test_allocate_fails_on_low_balance(multi_gauge_manager, rewards_contract_mocks, ldo_agent):
+    multi_gauge_manager.add_gauge(rewards_contract_mocks[0], 10**18, {"from": ldo_agent})
+    with reverts("manager: low balance"):
+        multi_gauge_manager.allocate(rewards_contract_mocks[0], 1, {"from": ldo_agent})
+
+
+def test_start_next_rewards_period_of_single_gauge(
+    multi_gauge_manager,
+    funded_gauges,
+    ldo_token,
+    stranger,
+    helpers
+):
+    gauge = funded_gauges[0]
+    tx = multi_gauge_manager.start_next_rewards_period(gauge, {"from": stranger})
+
+    helpers.assert_single_event_named(
+        "NewRewardsPeriodStarted",
+        tx,
+        {"gauge": gauge, "amount": 10**18}
+    )
+    helpers.assert_single_event_named(
+        "WeeklyRewardsAmountUpdated",
+        tx,
+        {"gauge": gauge, "newWeeklyRewardsAmount": 10**18}
+    )
+    assert ldo_token.balanceOf(gauge) == 10**18
+    assert multi_gauge_manager.rewards_iteration(gauge) == 1
+    assert multi_gauge_manager.period_finish(gauge) == gauge.reward_data(ldo_token)[2] + 3 * rewards_period
+
+    with reverts("manager: rewards period not finished"):
+        multi_gauge_manager.start_next_rewards_period(gauge, {"from": stranger})
+
+
+def test_start_next_rewards_period_fails_on_unknown_gauge(
+    multi_gauge_manager,
+    rewards_contract_mocks,
+    stranger
+):
+    with reverts("manager: rewards disabled"):
+        multi_gauge_manager.start_next_rewards_period(rewards_contract_mocks[0], {"from": stranger})
+
+
+def test_start_next_rewards_periods_skips_unfinished_gauges(
+    multi_gauge_manager,
+    funded_gauges,
+    ldo_token,
+    stranger
+):
+    multi_gauge_manager.start_next_rewards_period(funded_gauges[0], {"from": stranger})
+
+    tx = multi_gauge_manager.start_next_rewards_periods(gauges_list(funded_gauges), {"from": stranger})
+
+    assert tx.return_value == len(funded_gauges) - 1
+    assert [e["gauge"] for e in tx.events["NewRewardsPeriodStarted"]] == funded_gauges[1:]
+    assert multi_gauge_manager.total_allocated() == 4 * 10**18 * len(funded_gauges) - 10**18 * len(funded_gauges)
+
+
+def test_start_next_rewards_periods_runs_full_period(
+    multi_gauge_manager,
+    funded_gauges,
+    ldo_token,
+    stranger
+):
+    for week in range(4):
+        tx = multi_gauge_manager.start_next_rewards_periods(gauges_list(funded_gauges), {"from": stranger})
+        assert tx.return_value == len(funded_gauges)
+        chain.sleep(rewards_period)
+        chain.mine()
+
+    for gauge in funded_gauges:
+        assert ldo_token.balanceOf(gauge) == 4 * 10**18
+        assert multi_gauge_manager.rewards_iteration(gauge) == 0
+
+    tx = multi_gauge_manager.start_next_rewards_periods(gauges_list(funded_gauges), {"from": stranger})
+    assert tx.return_value == 0
+    assert multi_gauge_manager.total_allocated() == 0
+
+
+def test_remove_gauge_releases_budget(
+    multi_gauge_manager,
+    funded_gauges,
+    ldo_agent,
+    stranger
+):
+    gauge = funded_gauges[0]
+    unallocated = multi_gauge_manager.unallocated_balance()
+    multi_gauge_manager.remove_gauge(gauge, {"from": ldo_agent})
+
+    assert multi_gauge_manager.unallocated_balance() == unallocated + 4 * 10**18
+    with reverts("manager: rewards disabled"):
+        multi_gauge_manager.start_next_rewards_period(gauge, {"from": stranger})
+
+
+def test_recover_erc20_keeps_allocated_balance(
+    multi_gauge_manager,
+    funded_gauges,
+    ldo_token,
+    ldo_agent,
+    dao_treasury,
+    stranger
+):
+    ldo_token.transfer(multi_gauge_manager, 10**18, {"from": dao_treasury})
+
+    with reverts("manager: allocated balance"):
+        multi_gauge_manager.recover_erc20(ldo_token, 10**18 + 1, stranger, {"from": ldo_agent})
+
+    multi_gauge_manager.recover_erc20(ldo_token, 10**18, stranger, {"from": ldo_agent})
+    assert multi_gauge_manager.unallocated_balance() == 0
+
+
+def test_gauge_can_be_transferred(
+    multi_gauge_manager,
+    funded_gauges,
+    ldo_token,
+    ldo_agent,
+    stranger
+):
+    gauge = funded_gauges[0]
+    tx = multi_gauge_manager.replace_me_by_other_distributor(gauge, stranger, {"from": ldo_agent})
+    assert gauge.reward_data(ldo_token)[1] == stranger
+
+    assert "GaugeRemoved" in tx.events
+    assert multi_gauge_manager.gauges(gauge)["is_enabled"] == False
+    assert multi_gauge_manager.gauges(gauge)["budget"] == 0
+    assert multi_gauge_manager.total_allocated() == 4 * 10**18 * (len(funded_gauges) - 1)
+    assert multi_gauge_manager.unallocated_balance() == 4 * 10**18
+    assert ldo_token.allowance(multi_gauge_manager, gauge) == 0
+
+
+def test_transfer_of_not_added_gauge_fails(multi_gauge_manager, rewards_contract_mocks, ldo_agent, stranger):
+    with reverts("gauge not added"):
+        multi_gauge_manager.replace_me_by_other_distributor(rewards_contract_mocks[0], stranger, {"from": ldo_agent})
+
+
+def test_start_next_rewards_periods_skips_transferred_gauge(
+    multi_gauge_manager,
+    funded_gauges,
+    ldo_agent,
+    stranger
+):
+    multi_gauge_manager.start_next_rewards_periods(gauges_list(funded_gauges), {"from": stranger})
+    multi_gauge_manager.replace_me_by_other_distributor(funded_gauges[0], stranger, {"from": ldo_agent})
+    chain.sleep(rewards_period)
+    chain.mine()
+
+    tx = multi_gauge_manager.start_next_rewards_periods(gauges_list(funded_gauges), {"from": stranger})
+
+    assert tx.return_value == len(funded_gauges) - 1
+    assert [e["gauge"] for e in tx.events["NewRewardsPeriodStarted"]] == funded_gauges[1:]
@@ -0,0 +1,72 @@
+import pytest
+from brownie import web3, ZERO_ADDRESS, BalancerLiquidityGaugeMock
+from utils.multicall import MulticallReader, Call
+
+
+@pytest.fixture(scope='module')
+def gauges(deployer, ldo_token, stranger):
+    # one gauge per reward token, the first one is the manager's
+    return [
+        BalancerLiquidityGaugeMock.deploy(deployer, token, {"from": deployer})
+        for token in [ldo_token, stranger, deployer]
+    ]
+
+
+def test_snapshot_matches_direct_calls(
+    multicall,
+    rewards_manager,
+    rewards_contract_mock,
+    gauges,
+    ldo_token,
+    ldo_agent,
+    stranger,
+    deployer
+):
+    ldo_token.transfer(rewards_manager, 10**18, {"from": ldo_agent})
+    pairs = [(rewards_contract_mock, ldo_token)] + [
+        (gauge, token) for gauge in gauges for token in [ldo_token, stranger, deployer]
+    ]
+
+    reader = MulticallReader(web3, multicall)
+    snapshot = reader.snapshot([(g.address, t.address) for g, t in pairs], [rewards_manager.address])
+
+    assert reader.eth_calls == 1
+    for gauge, token in pairs:
+        assert tuple(snapshot['reward_data'][(gauge.address, token.address)].values()) == \
+            tuple(gauge.reward_data(token))
+    assert tuple(snapshot['status'][rewards_manager.address].values()) == tuple(rewards_manager.status())
+    assert snapshot['ldo_balance'][rewards_manager.address] == 10**18
+
+
+def test_reader_splits_batches_and_caches_by_block(multicall, gauges, ldo_token, deployer):
+    reader = MulticallReader(web3, multicall, batch_size=2)
+    calls = [
+        Call(gauge.address, 'reward_data(address)', ['address'], [ldo_token.address], 'address')
+        for gauge in gauges
+    ]
+
+    assert reader.read(calls) == [ldo_token.address, ZERO_ADDRESS, ZERO_ADDRESS]
+    assert reader.eth_calls == 2
+
+    reader.read(calls)
+    assert reader.eth_calls == 2
+
+    gauges[0].deposit_reward_token(ldo_token, 0, {"from": deployer})
+    reader.read(calls)
+    assert reader.eth_calls == 4
+
+    reader.ttl = -1
+    reader.read(calls)
+    assert reader.eth_calls == 6
+
+
+def test_failed_calls_read_as_none(multicall, rewards_manager, stranger):
+    reader = MulticallReader(web3, multicall)
+    calls = [
+        # reverts
+        Call(rewards_manager.address, 'reward_data(address)', ['address'], [stranger.address], 'uint256'),
+        # no code, empty result
+        Call(stranger.address, 'balanceOf(address)', ['address'], [stranger.address], 'uint256'),
+        Call(rewards_manager.address, 'rewards_contract()', [], [], 'address'),
+    ]
+    assert reader.read(calls) == [None, None, rewards_manager.rewards_contract()]
@@ -1,5 +1,5 @@
 import pytest
-from brownie import Wei, reverts, interface, ZERO_ADDRESS
+from brownie import Wei, reverts, interface, ZERO_ADDRESS, MiniMeTokenMock, RewardsManagerImplementation
 from utils.config import (
     lido_dao_agent_address,
     ldo_token_address,
@@ -9,6 +9,8 @@ from utils.config import (
 from utils.evm_script import encode_call_script
 from utils.voting import create_vote
 
+MAX_UINT256 = 2**256 - 1
+
 
 def test_owner_recovers_erc20_with_zero_amount(
     rewards_manager, ldo_token, ldo_agent, dao_treasury
@@ -130,3 +132,112 @@ def test_owner_recovers_usdt_with_balance(
 
     assert usdt_token.balanceOf(rewards_manager) == transfer_amount - recover_amount
     assert recipient_balance_after - recipient_balance_before == recover_amount
+
+
+def batch(items):
+    # recover_erc20_batch takes 16 items, the list ends at the first zero token
+    items = items + [(ZERO_ADDRESS, 0, ZERO_ADDRESS)] * (16 - len(items))
+    return [list(column) for column in zip(*items)]
+
+
+@pytest.fixture(scope='module')
+def stray_token(deployer, rewards_manager):
+    token = MiniMeTokenMock.deploy({"from": deployer})
+    token.mint(rewards_manager, 10**18, {"from": deployer})
+    return token
+
+
+def test_stranger_can_not_recover_erc20_batch(rewards_manager, ldo_token, stranger):
+    with reverts("not permitted"):
+        rewards_manager.recover_erc20_batch(*batch([(ldo_token, 1, stranger)]), {"from": stranger})
+
+
+def test_owner_recovers_erc20_batch(
+    rewards_manager, ldo_token, ldo_agent, stray_token, stranger, deployer, helpers
+):
+    ldo_token.transfer(rewards_manager, Wei("2 ether"), {"from": ldo_agent})
+
+    tx = rewards_manager.recover_erc20_batch(*batch([
+        (ldo_token, Wei("0.5 ether"), stranger),
+        (stray_token, Wei("0.25 ether"), deployer),
+        (ldo_token, 0, deployer),
+        (ldo_token, Wei("1 ether"), deployer),
+    ]), {"from": ldo_agent})
+
+    assert tx.return_value == 3
+    assert ldo_token.balanceOf(rewards_manager) == Wei("0.5 ether")
+    assert ldo_token.balanceOf(stranger) == Wei("0.5 ether")
+    assert stray_token.balanceOf(deployer) == Wei("0.25 ether")
+    assert [dict(e) for e in helpers.filter_events_from(rewards_manager, tx.events["ERC20Recovered"])] == [
+        {"token": ldo_token, "amount": Wei("0.5 ether"), "recipient": stranger},
+        {"token": stray_token, "amount": Wei("0.25 ether"), "recipient": deployer},
+        {"token": ldo_token, "amount": Wei("1 ether"), "recipient": deployer},
+    ]
+
+
+def test_owner_recovers_entire_balances_in_batch(
+    rewards_manager, ldo_token, ldo_agent, stray_token, stranger
+):
+    ldo_token.transfer(rewards_manager, Wei("2 ether"), {"from": ldo_agent})
+
+    tx = rewards_manager.recover_erc20_batch(*batch([
+        (ldo_token, MAX_UINT256, stranger),
+        (stray_token, MAX_UINT256, stranger),
+        # nothing left, no transfer and no event
+        (ldo_token, MAX_UINT256, stranger),
+    ]), {"from": ldo_agent})
+
+    assert tx.return_value == 2
+    assert len(tx.events["ERC20Recovered"]) == 2
+    assert ldo_token.balanceOf(rewards_manager) == 0
+    assert stray_token.balanceOf(rewards_manager) == 0
+    assert ldo_token.balanceOf(stranger) == Wei("2 ether")
+    assert stray_token.balanceOf(stranger) == 10**18
+
+
+def test_recover_erc20_batch_with_zero_recipient(rewards_manager, ldo_token, ldo_agent, stranger):
+    ldo_token.transfer(rewards_manager, Wei("1 ether"), {"from": ldo_agent})
+
+    with reverts("zero address not allowed"):
+        rewards_manager.recover_erc20_batch(*batch([
+            (ldo_token, 1, stranger),
+            (ldo_token, 1, ZERO_ADDRESS),
+        ]), {"from": ldo_agent})
+
+
+def test_recover_erc20_batch_not_enough_balance(rewards_manager, ldo_token, ldo_agent, stranger):
+    ldo_token.transfer(rewards_manager, Wei("1 ether"), {"from": ldo_agent})
+
+    with reverts("Transfer failed!"):
+        rewards_manager.recover_erc20_batch(*batch([
+            (ldo_token, Wei("1 ether"), stranger),
+            (ldo_token, 1, stranger),
+        ]), {"from": ldo_agent})
+
+
+def test_clone_owner_recovers_erc20_batch(
+    rewards_manager_factory, rewards_contract_mock, ldo_token, ldo_agent, deployer, stranger
+):
+    tx = rewards_manager_factory.deploy_manager(ldo_agent, 10**18, rewards_contract_mock, {"from": deployer})
+    manager = RewardsManagerImplementation.at(tx.return_value)
+    ldo_token.transfer(manager, Wei("1 ether"), {"from": ldo_agent})
+
+    with reverts("not permitted"):
+        manager.recover_erc20_batch(*batch([(ldo_token, MAX_UINT256, stranger)]), {"from": stranger})
+
+    tx = manager.recover_erc20_batch(*batch([(ldo_token, MAX_UINT256, stranger)]), {"from": ldo_agent})
+    assert tx.return_value == 1
+    assert ldo_token.balanceOf(stranger) == Wei("1 ether")
+
+
+def test_owner_recovers_usdt_in_batch(rewards_manager, ldo_agent, stranger, usdt_holder, usdt_token):
+    usdt_token.transfer(rewards_manager, 10**8, {"from": usdt_holder})
+
+    tx = rewards_manager.recover_erc20_batch(*batch([
+        (usdt_token, 10**7, ldo_agent),
+        (usdt_token, MAX_UINT256, stranger),
+    ]), {"from": ldo_agent})
+
+    assert tx.return_value == 2
+    assert usdt_token.balanceOf(rewards_manager) == 0
+    assert usdt_token.balanceOf(stranger) == 9 * 10**7
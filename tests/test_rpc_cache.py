@@ -0,0 +1,77 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from utils.rpc_cache import RpcCache, CachingRpcProxy, is_cacheable
+
+fork_block = '0xdbba00'
+
+
+@pytest.fixture(scope='function')
+def upstream():
+    calls = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            calls.append(request['method'])
+            result = {'eth_blockNumber': fork_block, 'eth_getCode': '0x6080'}.get(request['method'], '0x01')
+            data = json.dumps({'jsonrpc': '2.0', 'id': request['id'], 'result': result}).encode()
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}', calls
+    server.shutdown()
+    server.server_close()
+
+
+def rpc(url, method, params):
+    payload = {'jsonrpc': '2.0', 'id': 7, 'method': method, 'params': params}
+    return requests.post(url, json=payload).json()
+
+
+def test_is_cacheable():
+    assert is_cacheable('eth_getStorageAt', ['0x01', '0x0', fork_block])
+    assert not is_cacheable('eth_getStorageAt', ['0x01', '0x0', 'latest'])
+    assert not is_cacheable('eth_sendRawTransaction', ['0x00'])
+
+
+def test_proxy_records_and_replays(upstream, tmp_path):
+    upstream_url, calls = upstream
+    path = str(tmp_path / 'mainnet.json.gz')
+
+    proxy = CachingRpcProxy(upstream_url, RpcCache(path)).start()
+    assert proxy.cache.block == int(fork_block, 16)
+    assert rpc(proxy.url, 'eth_getCode', ['0x01', fork_block]) == {'jsonrpc': '2.0', 'id': 7, 'result': '0x6080'}
+    assert rpc(proxy.url, 'eth_getCode', ['0x01', fork_block])['result'] == '0x6080'
+    proxy.stop()
+    assert calls == ['eth_blockNumber', 'eth_getCode']
+
+    proxy = CachingRpcProxy(upstream_url, RpcCache(path), offline=True).start()
+    assert rpc(proxy.url, 'eth_getCode', ['0x01', fork_block])['result'] == '0x6080'
+    assert 'error' in rpc(proxy.url, 'eth_getBalance', ['0x01', fork_block])
+    proxy.stop()
+    assert calls == ['eth_blockNumber', 'eth_getCode']
+    assert (proxy.hits, proxy.misses) == (1, 1)
+
+
+def test_cache_is_dropped_for_another_block(upstream, tmp_path):
+    upstream_url, _ = upstream
+    path = str(tmp_path / 'mainnet.json.gz')
+
+    proxy = CachingRpcProxy(upstream_url, RpcCache(path)).start()
+    rpc(proxy.url, 'eth_getCode', ['0x01', fork_block])
+    proxy.stop()
+
+    assert len(RpcCache(path).responses) == 1
+    assert len(RpcCache(path, block=1).responses) == 0
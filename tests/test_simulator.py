@@ -0,0 +1,79 @@
+import pytest
+from brownie import chain
+from brownie.exceptions import VirtualMachineError
+
+from utils.keeper import STATUS_OK, STATUS_LOW_BALANCE, STATUS_REWARDS_DISABLED
+from utils.simulator import simulate, delayed_topups, SECONDS_PER_WEEK
+
+# rewards_manager fixture
+min_rewards_amount = 10**18
+
+revert_reasons = {
+    'manager: low balance': STATUS_LOW_BALANCE,
+    'manager: rewards disabled': STATUS_REWARDS_DISABLED,
+}
+
+scenarios = [
+    # regular monthly top-ups
+    [4 * 10**18, 0, 0, 0, 4 * 10**18, 0, 0, 0, 4 * 10**18, 0, 0, 0],
+    # a top-up one week late stalls one week
+    [4 * 10**18, 0, 0, 0, 0, 4 * 10**18, 0, 0, 0, 0, 0, 0],
+    # below min_rewards_amount until the second top-up
+    [10**18 // 2, 0, 10**18 // 2, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    # mid period top-ups wait for the next recalculation
+    [4 * 10**18, 2 * 10**18, 0, 10**18, 0, 0, 0, 0, 0, 0, 0, 0],
+    # remainders of the integer division stay in the manager
+    [4 * 10**18 + 3, 0, 0, 0, 10**18 + 1, 0, 0, 0, 0, 0, 0, 0],
+    # exactly min_rewards_amount
+    [10**18, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+]
+
+
+@pytest.mark.parametrize('scenario', range(len(scenarios)))
+def test_simulator_matches_contract(
+    scenario,
+    rewards_manager,
+    ldo_token,
+    dao_treasury,
+    stranger,
+    helpers
+):
+    start = chain[-1].timestamp + 60
+    simulated = simulate(
+        scenarios[scenario],
+        min_rewards_amount,
+        start=start,
+        balancer_period_finish=rewards_manager.balancer_period_finish()
+    )
+
+    for week, topup in enumerate(scenarios[scenario]):
+        if topup > 0:
+            ldo_token.transfer(rewards_manager, topup, {"from": dao_treasury})
+        helpers.warp_to(max(start + week * SECONDS_PER_WEEK, rewards_manager.balancer_period_finish()))
+
+        try:
+            tx = rewards_manager.start_next_rewards_period({"from": stranger})
+            emitted, reason = tx.events['NewRewardsPeriodStarted']['amount'], STATUS_OK
+        except VirtualMachineError as e:
+            emitted, reason = 0, revert_reasons[e.revert_msg]
+
+        status = rewards_manager.status()
+        assert emitted == simulated['emitted'][0, week]
+        assert reason == simulated['reason'][0, week]
+        assert status['ldo_balance'] == simulated['balance'][0, week]
+        assert status['weekly_amount'] == simulated['weekly_amount'][0, week]
+        assert status['rewards_iteration'] == simulated['rewards_iteration'][0, week]
+        # Transactions land a second or so after the warped timestamp, that adds up over the weeks
+        assert 0 <= status['period_finish'] - simulated['period_finish'][0, week] <= 60
+
+
+def test_simulator_runs_scenarios_in_batch():
+    topups = delayed_topups(4 * 10**18, 4, 52, 2, 1000)
+    result = simulate(topups, min_rewards_amount)
+
+    assert result['emitted'].shape == (1000, 52)
+    assert (result['emitted'].sum(axis=1) + result['balance'][:, -1] == topups.sum(axis=1)).all()
+    assert (result['stalled'] == (result['emitted'] == 0)).all()
+    # the same schedule without delays never stalls
+    on_time = simulate(delayed_topups(4 * 10**18, 4, 52, 0, 1), min_rewards_amount)
+    assert not on_time['stalled'].any()
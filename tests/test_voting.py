@@ -0,0 +1,108 @@
+from brownie import web3, interface
+from utils.config import (
+    lido_dao_agent_address,
+    lido_dao_token_manager_address,
+    ldo_token_address
+)
+from utils.evm_script import decode_call_script_calls, validate_call_script
+from utils.voting import VoteBuilder
+
+
+def test_vote_builder_deduplicates_actions(rewards_manager, stranger):
+    builder = VoteBuilder()
+    builder.transfer_ldo(rewards_manager, 10**18)
+    builder.recover_erc20(rewards_manager, ldo_token_address, 10**18, stranger)
+    builder.transfer_ldo(rewards_manager.address.lower(), 10**18)
+    builder.recover_erc20(rewards_manager, ldo_token_address, 10**18, stranger)
+    builder.transfer_ldo(rewards_manager, 2 * 10**18)
+
+    assert len(builder) == 3
+
+
+def test_vote_builder_packs_actions_into_one_agent_call(rewards_manager, stranger):
+    builder = VoteBuilder()
+    builder.transfer_ldo(rewards_manager, 10**18)
+    builder.set_rewards_contract(rewards_manager, stranger)
+    builder.replace_me_by_other_distributor(rewards_manager, stranger)
+    builder.recover_erc20(rewards_manager, ldo_token_address, 10**18, stranger)
+
+    script = builder.build()
+    assert validate_call_script(script) == 1
+
+    [(to, signature, args)] = decode_call_script_calls(script)
+    assert to == lido_dao_agent_address.lower()
+    assert signature == 'forward(bytes)'
+    # The manager is not among the interface ABIs, its calls come with bare selectors
+    assert [
+        (to, signature) for to, signature, _ in decode_call_script_calls(args[0])
+    ] == [
+        (ldo_token_address.lower(), 'transfer(address,uint256)'),
+        (rewards_manager.address.lower(), rewards_manager.set_rewards_contract.signature),
+        (rewards_manager.address.lower(), rewards_manager.replace_me_by_other_distributor.signature),
+        (rewards_manager.address.lower(), rewards_manager.recover_erc20['address,uint256,address'].signature),
+    ]
+
+
+def test_vote_builder_single_action_uses_agent_execute(rewards_manager, stranger):
+    script = VoteBuilder().recover_erc20(rewards_manager, ldo_token_address, 10**18, stranger).build()
+
+    [(to, signature, args)] = decode_call_script_calls(script)
+    assert to == lido_dao_agent_address.lower()
+    assert signature == 'execute(address,uint256,bytes)'
+    assert args[0] == rewards_manager.address.lower()
+    assert args[1] == 0
+
+
+def test_vote_builder_estimates_gas(rewards_manager, ldo_token, ldo_agent, stranger):
+    ldo_token.transfer(rewards_manager, 10**18, {"from": ldo_agent})
+
+    builder = VoteBuilder(agent=None)
+    builder.recover_erc20(rewards_manager, ldo_token, 10**18, stranger)
+    builder.transfer_ldo(rewards_manager, 10**18)
+    gas = builder.estimate_gas(web3, sender=ldo_agent)
+
+    recover_tx = rewards_manager.recover_erc20(ldo_token, 10**18, stranger, {"from": ldo_agent})
+    transfer_tx = ldo_token.transfer(rewards_manager, 10**18, {"from": ldo_agent})
+    assert gas >= recover_tx.gas_used + transfer_tx.gas_used
+
+
+def test_batched_vote(
+    ldo_holder,
+    rewards_manager,
+    ldo_token,
+    dao_voting,
+    helpers,
+    accounts,
+    stranger
+):
+    ldo_token.transfer(rewards_manager, 10**18, {"from": ldo_holder})
+    balance_before = ldo_token.balanceOf(rewards_manager)
+
+    builder = VoteBuilder()
+    builder.recover_erc20(rewards_manager, ldo_token, balance_before, stranger)
+    builder.transfer_ldo(rewards_manager, 4 * 10**18)
+    builder.recover_erc20(rewards_manager, ldo_token, balance_before, stranger)
+    assert builder.estimate_gas(web3) > 0
+
+    (vote_id, _) = builder.create_vote(
+        voting=dao_voting,
+        token_manager=interface.TokenManager(lido_dao_token_manager_address),
+        vote_desc='',
+        tx_params={"from": ldo_holder}
+    )
+    helpers.execute_vote(vote_id=vote_id, accounts=accounts, dao_voting=dao_voting)
+
+    assert ldo_token.balanceOf(rewards_manager) == 4 * 10**18
+    assert ldo_token.balanceOf(stranger) == balance_before
+
+
+def test_vote_builder_recover_erc20_batch(rewards_manager, ldo_token, ldo_agent, stranger):
+    ldo_token.transfer(rewards_manager, 10**18, {"from": ldo_agent})
+
+    builder = VoteBuilder(agent=None)
+    builder.recover_erc20_batch(rewards_manager, [(ldo_token, 2**256 - 1, stranger)])
+    [(to, calldata)] = builder.calls()
+    ldo_agent.transfer(to, data=calldata)
+
+    assert ldo_token.balanceOf(rewards_manager) == 0
+    assert ldo_token.balanceOf(stranger) == 10**18
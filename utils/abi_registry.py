@@ -0,0 +1,204 @@
+import os
+import json
+import hashlib
+
+import eth_abi
+from eth_abi.decoding import ContextFramesBytesIO
+from eth_abi.registry import registry as codecs
+from eth_utils import keccak, to_checksum_address
+
+ROOT_PATH = os.path.join(os.path.dirname(__file__), '..')
+INTERFACES_PATH = os.path.join(ROOT_PATH, 'interfaces')
+CACHE_PATH = os.path.join(ROOT_PATH, 'build', 'abi_registry.json')
+CACHE_VERSION = 1
+
+
+def _abi_type(abi_input):
+    abi_type = abi_input['type']
+    if not abi_type.startswith('tuple'):
+        return abi_type
+    components = ','.join(_abi_type(c) for c in abi_input['components'])
+    return f'({components}){abi_type[len("tuple"):]}'
+
+
+def _hex(value):
+    return value if isinstance(value, str) else '0x' + bytes(value).hex()
+
+
+def parse_abi(abi):
+    """
+    Returns the functions and events of an ABI in the compact cached form:
+    `[name, selector, signature, types]` for every function and
+    `[name, topic, signature, [[arg, type, indexed], ...]]` for every event.
+    """
+    functions = []
+    events = []
+    for entry in abi:
+        if entry.get('type') == 'function':
+            types = [_abi_type(i) for i in entry['inputs']]
+            signature = f'{entry["name"]}({",".join(types)})'
+            selector = '0x' + keccak(text=signature)[:4].hex()
+            functions.append([entry['name'], selector, signature, types])
+        elif entry.get('type') == 'event' and not entry.get('anonymous'):
+            inputs = [[i['name'], _abi_type(i), bool(i.get('indexed'))] for i in entry['inputs']]
+            signature = f'{entry["name"]}({",".join(t for _, t, _ in inputs)})'
+            topic = '0x' + keccak(text=signature).hex()
+            events.append([entry['name'], topic, signature, inputs])
+    return {'functions': functions, 'events': events}
+
+
+def _tuple_type(types):
+    return f'({",".join(types)})'
+
+
+class AbiRegistry:
+    """
+    Selectors, event topics and eth_abi codecs of a set of contract ABIs.
+
+    ABIs are read from `path/*.json`, or only from `names` if given, plus
+    the `abis` dict of name to ABI. Parsed files are cached in `cache_path`
+    keyed by their sha256, so a later process only hashes them. Pass
+    `cache_path=None` to skip the cache.
+    """
+
+    def __init__(self, names=None, path=INTERFACES_PATH, abis=None, cache_path=CACHE_PATH):
+        self.functions = {}
+        self.selectors = {}
+        self.events = {}
+        self._encoders = {}
+        self._decoders = {}
+
+        if names is None:
+            names = sorted(f[:-len('.json')] for f in os.listdir(path) if f.endswith('.json'))
+        for contract, parsed in self._load_files(names, path, cache_path).items():
+            self._add(contract, parsed)
+        for contract, abi in (abis or {}).items():
+            self._add(contract, parse_abi(abi))
+
+    @staticmethod
+    def _load_files(names, path, cache_path):
+        cache = {}
+        if cache_path is not None and os.path.exists(cache_path):
+            with open(cache_path, 'r') as f:
+                cache = json.load(f)
+            if cache.get('version') != CACHE_VERSION:
+                cache = {}
+        files = cache.get('files', {})
+
+        loaded = {}
+        changed = False
+        for name in names:
+            with open(os.path.join(path, f'{name}.json'), 'rb') as f:
+                content = f.read()
+            digest = hashlib.sha256(content).hexdigest()
+            cached = files.get(digest)
+            if cached is None:
+                cached = files[digest] = parse_abi(json.loads(content))
+                changed = True
+            loaded[name] = cached
+
+        if changed and cache_path is not None:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, 'w') as f:
+                json.dump({'version': CACHE_VERSION, 'files': files}, f, separators=(',', ':'))
+        return loaded
+
+    def _add(self, contract, parsed):
+        for name, selector, signature, types in parsed['functions']:
+            self.functions.setdefault((contract, name), []).append((selector, signature, types))
+            self.functions.setdefault((contract, signature), []).append((selector, signature, types))
+            self.selectors.setdefault(selector, (signature, types))
+            self.encoder(types)
+        for name, topic, signature, inputs in parsed['events']:
+            self.events.setdefault(topic, (name, signature, inputs))
+            self.decoder([t for _, t, indexed in inputs if not indexed])
+
+    def encoder(self, types):
+        key = _tuple_type(types)
+        if key not in self._encoders:
+            self._encoders[key] = codecs.get_encoder(key)
+        return self._encoders[key]
+
+    def decoder(self, types):
+        key = _tuple_type(types)
+        if key not in self._decoders:
+            self._decoders[key] = codecs.get_decoder(key)
+        return self._decoders[key]
+
+    def function(self, contract, fn, args):
+        """
+        Returns `(selector, signature, types)` of `contract.fn`. `fn` is either
+        a name or a full signature, overloads are told apart by the number of args.
+        """
+        candidates = [c for c in self.functions.get((contract, fn), []) if len(c[2]) == len(args)]
+        if len(candidates) != 1:
+            raise ValueError(f'abi registry: no single {contract}.{fn} taking {len(args)} args')
+        return candidates[0]
+
+    def encode_call(self, contract, fn, args):
+        selector, _, types = self.function(contract, fn, args)
+        return selector + self.encoder(types)(tuple(args)).hex()
+
+    def encode_signature(self, signature, types, args):
+        """
+        Encodes a call of a function that is not in the registry.
+        """
+        return '0x' + keccak(text=signature)[:4].hex() + self.encoder(types)(tuple(args)).hex()
+
+    def decode_call(self, calldata):
+        """
+        Returns `(signature, args)` of the calldata, or None for an unknown selector.
+        """
+        calldata = bytes.fromhex(calldata[2:]) if isinstance(calldata, str) else bytes(calldata)
+        selector = '0x' + calldata[:4].hex()
+        if selector not in self.selectors:
+            return None
+        signature, types = self.selectors[selector]
+        return signature, self.decoder(types)(ContextFramesBytesIO(calldata[4:]))
+
+    def decode_event(self, log):
+        """
+        Returns `(event name, args)` of a raw log, or None for an unknown event.
+        Addresses are checksummed, dynamic indexed args are left as topic hashes.
+        """
+        topics = [_hex(topic) for topic in log['topics']]
+        event = self.events.get(topics[0]) if len(topics) > 0 else None
+        if event is None:
+            return None
+
+        name, _, inputs = event
+        data = bytes.fromhex(_hex(log['data'])[2:])
+        values = iter(self.decoder([t for _, t, indexed in inputs if not indexed])(ContextFramesBytesIO(data)))
+        indexed_topics = iter(topics[1:])
+
+        args = {}
+        for arg, abi_type, indexed in inputs:
+            if not indexed:
+                value = next(values)
+            elif codecs.has_encoder(abi_type) and not codecs.get_encoder(abi_type).is_dynamic:
+                value = eth_abi.decode_single(abi_type, bytes.fromhex(next(indexed_topics)[2:]))
+            else:
+                value = next(indexed_topics)
+            args[arg] = to_checksum_address(value) if abi_type == 'address' else value
+        return name, args
+
+
+_default_registry = None
+
+
+def get_registry():
+    """
+    Returns the shared registry of interfaces/*.json, loaded on first use.
+    """
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = AbiRegistry()
+    return _default_registry
+
+
+def encode_call(contract, fn, args):
+    return get_registry().encode_call(contract, fn, args)
+
+
+def decode_event(log):
+    return get_registry().decode_event(log)
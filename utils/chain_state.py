@@ -0,0 +1,107 @@
+import os
+import glob
+import json
+import inspect
+import hashlib
+
+ROOT_PATH = os.path.join(os.path.dirname(__file__), '..')
+CONTRACTS_PATH = os.path.join(ROOT_PATH, 'contracts')
+KEY_LENGTH = 16
+MAX_VARIANTS = 4
+
+
+def sources_digest(path=CONTRACTS_PATH):
+    """
+    Returns the sha256 of every contract source under `path`.
+    """
+    digest = hashlib.sha256()
+    for source in sorted(glob.glob(os.path.join(path, '**', '*.vy'), recursive=True)):
+        digest.update(os.path.relpath(source, path).encode())
+        with open(source, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class ChainStateCache:
+    """
+    Chain state left by fixture setups, kept in `path` and keyed
+    by the setup code, its key args and the contract sources.
+
+    `load_or_run` applies a stored state instead of running the setup. The
+    node keeps only the accounts the setup changed and loads them only onto
+    a state where those accounts are what they were before the setup,
+    otherwise the setup just runs. It takes the `evm_recordState`,
+    `evm_dumpState` and `evm_loadState` methods of the local EVM, on other
+    nodes the cache is to be created disabled.
+    """
+
+    def __init__(self, web3, path, sources=None, enabled=True):
+        self.web3 = web3
+        self.path = path
+        self.sources = sources if sources is not None else sources_digest()
+        self.enabled = enabled
+        self.loaded = 0
+        self.recorded = 0
+        self.ran = 0
+
+    def key(self, name, setup, key_args=()):
+        digest = hashlib.sha256()
+        for part in (name, inspect.getsource(setup), repr(tuple(key_args)), self.sources):
+            digest.update(part.encode())
+        return digest.hexdigest()[:KEY_LENGTH]
+
+    def file(self, name, key):
+        return os.path.join(self.path, f'{name}-{key}.json')
+
+    def request(self, method, params=()):
+        response = self.web3.provider.make_request(method, list(params))
+        return response.get('result'), response.get('error')
+
+    def load_or_run(self, name, setup, *args, key_args=()):
+        """
+        Returns what `setup(*args)` returned when its state was stored, after
+        loading that state, or runs it and stores the state it leaves. The
+        result has to be JSON serializable. A setup reached from different
+        states, in different test modules, keeps up to MAX_VARIANTS states.
+        """
+        if not self.enabled:
+            self.ran += 1
+            return setup(*args)
+
+        path = self.file(name, self.key(name, setup, key_args))
+        variants = []
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                variants = json.load(f)
+        for variant in variants:
+            loaded, error = self.request('evm_loadState', [variant['state']])
+            if error is not None:
+                break
+            if loaded:
+                self.loaded += 1
+                return variant['result']
+
+        _, error = self.request('evm_recordState')
+        result = setup(*args)
+        state = None
+        if error is None:
+            state, error = self.request('evm_dumpState')
+        if error is not None:
+            self.ran += 1
+            return result
+
+        self.save(name, path, [{'result': result, 'state': state}] + variants[:MAX_VARIANTS - 1])
+        self.recorded += 1
+        return result
+
+    def save(self, name, path, variants):
+        os.makedirs(self.path, exist_ok=True)
+        # States of older sources or setup code can't be loaded anymore
+        for stale in glob.glob(os.path.join(self.path, f'{name}-{"?" * KEY_LENGTH}.json')):
+            if stale != path:
+                os.remove(stale)
+        # Parallel workers may store the same setup, the rename keeps the file whole
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(variants, f)
+        os.replace(temp_path, path)
@@ -1,11 +1,13 @@
 import os
 import sys
-from brownie import network, accounts
 
 ldo_token_address = '0x5A98FcBEA516Cf06857215779Fd812CA3beF1B32'
 lido_dao_agent_address = '0x3e40D73EB977Dc6a537aF587D48316feE66E9C8c'
 lido_dao_voting_address = '0x2e59A20f205bB85a89C53f1936454680651E618e'
 lido_dao_token_manager_address = '0xf73a1260d222f447210581DDf212D915c09a3249'
+lido_dao_finance_address = '0xB9E5CBB9CA5b0d659238807E84D0176930753d86'
+easy_track_address = '0xF0211b7660680B49De1A7E9f25C65660F0a13Fea'
+easy_track_evm_script_executor_address = '0xFE5986E06210aC1eCC1aDCafc0cc7f8D63B3F977'
 steth_token_address = '0xae7ab96520de3a18e5e111b5eaab095312d7fe84'
 balancer_rewards_contract = '0xcD4722B7c24C29e0413BDCd9e51404B4539D14aE'
 
@@ -13,6 +15,7 @@ min_rewards_amount = 5000 * 10**18
 
 
 def get_is_live():
+    from brownie import network
     return network.show_active() != 'development'
 
 
@@ -26,6 +29,8 @@ def get_env(name, is_required=True, message=None, default=None):
 
 
 def get_deployer_account(is_live):
+    from brownie import accounts
+
     if is_live and 'DEPLOYER' not in os.environ:
         raise EnvironmentError(
             'Please set DEPLOYER env variable to the deployer account name')
@@ -0,0 +1,87 @@
+from utils.evm_script import encode_call_script
+from utils.config import ldo_token_address, lido_dao_finance_address
+
+# TopUpRewardsManagers.vy limits
+MAX_MANAGERS = 16
+
+PAYMENT_SIGNATURE = 'newImmediatePayment(address,address,uint256,string)'
+UPDATE_SPENT_AMOUNT_SIGNATURE = 'update_spent_amount(uint256)'
+
+
+def _address(contract):
+    return str(getattr(contract, 'address', contract)).lower()
+
+
+def _registry():
+    from utils.abi_registry import get_registry
+
+    return get_registry()
+
+
+def _selector(signature):
+    from eth_utils import keccak
+
+    return keccak(text=signature)[:4].hex()
+
+
+def encode_top_up_calldata(managers, amounts):
+    """
+    Encodes the motion call data of a top up: `(address[16], uint256[16])`,
+    padded with zeros after the last manager.
+    """
+    if len(managers) != len(amounts):
+        raise ValueError('easy track: managers and amounts differ in length')
+    if len(managers) == 0 or len(managers) > MAX_MANAGERS:
+        raise ValueError(f'easy track: a motion tops up 1 to {MAX_MANAGERS} managers, got {len(managers)}')
+
+    padding = MAX_MANAGERS - len(managers)
+    addresses = [_address(m) for m in managers] + ['0x' + '00' * 20] * padding
+    return '0x' + _registry().encoder(['address[16]', 'uint256[16]'])(
+        (addresses, list(amounts) + [0] * padding)
+    ).hex()
+
+
+def top_up_script(factory, managers, amounts, finance=lido_dao_finance_address, ldo_token=ldo_token_address):
+    """
+    Returns the EVM script the factory builds for the top up, to check a
+    motion against before it is created or enacted.
+    """
+    registry = _registry()
+    # The empty reference is written out as its offset and zero length, eth_abi
+    # would pad it with one more word that the factory doesn't emit
+    actions = [
+        (_address(finance), registry.encode_signature(
+            PAYMENT_SIGNATURE,
+            ['address', 'address', 'uint256', 'uint256', 'uint256'],
+            [_address(ldo_token), _address(manager), amount, 128, 0]
+        ))
+        for manager, amount in zip(managers, amounts)
+    ]
+    actions.append((
+        _address(factory),
+        registry.encode_signature(UPDATE_SPENT_AMOUNT_SIGNATURE, ['uint256'], [sum(amounts)])
+    ))
+    return encode_call_script(actions)
+
+
+def top_up_permissions(factory, finance=lido_dao_finance_address):
+    """
+    Returns the permissions to register the factory with: the calls its
+    scripts are allowed to make, each as the target address followed by
+    the selector.
+    """
+    return (
+        '0x'
+        + _address(finance)[2:] + _selector(PAYMENT_SIGNATURE)
+        + _address(factory)[2:] + _selector(UPDATE_SPENT_AMOUNT_SIGNATURE)
+    )
+
+
+def create_top_up_motion(easy_track, factory, managers, amounts, tx_params):
+    """
+    Creates a motion topping up `managers` with `amounts` of LDO. Returns
+    `(motion_id, call data, tx)`, the call data is needed again to enact it.
+    """
+    calldata = encode_top_up_calldata(managers, amounts)
+    tx = easy_track.createMotion(factory, calldata, tx_params)
+    return (tx.events['MotionCreated']['_motionId'], calldata, tx)
@@ -1,6 +1,4 @@
-import eth_abi
-from web3 import Web3
-from eth_typing.evm import HexAddress
+import struct
 
 EMPTY_CALLSCRIPT = '0x00000001'
 
@@ -13,12 +11,101 @@ def strip_byte_prefix(hexstr):
     return hexstr[2:] if hexstr[0:2] == '0x' else hexstr
 
 
+def _to_bytes(data):
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return data
+    return bytes.fromhex(strip_byte_prefix(data))
+
+
+def encode_call_script_bytes(actions, spec_id=1):
+    """
+    Encodes `(to, calldata)` pairs into a spec-1 EVM call script.
+
+    Both `to` and `calldata` can be given either as hex strings or as bytes.
+    The script is written into a single preallocated buffer, so encoding
+    time grows linearly with the number of actions.
+    """
+    executor_id = _to_bytes(create_executor_id(spec_id))
+    encoded = [(_to_bytes(to), _to_bytes(calldata)) for to, calldata in actions]
+
+    size = len(executor_id)
+    for addr, calldata in encoded:
+        size += len(addr) + 4 + len(calldata)
+
+    result = bytearray(size)
+    view = memoryview(result)
+    offset = len(executor_id)
+    view[:offset] = executor_id
+    for addr, calldata in encoded:
+        end = offset + len(addr)
+        view[offset:end] = addr
+        struct.pack_into('>I', result, end, len(calldata) & 0xffffffff)
+        offset = end + 4
+        end = offset + len(calldata)
+        view[offset:end] = calldata
+        offset = end
+
+    return bytes(result)
+
+
 def encode_call_script(actions, spec_id=1):
-    result = create_executor_id(spec_id)
-    for to, calldata in actions:
-        addr_bytes = Web3.toBytes(hexstr=HexAddress(to)).hex()
-        calldata_bytes = strip_byte_prefix(calldata)
-        length = eth_abi.encode_single('int256',
-                                       len(calldata_bytes) // 2).hex()
-        result += addr_bytes + length[56:] + calldata_bytes
-    return result
\ No newline at end of file
+    return '0x' + encode_call_script_bytes(actions, spec_id).hex()
+
+
+def decode_call_script(script, spec_id=1):
+    """
+    Lazily decodes a spec-1 EVM call script produced by `encode_call_script`.
+
+    Yields `(to, selector, calldata)` tuples, where `calldata` is a memoryview
+    into the script, so no per-action copies are made. Raises `ValueError`
+    on an unexpected executor id or a truncated action.
+    """
+    view = memoryview(_to_bytes(script))
+    executor_id = _to_bytes(create_executor_id(spec_id))
+    offset = len(executor_id)
+
+    if view[:offset] != executor_id:
+        raise ValueError(f'evm script: unexpected executor id 0x{view[:offset].hex()}')
+
+    while offset < len(view):
+        if offset + 24 > len(view):
+            raise ValueError(f'evm script: truncated action header at byte {offset}')
+
+        to = '0x' + view[offset:offset + 20].hex()
+        (length,) = struct.unpack_from('>I', view, offset + 20)
+        offset += 24
+
+        if offset + length > len(view):
+            raise ValueError(f'evm script: truncated calldata at byte {offset}')
+
+        calldata = view[offset:offset + length]
+        offset += length
+
+        yield (to, '0x' + calldata[:4].hex(), calldata)
+
+
+def validate_call_script(script, spec_id=1):
+    """
+    Walks the whole script and returns the number of actions in it.
+    """
+    return sum(1 for _ in decode_call_script(script, spec_id))
+
+
+def decode_call_script_calls(script, registry=None, spec_id=1):
+    """
+    Decodes the arguments of every action in the script with an `AbiRegistry`,
+    the shared one of interfaces/*.json by default.
+
+    Yields `(to, signature, args)` tuples. Actions with an unknown selector
+    are yielded as `(to, selector, None)`.
+    """
+    if registry is None:
+        from utils.abi_registry import get_registry
+        registry = get_registry()
+
+    for to, selector, calldata in decode_call_script(script, spec_id):
+        decoded = registry.decode_call(calldata)
+        if decoded is None:
+            yield (to, selector, None)
+            continue
+        yield (to, *decoded)
@@ -0,0 +1,310 @@
+import os
+import glob
+import json
+import asyncio
+
+import aiohttp
+import eth_abi
+from eth_abi.exceptions import DecodingError
+from eth_account import Account
+from eth_utils import function_signature_to_4byte_selector, to_checksum_address
+
+from utils.config import ldo_token_address
+from utils.keeper import STATUS_OK, status_reason
+from utils.metrics import Metrics
+from utils.multicall import STATUS_FIELDS
+
+
+def selector(signature):
+    return '0x' + function_signature_to_4byte_selector(signature).hex()
+
+
+STATUS_SELECTOR = selector('status()')
+START_SELECTOR = selector('start_next_rewards_period()')
+BALANCE_OF_SELECTOR = selector('balanceOf(address)')
+LEGACY_VIEWS = [
+    ('rewards_contract', selector('rewards_contract()'), 'address'),
+    ('weekly_amount', selector('weekly_amount()'), 'uint256'),
+    ('rewards_iteration', selector('rewards_iteration()'), 'uint256'),
+    ('balancer_period_finish', selector('balancer_period_finish()'), 'uint256'),
+    ('period_finish', selector('period_finish()'), 'uint256'),
+]
+
+
+def load_deployments(path='.'):
+    """
+    Returns `{network: [manager addresses]}` collected from every deployed-*.json
+    written by the deploy scripts.
+    """
+    deployments = {}
+    for file_path in sorted(glob.glob(os.path.join(path, 'deployed-*.json'))):
+        network = os.path.basename(file_path)[len('deployed-'):-len('.json')]
+        for prefix in ('managers-', 'factory-'):
+            if network.startswith(prefix):
+                network = network[len(prefix):]
+
+        with open(file_path, 'r') as f:
+            data = json.load(f)
+
+        managers = deployments.setdefault(network, [])
+        if 'balancerRewardsManager' in data:
+            managers.append(data['balancerRewardsManager']['baseAddress'])
+        for manager in data.get('balancerRewardsManagers', []):
+            managers.append(manager['baseAddress'])
+
+    return {network: managers for network, managers in deployments.items() if managers}
+
+
+class RpcError(Exception):
+    def __init__(self, message, code=None, data=None):
+        super().__init__(message)
+        self.code = code
+        self.data = data
+
+    @property
+    def is_revert(self):
+        """
+        Whether the node executed the call and it reverted, as geth (code 3,
+        "execution reverted") and ganache ("VM Exception ... revert") report it.
+        """
+        return self.code == 3 or 'revert' in str(self).lower()
+
+
+class RpcClient:
+    """
+    JSON-RPC client sharing one keep-alive connection pool per endpoint.
+    Every request is timed into `metrics`, labeled with the method and `network`.
+    """
+
+    def __init__(self, url, session, metrics=None, network=None):
+        self.url = url
+        self.session = session
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.network = network
+        self.request_id = 0
+
+    async def request(self, method, params):
+        self.request_id += 1
+        payload = {'jsonrpc': '2.0', 'id': self.request_id, 'method': method, 'params': params}
+        with self.metrics.timer('fleet_rpc_seconds', network=self.network, method=method):
+            async with self.session.post(self.url, json=payload) as response:
+                result = await response.json(content_type=None)
+        if 'error' in result:
+            error = result['error']
+            if not isinstance(error, dict):
+                raise RpcError(str(error))
+            raise RpcError(error.get('message', str(error)), error.get('code'), error.get('data'))
+        return result['result']
+
+    async def call(self, to, data, block='latest'):
+        return bytes.fromhex((await self.request('eth_call', [{'to': to, 'data': data}, block]))[2:])
+
+
+class NonceManager:
+    """
+    Hands out consecutive nonces for one account on one endpoint, so transactions
+    can be signed and sent in parallel.
+    """
+
+    def __init__(self, rpc, address):
+        self.rpc = rpc
+        self.address = address
+        self.nonce = None
+        self.lock = asyncio.Lock()
+
+    async def next(self):
+        async with self.lock:
+            if self.nonce is None:
+                self.nonce = int(await self.rpc.request('eth_getTransactionCount', [self.address, 'pending']), 16)
+            nonce = self.nonce
+            self.nonce += 1
+            return nonce
+
+    def reset(self):
+        self.nonce = None
+
+
+class Fleet:
+    """
+    Queries and services every manager of every network concurrently.
+
+    `endpoints` maps network names to RPC URLs and `deployments` maps them to
+    manager addresses, see `load_deployments`. Transactions are signed with
+    `private_key`, which is only needed for `start_due`. RPC timings and sent
+    transactions go to `metrics`.
+    """
+
+    def __init__(
+        self,
+        endpoints,
+        deployments,
+        private_key=None,
+        priority_fee=2 * 10**9,
+        connections_per_endpoint=8,
+        metrics=None
+    ):
+        self.endpoints = endpoints
+        self.deployments = deployments
+        self.account = Account.from_key(private_key) if private_key is not None else None
+        self.priority_fee = priority_fee
+        self.connections_per_endpoint = connections_per_endpoint
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.sessions = []
+        self.clients = {}
+        self.nonces = {}
+        self.chain_ids = {}
+
+    async def __aenter__(self):
+        for network, url in self.endpoints.items():
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.connections_per_endpoint, keepalive_timeout=60)
+            )
+            self.sessions.append(session)
+            self.clients[network] = RpcClient(url, session, self.metrics, network)
+            if self.account is not None:
+                self.nonces[network] = NonceManager(self.clients[network], self.account.address)
+        return self
+
+    async def __aexit__(self, *args):
+        await asyncio.gather(*[session.close() for session in self.sessions])
+
+    def managers(self):
+        return [
+            (network, manager)
+            for network, managers in self.deployments.items()
+            if network in self.clients
+            for manager in managers
+        ]
+
+    async def chain_time(self, network):
+        block = await self.clients[network].request('eth_getBlockByNumber', ['latest', False])
+        return int(block['timestamp'], 16)
+
+    async def status(self, network, manager, now):
+        rpc = self.clients[network]
+        try:
+            output = await rpc.call(manager, STATUS_SELECTOR)
+        except RpcError as e:
+            # Managers deployed before status() revert on the unknown selector
+            if not e.is_revert:
+                raise
+            output = b''
+
+        if output:
+            values = eth_abi.decode_abi([t for _, t in STATUS_FIELDS], output)
+            status = dict(zip([name for name, _ in STATUS_FIELDS], values))
+        else:
+            status = await self.legacy_status(network, manager, now)
+
+        status['rewards_contract'] = to_checksum_address(status['rewards_contract'])
+        status.update({'network': network, 'manager': manager})
+        return status
+
+    async def legacy_status(self, network, manager, now):
+        rpc = self.clients[network]
+        rewards_contract = eth_abi.decode_single('address', await rpc.call(manager, LEGACY_VIEWS[0][1]))
+
+        views = LEGACY_VIEWS[1:] if int(rewards_contract, 16) != 0 else LEGACY_VIEWS[1:3]
+        results = await asyncio.gather(
+            rpc.call(ldo_token_address, BALANCE_OF_SELECTOR + manager[2:].lower().rjust(64, '0')),
+            *[rpc.call(manager, data) for _, data, _ in views]
+        )
+        status = {'rewards_contract': rewards_contract, 'balancer_period_finish': 0, 'period_finish': 0}
+        status['ldo_balance'] = eth_abi.decode_single('uint256', results[0])
+        for (name, _, abi_type), result in zip(views, results[1:]):
+            status[name] = eth_abi.decode_single(abi_type, result)
+
+        status['reason'] = status_reason(
+            rewards_contract,
+            status['rewards_iteration'],
+            status['weekly_amount'],
+            status['ldo_balance'],
+            status['balancer_period_finish'],
+            now
+        )
+        status['can_start'] = status['reason'] == STATUS_OK
+        status['is_balancer_rewards_period_finished'] = now >= status['balancer_period_finish']
+        status['is_rewards_period_finished'] = now >= status['period_finish']
+        return status
+
+    async def checked_status(self, network, manager, now):
+        """
+        Returns the status of the manager or, when it can't be read, an entry
+        with the `error` and `can_start` set to false.
+        """
+        try:
+            if isinstance(now, Exception):
+                raise now
+            return await self.status(network, manager, now)
+        except (RpcError, aiohttp.ClientError, asyncio.TimeoutError, DecodingError, ValueError) as e:
+            self.metrics.inc('fleet_status_failures_total', network=network)
+            return {'network': network, 'manager': manager, 'error': e, 'can_start': False}
+
+    async def statuses(self):
+        """
+        Returns the status of every manager, querying all of them concurrently.
+        An unreachable network or manager fails only its own entries, see
+        `checked_status`.
+        """
+        networks = list(self.clients.keys())
+        times = await asyncio.gather(*[self.chain_time(n) for n in networks], return_exceptions=True)
+        times = dict(zip(networks, times))
+        return await asyncio.gather(*[
+            self.checked_status(network, manager, times[network])
+            for network, manager in self.managers()
+        ])
+
+    async def fees(self, network):
+        rpc = self.clients[network]
+        block = await rpc.request('eth_getBlockByNumber', ['latest', False])
+        if 'baseFeePerGas' not in block:
+            return {'gasPrice': int(await rpc.request('eth_gasPrice', []), 16)}
+        base_fee = int(block['baseFeePerGas'], 16)
+        return {
+            'maxPriorityFeePerGas': self.priority_fee,
+            'maxFeePerGas': 2 * base_fee + self.priority_fee,
+        }
+
+    async def start(self, network, manager):
+        """
+        Sends `start_next_rewards_period` to the manager and returns the tx hash.
+        eth_estimateGas runs first, so a reverting call raises RpcError before
+        anything is signed.
+        """
+        rpc = self.clients[network]
+        tx = {'from': self.account.address, 'to': to_checksum_address(manager), 'data': START_SELECTOR}
+        gas = int(await rpc.request('eth_estimateGas', [tx]), 16)
+
+        if network not in self.chain_ids:
+            self.chain_ids[network] = int(await rpc.request('eth_chainId', []), 16)
+        tx.update(await self.fees(network))
+        tx.update({
+            'gas': gas * 12 // 10,
+            'chainId': self.chain_ids[network],
+            'value': 0,
+            'nonce': await self.nonces[network].next(),
+        })
+        del tx['from']
+
+        signed = self.account.sign_transaction(tx)
+        try:
+            tx_hash = await rpc.request('eth_sendRawTransaction', [signed.rawTransaction.hex()])
+        except RpcError:
+            self.nonces[network].reset()
+            self.metrics.inc('fleet_tx_failures_total', network=network)
+            raise
+        self.metrics.inc('fleet_txs_sent_total', network=network)
+        self.metrics.record('start_sent', network=network, manager=manager, tx=tx_hash, gas_limit=tx['gas'])
+        return tx_hash
+
+    async def start_due(self):
+        """
+        Starts the rewards periods of every manager that can start one now, in parallel.
+        Returns `(status, tx hash or RpcError)` pairs for them.
+        """
+        due = [status for status in await self.statuses() if status['can_start']]
+        results = await asyncio.gather(
+            *[self.start(status['network'], status['manager']) for status in due],
+            return_exceptions=True
+        )
+        return list(zip(due, results))
@@ -0,0 +1,444 @@
+import os
+import json
+import time
+import random
+
+from eth.vm.spoof import SpoofTransaction
+from eth_abi.decoding import ContextFramesBytesIO
+from eth_utils import keccak, to_canonical_address, to_checksum_address
+
+from utils.abi_registry import get_registry
+from utils.config import ldo_token_address
+from utils.keeper import STATUS_NAMES
+from utils.local_evm import LocalEvm
+from utils.multicall import STATUS_FIELDS
+from utils.py_evm_internals import set_block_timestamp
+
+BUILD_PATH = os.path.join(os.path.dirname(__file__), '..', 'build', 'contracts')
+ZERO_ADDRESS = '0x' + '00' * 20
+SECONDS_PER_WEEK = 7 * 24 * 60 * 60
+WEEKS_PER_PERIOD = 4
+MAX_UINT256 = 2**256 - 1
+
+PERIOD_STARTED_TOPIC = int.from_bytes(keccak(text='NewRewardsPeriodStarted(uint256)'), 'big')
+
+
+class InvariantViolation(AssertionError):
+    def __init__(self, invariant, message):
+        super().__init__(f'{invariant}: {message}')
+        self.invariant = invariant
+
+
+def load_bytecode(name, path=BUILD_PATH):
+    try:
+        with open(os.path.join(path, f'{name}.json'), 'r') as f:
+            return json.load(f)['bytecode']
+    except FileNotFoundError:
+        raise FileNotFoundError(f'{name} is not compiled, run `brownie compile` first') from None
+
+
+class Harness:
+    """
+    RewardsManager.vy wired to two BalancerLiquidityGaugeMock contracts and
+    the MiniMe LDO lookalike, in an in-process py-evm state.
+
+    Contracts are deployed once through LocalEvm. After that transactions
+    are applied to the pending block state directly, without mining or
+    JSON-RPC, and `reset` rolls the state back to the deployment through
+    the state journal. `executions` counts the transactions and view calls run.
+    """
+
+    def __init__(self, min_rewards_amount=10**18):
+        self.evm = LocalEvm(accounts=3)
+        self.owner, self.stranger, self.other = [to_checksum_address(a) for a in self.evm.keys]
+        self.min_rewards_amount = min_rewards_amount
+        self.registry = get_registry()
+        self.selectors = {}
+        self.executions = 0
+
+        # Like on mainnet precompiles hold dust, so transactions touching them don't delete
+        # them as empty accounts, which the state journal can't roll back across transactions
+        for precompile in range(1, 10):
+            self.evm.set_balance('0x' + format(precompile, '040x'), 1)
+
+        token = self.deploy('MiniMeTokenMock', [], [])
+        code = self.evm.state_at('latest').get_code(to_canonical_address(token))
+        self.evm.set_code(ldo_token_address, '0x' + code.hex())
+        self.gauges = [self.deploy('BalancerLiquidityGaugeMock', ['address', 'address'], [self.owner, ldo_token_address])
+                       for _ in range(2)]
+        self.manager = self.deploy(
+            'RewardsManager',
+            ['address', 'uint256', 'address'],
+            [self.owner, min_rewards_amount, self.gauges[0]]
+        )
+
+        self.state = self.evm.pending_vm().state
+        self.start_time = self.timestamp = self.state.timestamp
+        for gauge in self.gauges:
+            self.transact(self.owner, gauge, 'set_reward_distributor(address,address)',
+                          ['address', 'address'], [ldo_token_address, self.manager])
+        self.base = self.state.snapshot()
+
+    def deploy(self, name, types, args):
+        data = load_bytecode(name) + self.registry.encoder(types)(tuple(args)).hex()
+        tx_hash = self.evm.send_transaction({'from': self.owner, 'data': data})
+        return self.evm.receipt(tx_hash)['contractAddress']
+
+    def reset(self):
+        self.state.revert(self.base)
+        self.base = self.state.snapshot()
+        self.timestamp = self.start_time
+
+    def _apply(self, sender, to, signature, types, args):
+        self.executions += 1
+        set_block_timestamp(self.state, self.timestamp)
+        selector = self.selectors.get(signature)
+        if selector is None:
+            selector = self.selectors[signature] = keccak(text=signature)[:4]
+        sender, unsigned = self.evm.build_transaction({
+            'from': sender,
+            'to': to,
+            'data': (selector + self.registry.encoder(types)(tuple(args))).hex(),
+            'gas': 10**7,
+        }, self.state)
+        return self.state.apply_transaction(SpoofTransaction(unsigned, from_=sender))
+
+    def transact(self, sender, to, signature, types=(), args=()):
+        """
+        Returns `(revert reason or None, logs)`, a reverted call leaves no changes.
+        """
+        computation = self._apply(sender, to, signature, list(types), list(args))
+        if computation.is_error:
+            return LocalEvm.error_data(computation)[1] or 'reverted', []
+        return None, computation.get_log_entries()
+
+    def call(self, to, signature, types=(), args=(), output_types=('uint256',)):
+        snapshot = self.state.snapshot()
+        try:
+            computation = self._apply(ZERO_ADDRESS, to, signature, list(types), list(args))
+        finally:
+            self.state.revert(snapshot)
+        if computation.is_error:
+            raise InvariantViolation('view', f'{signature} reverted: {LocalEvm.error_data(computation)[1]}')
+        values = self.registry.decoder(list(output_types))(ContextFramesBytesIO(computation.output))
+        return values[0] if len(values) == 1 else values
+
+    def ldo_balance(self, holder):
+        return self.call(ldo_token_address, 'balanceOf(address)', ['address'], [holder])
+
+    def status(self):
+        values = self.call(self.manager, 'status()', output_types=[t for _, t in STATUS_FIELDS])
+        return dict(zip([name for name, _ in STATUS_FIELDS], values))
+
+    def gauge_reward(self, gauge):
+        return self.call(
+            gauge, 'reward_data(address)', ['address'], [ldo_token_address],
+            output_types=['address', 'address', 'uint256', 'uint256', 'uint256', 'uint256']
+        )
+
+
+#
+# Sequences
+#
+def random_amount(rng, min_rewards_amount):
+    kind = rng.random()
+    if kind < 0.2:
+        return rng.randint(0, 10)
+    if kind < 0.7:
+        return rng.randint(min_rewards_amount // 4, 2 * min_rewards_amount)
+    return rng.randint(0, 10**6 * min_rewards_amount)
+
+
+def random_action(rng, min_rewards_amount):
+    """
+    Returns one step of a sequence as an `(action, *args)` tuple.
+    """
+    kind = rng.random()
+    if kind < 0.2:
+        return ('top_up', random_amount(rng, min_rewards_amount))
+    if kind < 0.4:
+        return ('sleep', rng.choice([SECONDS_PER_WEEK, SECONDS_PER_WEEK - 1, rng.randint(0, 2 * SECONDS_PER_WEEK)]))
+    if kind < 0.75:
+        return ('start',)
+    if kind < 0.82:
+        return ('set_rewards_contract', rng.randint(0, 2))
+    if kind < 0.87:
+        return ('hand_over',)
+    if kind < 0.93:
+        return ('hand_back',)
+    return ('recover', random_amount(rng, min_rewards_amount))
+
+
+def random_sequence(rng, length, min_rewards_amount):
+    return [random_action(rng, min_rewards_amount) for _ in range(length)]
+
+
+class Runner:
+    """
+    Replays action sequences on a Harness, keeping a model of the manager
+    next to it and checking the invariants after every step:
+
+    - `conservation`: LDO held by the manager and the gauges plus the
+      recovered LDO equals the LDO topped up
+    - `deposit`: a started period deposits exactly the announced amount
+      into the gauge, never more than the manager held
+    - `state`: `weekly_amount` and `rewards_iteration` follow the model,
+      the weekly amount being recalculated from the balance every 4th period
+    - `period_finish`: `period_finish` is the gauge's period finish plus
+      the weeks left of the current `rewards_iteration`
+    - `status`: while the manager is the gauge distributor, `status()`
+      predicts whether `start_next_rewards_period` succeeds and with which
+      revert reason. Without the distributor role the call always reverts.
+    """
+
+    def __init__(self, harness, invariants=None):
+        self.harness = harness
+        self.invariants = invariants if invariants is not None else [self.check_invariants]
+
+    def replay(self, sequence):
+        """
+        Runs `sequence` from the deployed state. Returns None if every step
+        passes, `(step index, InvariantViolation)` otherwise.
+        """
+        h = self.harness
+        h.reset()
+        self.topped_up = 0
+        self.recovered = 0
+        self.weekly_amount = 0
+        self.iteration = 0
+        self.rewards_contract = h.gauges[0]
+        self.distributors = {gauge: h.manager for gauge in h.gauges}
+
+        for index, step in enumerate(sequence):
+            try:
+                getattr(self, f'do_{step[0]}')(*step[1:])
+                # time alone changes no stored state
+                if step[0] == 'sleep':
+                    continue
+                for check in self.invariants:
+                    check(self)
+            except InvariantViolation as e:
+                return index, e
+        return None
+
+    def do_top_up(self, amount):
+        h = self.harness
+        h.transact(h.owner, ldo_token_address, 'mint(address,uint256)', ['address', 'uint256'], [h.manager, amount])
+        self.topped_up += amount
+
+    def do_sleep(self, seconds):
+        self.harness.timestamp += seconds
+
+    def do_start(self):
+        h = self.harness
+        status = h.status()
+        balance = status['ldo_balance']
+        gauge = self.rewards_contract
+        gauge_balance = h.ldo_balance(gauge) if gauge != ZERO_ADDRESS else 0
+
+        error, logs = h.transact(h.stranger, h.manager, 'start_next_rewards_period()')
+
+        if gauge != ZERO_ADDRESS and self.distributors[gauge] != h.manager:
+            if error is None:
+                raise InvariantViolation('status', 'started a period without the distributor role')
+            return
+        expected_error = None if status['can_start'] else f'manager: {STATUS_NAMES[status["reason"]]}'
+        if error != expected_error:
+            raise InvariantViolation(
+                'status', f'status() reason {status["reason"]} but start_next_rewards_period gave {error!r}'
+            )
+        if error is not None:
+            return
+
+        amounts = [
+            int.from_bytes(data, 'big') for address, topics, data in logs
+            if to_checksum_address(address) == h.manager and tuple(topics[:1]) == (PERIOD_STARTED_TOPIC,)
+        ]
+        deposited = h.ldo_balance(gauge) - gauge_balance
+        if amounts != [deposited]:
+            raise InvariantViolation('deposit', f'announced {amounts}, gauge received {deposited}')
+        if deposited > balance:
+            raise InvariantViolation('deposit', f'deposited {deposited} out of a balance of {balance}')
+
+        if self.iteration == 0:
+            self.weekly_amount = balance // WEEKS_PER_PERIOD
+        self.iteration = (self.iteration + 1) % WEEKS_PER_PERIOD
+
+    def do_set_rewards_contract(self, index):
+        h = self.harness
+        target = (h.gauges + [ZERO_ADDRESS])[index]
+        error, _ = h.transact(h.owner, h.manager, 'set_rewards_contract(address)', ['address'], [target])
+        if error is None:
+            self.rewards_contract = target
+
+    def do_hand_over(self):
+        h = self.harness
+        error, _ = h.transact(h.owner, h.manager, 'replace_me_by_other_distributor(address)', ['address'], [h.other])
+        if error is None:
+            self.distributors[self.rewards_contract] = h.other
+
+    def do_hand_back(self):
+        h = self.harness
+        for gauge in h.gauges:
+            if self.distributors[gauge] == h.other:
+                h.transact(h.other, gauge, 'set_reward_distributor(address,address)',
+                           ['address', 'address'], [ldo_token_address, h.manager])
+                self.distributors[gauge] = h.manager
+
+    def do_recover(self, amount):
+        h = self.harness
+        error, _ = h.transact(h.owner, h.manager, 'recover_erc20(address,uint256,address)',
+                              ['address', 'uint256', 'address'], [ldo_token_address, amount, h.owner])
+        if error is None:
+            self.recovered += amount
+
+    @staticmethod
+    def check_invariants(runner):
+        h = runner.harness
+        held = h.ldo_balance(h.manager) + sum(h.ldo_balance(gauge) for gauge in h.gauges)
+        if held + runner.recovered != runner.topped_up:
+            raise InvariantViolation(
+                'conservation', f'{held} held and {runner.recovered} recovered of {runner.topped_up} topped up'
+            )
+
+        status = h.status()
+        if (status['weekly_amount'], status['rewards_iteration']) != (runner.weekly_amount, runner.iteration):
+            raise InvariantViolation(
+                'state',
+                f'weekly_amount {status["weekly_amount"]}, rewards_iteration {status["rewards_iteration"]}, '
+                f'expected {runner.weekly_amount}, {runner.iteration}'
+            )
+
+        if status['rewards_contract'] != ZERO_ADDRESS:
+            gauge_finish = h.gauge_reward(status['rewards_contract'])[2]
+            expected = gauge_finish + ((WEEKS_PER_PERIOD - status['rewards_iteration']) % WEEKS_PER_PERIOD) \
+                * SECONDS_PER_WEEK
+            if status['balancer_period_finish'] != gauge_finish or status['period_finish'] != expected:
+                raise InvariantViolation(
+                    'period_finish',
+                    f'period_finish {status["period_finish"]} at rewards_iteration '
+                    f'{status["rewards_iteration"]}, expected {expected}'
+                )
+
+
+def shrink(runner, sequence, invariant, max_replays=2000):
+    """
+    Returns the shortest and simplest sequence found that still breaks
+    `invariant`: steps after the failing one are dropped, then chunks of
+    steps are removed while halving the chunk size, then amounts and
+    durations are reduced. Greedy, every candidate costs one replay.
+    """
+    replays = 0
+
+    def fails(candidate):
+        nonlocal replays
+        replays += 1
+        result = runner.replay(candidate)
+        return result is not None and result[1].invariant == invariant
+
+    result = runner.replay(sequence)
+    sequence = list(sequence[:result[0] + 1])
+
+    changed = True
+    while changed and replays < max_replays:
+        changed = False
+
+        chunk = max(len(sequence) // 2, 1)
+        while chunk >= 1 and replays < max_replays:
+            start = 0
+            while start < len(sequence) and replays < max_replays:
+                candidate = sequence[:start] + sequence[start + chunk:]
+                if candidate and fails(candidate):
+                    sequence = candidate
+                    changed = True
+                else:
+                    start += chunk
+            chunk //= 2
+
+        for index, step in enumerate(sequence):
+            if len(step) < 2 or not isinstance(step[1], int):
+                continue
+            for value in (0, 1, runner.harness.min_rewards_amount, step[1] // 2):
+                if value >= step[1] or replays >= max_replays:
+                    continue
+                candidate = sequence[:index] + [(step[0], value)] + sequence[index + 1:]
+                if fails(candidate):
+                    sequence = candidate
+                    changed = True
+                    break
+
+    return sequence
+
+
+#
+# Campaigns
+#
+_worker_harness = None
+
+
+def _init_worker(min_rewards_amount):
+    global _worker_harness
+    _worker_harness = Harness(min_rewards_amount)
+
+
+def run_batch(seed, sequences, length, harness=None):
+    """
+    Replays `sequences` random sequences of `length` steps, generated from
+    `seed`. Stops at the first failure and shrinks it. Returns a dict of
+    `sequences`, `steps`, `executions`, `seconds` and the `failure`, if any,
+    with its `seed`, `invariant`, `message` and shrunk `sequence`.
+    """
+    harness = harness or _worker_harness
+    runner = Runner(harness)
+    rng = random.Random(seed)
+    executions = harness.executions
+    started = time.perf_counter()
+    result = {'sequences': 0, 'steps': 0, 'failure': None}
+
+    for _ in range(sequences):
+        sequence = random_sequence(rng, length, harness.min_rewards_amount)
+        failed = runner.replay(sequence)
+        result['sequences'] += 1
+        result['steps'] += len(sequence) if failed is None else failed[0] + 1
+        if failed is not None:
+            result['failure'] = {
+                'seed': seed,
+                'invariant': failed[1].invariant,
+                'message': str(failed[1]),
+                'sequence': shrink(runner, sequence, failed[1].invariant),
+            }
+            break
+
+    result['executions'] = harness.executions - executions
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def run_campaign(sequences=1000, length=50, workers=None, seed=0, batch_size=50, min_rewards_amount=10**18):
+    """
+    Spreads `sequences` random sequences over a pool of `workers` processes
+    (one per core by default), each with its own Harness, in batches of
+    `batch_size` seeded from `seed`. Returns the totals of `run_batch`
+    with `executions_per_second` over the wall time and the list of `failures`.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    batches = [(seed + index, min(batch_size, sequences - start), length)
+               for index, start in enumerate(range(0, sequences, batch_size))]
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(min_rewards_amount,)) as pool:
+        results = list(pool.map(run_batch, *zip(*batches)))
+    seconds = time.perf_counter() - started
+
+    executions = sum(r['executions'] for r in results)
+    return {
+        'workers': workers,
+        'sequences': sum(r['sequences'] for r in results),
+        'steps': sum(r['steps'] for r in results),
+        'executions': executions,
+        'seconds': seconds,
+        'executions_per_second': executions / seconds if seconds else 0,
+        'failures': [r['failure'] for r in results if r['failure'] is not None],
+    }
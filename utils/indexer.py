@@ -0,0 +1,206 @@
+import json
+import sqlite3
+
+from eth_utils import to_checksum_address
+
+from utils.abi_registry import AbiRegistry
+
+
+def _event(name, *inputs):
+    return {
+        'type': 'event',
+        'name': name,
+        'inputs': [{'name': arg, 'type': abi_type, 'indexed': indexed} for arg, abi_type, indexed in inputs],
+    }
+
+
+# RewardsManager events kept in the database
+EVENTS_ABI = [
+    _event('NewRewardsPeriodStarted', ('amount', 'uint256', False)),
+    _event('WeeklyRewardsAmountUpdated', ('newWeeklyRewardsAmount', 'uint256', False)),
+    _event(
+        'ERC20Recovered',
+        ('token', 'address', True),
+        ('amount', 'uint256', False),
+        ('recipient', 'address', True)
+    ),
+    _event('RewardsContractUpdated', ('newRewardsContract', 'address', True)),
+]
+
+REGISTRY = AbiRegistry(names=(), abis={'RewardsManager': EVENTS_ABI}, cache_path=None)
+TOPICS = {topic: name for topic, (name, _, _) in REGISTRY.events.items()}
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS events (
+    address TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    event TEXT NOT NULL,
+    args TEXT NOT NULL,
+    PRIMARY KEY (address, block_number, log_index)
+);
+CREATE TABLE IF NOT EXISTS cursors (
+    address TEXT PRIMARY KEY,
+    block_number INTEGER NOT NULL,
+    block_hash TEXT NOT NULL
+);
+'''
+
+
+def _hex(value):
+    return value if isinstance(value, str) else '0x' + bytes(value).hex()
+
+
+def decode_log(log):
+    """
+    Returns `(event name, args)` of a raw log, or None for events not in EVENTS_ABI.
+    """
+    return REGISTRY.decode_event(log)
+
+
+class RewardsIndexer:
+    """
+    Keeps the events of a manager in an SQLite database.
+
+    Logs are fetched with eth_getLogs in block ranges that halve when the node
+    rejects a query and double after every successful one, up to `max_range`.
+    Only blocks `confirmations` deep are indexed. The hash of the last indexed
+    block is stored with the cursor, if it's gone from the chain the last
+    `reorg_depth` blocks are dropped and indexed again.
+    """
+
+    def __init__(
+        self,
+        web3,
+        address,
+        db_path,
+        start_block,
+        confirmations=12,
+        reorg_depth=64,
+        max_range=10_000
+    ):
+        self.web3 = web3
+        self.address = to_checksum_address(address)
+        self.db = sqlite3.connect(db_path)
+        self.db.executescript(SCHEMA)
+        self.start_block = start_block
+        self.confirmations = confirmations
+        self.reorg_depth = reorg_depth
+        self.max_range = max_range
+        self.block_range = max_range
+
+    def close(self):
+        self.db.close()
+
+    def cursor(self):
+        """
+        Returns `(block number, block hash)` of the last indexed block, or None.
+        """
+        return self.db.execute(
+            'SELECT block_number, block_hash FROM cursors WHERE address = ?', (self.address,)
+        ).fetchone()
+
+    def block_hash(self, block_number):
+        return _hex(self.web3.eth.get_block(block_number)['hash'])
+
+    def set_cursor(self, block_number):
+        if block_number < self.start_block:
+            self.db.execute('DELETE FROM cursors WHERE address = ?', (self.address,))
+            return
+        self.db.execute(
+            'INSERT OR REPLACE INTO cursors (address, block_number, block_hash) VALUES (?, ?, ?)',
+            (self.address, block_number, self.block_hash(block_number))
+        )
+
+    def rollback(self, block_number):
+        """
+        Drops the events after `block_number` and moves the cursor back to it.
+        """
+        with self.db:
+            self.db.execute(
+                'DELETE FROM events WHERE address = ? AND block_number > ?', (self.address, block_number)
+            )
+            self.set_cursor(block_number)
+
+    def check_reorg(self):
+        """
+        Rolls back `reorg_depth` blocks if the last indexed block was reorged out.
+        Returns the first block to index.
+        """
+        cursor = self.cursor()
+        if cursor is None:
+            return self.start_block
+
+        block_number, block_hash = cursor
+        if block_number > self.web3.eth.block_number or self.block_hash(block_number) != block_hash:
+            block_number = max(block_number - self.reorg_depth, self.start_block - 1)
+            print(f'reorg detected, rolling back to block {block_number}')
+            self.rollback(block_number)
+        return block_number + 1
+
+    def get_logs(self, from_block, to_block):
+        return self.web3.eth.get_logs({
+            'address': self.address,
+            'fromBlock': from_block,
+            'toBlock': to_block,
+            'topics': [list(TOPICS.keys())],
+        })
+
+    def store(self, logs):
+        rows = []
+        for log in logs:
+            decoded = decode_log(log)
+            if decoded is None:
+                continue
+            name, args = decoded
+            rows.append((
+                self.address,
+                log['blockNumber'],
+                log['logIndex'],
+                _hex(log['transactionHash']),
+                name,
+                json.dumps(args),
+            ))
+        self.db.executemany('INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?)', rows)
+        return len(rows)
+
+    def sync(self):
+        """
+        Indexes the blocks from the cursor up to the latest confirmed block.
+        Returns the number of new events.
+        """
+        from_block = self.check_reorg()
+        to_block = self.web3.eth.block_number - self.confirmations
+        stored = 0
+
+        while from_block <= to_block:
+            chunk_end = min(from_block + self.block_range - 1, to_block)
+            try:
+                logs = self.get_logs(from_block, chunk_end)
+            except (ValueError, IOError):
+                if self.block_range == 1:
+                    raise
+                self.block_range = max(self.block_range // 2, 1)
+                continue
+
+            with self.db:
+                stored += self.store(logs)
+                self.set_cursor(chunk_end)
+
+            from_block = chunk_end + 1
+            self.block_range = min(self.block_range * 2, self.max_range)
+
+        return stored
+
+    def events(self, name=None):
+        """
+        Returns the indexed events as `(block number, log index, tx hash, name, args)` in chain order.
+        """
+        query = 'SELECT block_number, log_index, tx_hash, event, args FROM events WHERE address = ?'
+        params = [self.address]
+        if name is not None:
+            query += ' AND event = ?'
+            params.append(name)
+        rows = self.db.execute(query + ' ORDER BY block_number, log_index', params).fetchall()
+        return [(block, index, tx_hash, event, json.loads(args)) for block, index, tx_hash, event, args in rows]
@@ -0,0 +1,253 @@
+import time
+
+from utils.metrics import Metrics
+
+STATUS_OK = 0
+STATUS_REWARDS_DISABLED = 1
+STATUS_PERIOD_NOT_FINISHED = 2
+STATUS_LOW_BALANCE = 3
+
+STATUS_NAMES = {
+    STATUS_OK: 'ok',
+    STATUS_REWARDS_DISABLED: 'rewards disabled',
+    STATUS_PERIOD_NOT_FINISHED: 'rewards period not finished',
+    STATUS_LOW_BALANCE: 'low balance',
+}
+
+TRANSFER_TOPIC = '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'
+
+
+def address_topic(address):
+    return '0x' + str(address)[2:].lower().rjust(64, '0')
+
+
+def status_reason(rewards_contract, iteration, weekly_amount, balance, balancer_period_finish, now):
+    """
+    Mirrors the checks of `start_next_rewards_period` for managers without `status()`.
+    `min_rewards_amount` isn't readable from them, the dry run catches that one.
+    """
+    rewards_amount = balance // 4 if iteration == 0 else weekly_amount
+    if int(rewards_contract, 16) == 0:
+        return STATUS_REWARDS_DISABLED
+    if now < balancer_period_finish:
+        return STATUS_PERIOD_NOT_FINISHED
+    if rewards_amount == 0:
+        return STATUS_REWARDS_DISABLED
+    if balance < rewards_amount:
+        return STATUS_LOW_BALANCE
+    return STATUS_OK
+
+
+def read_status(manager, ldo_token, now):
+    """
+    Returns `manager.status()` as a dict. For managers deployed before `status()`
+    was added the same dict is assembled from the separate views, `now` being
+    the latest block timestamp.
+    """
+    from brownie.exceptions import VirtualMachineError
+
+    try:
+        return dict(manager.status().dict())
+    except VirtualMachineError:
+        pass
+    except ValueError as e:
+        # brownie's error for a call returning no data, as one to a missing function may
+        if 'revert' not in str(e):
+            raise
+
+    rewards_contract = manager.rewards_contract()
+    weekly_amount = manager.weekly_amount()
+    iteration = manager.rewards_iteration()
+    balance = ldo_token.balanceOf(manager)
+    balancer_period_finish = 0
+    period_finish = 0
+    if int(rewards_contract, 16) != 0:
+        balancer_period_finish = manager.balancer_period_finish()
+        period_finish = manager.period_finish()
+
+    reason = status_reason(rewards_contract, iteration, weekly_amount, balance, balancer_period_finish, now)
+
+    return {
+        'rewards_contract': rewards_contract,
+        'weekly_amount': weekly_amount,
+        'rewards_iteration': iteration,
+        'ldo_balance': balance,
+        'balancer_period_finish': balancer_period_finish,
+        'period_finish': period_finish,
+        'is_rewards_period_finished': now >= period_finish,
+        'is_balancer_rewards_period_finished': now >= balancer_period_finish,
+        'can_start': reason == STATUS_OK,
+        'reason': reason,
+    }
+
+
+class RewardsKeeper:
+    """
+    Starts rewards periods of a RewardsManager as soon as they are due.
+
+    The keeper reads `status()` once, sleeps until `balancer_period_finish`
+    and reschedules when the manager emits `NewRewardsPeriodStarted` or
+    `RewardsContractUpdated`, or receives LDO. Every transaction is
+    dry-run with eth_call first, so reverts are never paid for.
+
+    Chain reads and transactions are timed into `metrics`, every started
+    period records its delay after `balancer_period_finish`, gas, fee and
+    amount, see `started`.
+    """
+
+    def __init__(
+        self,
+        manager,
+        ldo_token,
+        web3,
+        tx_params,
+        sleep=time.sleep,
+        events_interval=60,
+        retry_interval=15,
+        metrics=None
+    ):
+        self.manager = manager
+        self.ldo_token = ldo_token
+        self.web3 = web3
+        self.tx_params = tx_params
+        self.sleep = sleep
+        self.events_interval = events_interval
+        self.retry_interval = retry_interval
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.labels = {'manager': manager.address}
+        self.status = None
+        self.filters = [
+            web3.eth.filter({
+                'address': manager.address,
+                'topics': [[
+                    manager.topics['NewRewardsPeriodStarted'],
+                    manager.topics['RewardsContractUpdated']
+                ]]
+            }),
+            web3.eth.filter({
+                'address': ldo_token.address,
+                'topics': [TRANSFER_TOPIC, None, address_topic(manager.address)]
+            }),
+        ]
+
+    def chain_time(self):
+        with self.metrics.timer('keeper_rpc_seconds', call='get_block', **self.labels):
+            return self.web3.eth.get_block('latest')['timestamp']
+
+    def refresh(self):
+        now = self.chain_time()
+        with self.metrics.timer('keeper_rpc_seconds', call='status', **self.labels):
+            self.status = read_status(self.manager, self.ldo_token, now)
+        return self.status
+
+    def has_new_events(self):
+        with self.metrics.timer('keeper_rpc_seconds', call='get_filter_changes', **self.labels):
+            return any([len(log_filter.get_new_entries()) > 0 for log_filter in self.filters])
+
+    def dry_run(self):
+        try:
+            with self.metrics.timer('keeper_rpc_seconds', call='dry_run', **self.labels):
+                self.manager.start_next_rewards_period.call(self.tx_params)
+            return True
+        except Exception as e:
+            reason = getattr(e, "revert_msg", None) or str(e)
+            print(f'dry run failed: {reason}')
+            self.metrics.inc('keeper_dry_run_failures_total', **self.labels)
+            self.metrics.record('dry_run_failed', manager=self.manager.address, reason=reason)
+            return False
+
+    def try_start(self):
+        """
+        Sends `start_next_rewards_period` after a successful dry run. A transaction
+        that reverts anyway, or that the node rejects, is logged and None returned,
+        so the keeper retries after `retry_interval`.
+        """
+        if not self.dry_run():
+            return None
+        balancer_period_finish = self.status['balancer_period_finish'] if self.status is not None else None
+        from brownie.exceptions import VirtualMachineError
+
+        try:
+            with self.metrics.timer('keeper_tx_seconds', **self.labels):
+                tx = self.manager.start_next_rewards_period(self.tx_params)
+        except (VirtualMachineError, ValueError) as e:
+            reason = getattr(e, "revert_msg", None) or str(e)
+            print(f'start failed: {reason}')
+            self.metrics.inc('keeper_tx_failures_total', **self.labels)
+            self.metrics.record('start_failed', manager=self.manager.address, reason=reason)
+            return None
+        print(f'rewards period started: {tx.events["NewRewardsPeriodStarted"]["amount"]}')
+        self.started(tx, balancer_period_finish)
+        return tx
+
+    def started(self, tx, balancer_period_finish):
+        """
+        Records a `start_next_rewards_period` transaction: seconds from
+        `balancer_period_finish` to the block it landed in, gas used, the fee
+        paid at the effective gas price and the amount of the new period.
+        """
+        fee = tx.gas_used * tx.gas_price
+        amount = tx.events['NewRewardsPeriodStarted']['amount']
+        delay = tx.timestamp - balancer_period_finish if balancer_period_finish is not None else None
+
+        self.metrics.inc('keeper_periods_started_total', **self.labels)
+        self.metrics.set('keeper_start_gas_used', tx.gas_used, **self.labels)
+        self.metrics.set('keeper_start_fee_wei', fee, **self.labels)
+        self.metrics.set('keeper_rewards_amount_wei', amount, **self.labels)
+        if delay is not None:
+            self.metrics.set('keeper_start_delay_seconds', delay, **self.labels)
+            self.metrics.observe('keeper_start_delays_seconds', delay, **self.labels)
+        self.metrics.record(
+            'rewards_period_started',
+            manager=self.manager.address,
+            tx=tx.txid,
+            block=tx.block_number,
+            delay=delay,
+            gas_used=tx.gas_used,
+            effective_gas_price=tx.gas_price,
+            fee=fee,
+            amount=amount
+        )
+
+    def next_wakeup(self):
+        """
+        Returns seconds to sleep before the next action, or None if the keeper
+        should just wait for events.
+        """
+        reason = self.status['reason']
+        if reason == STATUS_OK:
+            return 0
+        if reason == STATUS_PERIOD_NOT_FINISHED:
+            return max(self.status['balancer_period_finish'] - self.chain_time(), 0)
+        return None
+
+    def step(self):
+        """
+        Refreshes the status if needed, starts the period if it's due and sleeps
+        until the next wakeup or the next event check. Returns the sent transaction.
+        """
+        if self.status is None:
+            self.refresh()
+            print(f'status: {STATUS_NAMES[self.status["reason"]]}, '
+                  f'balancer period finish: {self.status["balancer_period_finish"]}')
+
+        tx = None
+        wakeup = self.next_wakeup()
+        if wakeup == 0:
+            tx = self.try_start()
+            self.status = None
+            if tx is None:
+                self.sleep(self.retry_interval)
+            return tx
+
+        self.sleep(self.events_interval if wakeup is None else min(wakeup, self.events_interval))
+
+        if self.has_new_events() or (wakeup is not None and wakeup <= self.events_interval):
+            self.status = None
+        return tx
+
+    def run(self, max_steps=None):
+        steps = 0
+        while max_steps is None or steps < max_steps:
+            self.step()
+            steps += 1
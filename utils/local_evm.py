@@ -0,0 +1,917 @@
+import gzip
+import json
+import time
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import eth_abi
+import rlp
+from eth import constants
+from eth.chains.base import MiningChain
+from eth.consensus import ConsensusApplier, NoProofConsensus
+from eth.db.atomic import AtomicDB
+from eth.exceptions import Halt, InvalidInstruction, OutOfGas, Revert
+from eth.rlp.accounts import Account
+from eth.vm.computation import NO_RESULT
+from eth.vm.forks import IstanbulVM, LondonVM
+from eth.vm.forks.istanbul.computation import IstanbulComputation
+from eth.vm.forks.istanbul.state import IstanbulState
+from eth.vm.forks.istanbul.transactions import IstanbulTransaction
+from eth.vm.forks.london.computation import LondonComputation
+from eth.vm.forks.london.state import LondonState
+from eth.vm.forks.london.transactions import LondonLegacyTransaction
+from eth.vm.logic.invalid import InvalidOpcode
+from eth.vm.spoof import SpoofTransaction
+from eth_account.hdaccount.deterministic import HDPath
+from eth_keys import keys
+from eth_utils import keccak, to_canonical_address, to_checksum_address
+from trie import HexaryTrie
+from trie.iter import NodeIterator
+
+from utils.py_evm_internals import generate_contract_address, memory_bytes, set_canonical_head, stack_values
+
+CLIENT_VERSION = 'EthereumJS TestRPC/v2.13.2/ethereum-js'
+STATE_DUMP_VERSION = 1
+# Mining rewards the coinbase on every block, its account is left out of state dumps
+COINBASE_KEY = keccak(constants.ZERO_ADDRESS)
+ERROR_SELECTOR = bytes.fromhex('08c379a0')
+TRANSACTION_FIELDS = ('nonce', 'gas_price', 'gas', 'to', 'value', 'data', 'v', 'r', 's')
+
+
+def to_int(value):
+    if value is None:
+        return None
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+def to_data(value):
+    if not value:
+        return b''
+    return bytes.fromhex(value[2:] if value.startswith('0x') else value)
+
+
+def hex_data(value):
+    return '0x' + bytes(value).hex()
+
+
+class RpcError(Exception):
+    def __init__(self, message, code=-32000, data=None):
+        super().__init__(message)
+        self.error = {'code': code, 'message': message}
+        if data is not None:
+            self.error['data'] = data
+
+
+class TracingComputation(IstanbulComputation):
+    """
+    Records every executed opcode in the debug_traceTransaction format of geth
+    while `tracer` is set. Runs the stock loop otherwise.
+    """
+
+    tracer = None
+
+    @classmethod
+    def apply_computation(cls, state, message, transaction_context):
+        if cls.tracer is None:
+            return super().apply_computation(state, message, transaction_context)
+
+        with cls(state, message, transaction_context) as computation:
+            precompile = computation.precompiles.get(message.code_address, NO_RESULT)
+            if precompile is not NO_RESULT:
+                precompile(computation)
+                return computation
+
+            for opcode in computation.code:
+                opcode_fn = computation.opcodes.get(opcode) or InvalidOpcode(opcode)
+                memory = memory_bytes(computation).hex()
+                step = {
+                    'pc': computation.code.program_counter - 1,
+                    'op': opcode_fn.mnemonic,
+                    'gas': computation.get_gas_remaining(),
+                    'depth': message.depth + 1,
+                    'stack': [
+                        format(value, '064x') if value_type is int else bytes(value).rjust(32, b'\x00').hex()
+                        for value_type, value in stack_values(computation)
+                    ],
+                    'memory': [memory[i:i + 64] for i in range(0, len(memory), 64)],
+                    'storage': {},
+                }
+                cls.tracer.append(step)
+                try:
+                    opcode_fn(computation=computation)
+                except Halt:
+                    break
+                finally:
+                    step['gasCost'] = step['gas'] - computation.get_gas_remaining()
+        return computation
+
+
+class SenderTransaction(IstanbulTransaction):
+    """
+    Transaction of eth_sendTransaction, executed as `senders[hash]`. The node
+    already knows the sender, so it carries a placeholder signature instead of
+    paying for signing and recovering the key on every call. Every LocalEvm
+    uses its own subclass, see `for_senders`.
+    """
+
+    senders = None
+
+    @classmethod
+    def for_senders(cls, senders):
+        return type(cls.__name__, (cls,), {'senders': senders})
+
+    def check_signature_validity(self):
+        pass
+
+    def get_sender(self):
+        return self.senders[self.hash]
+
+
+class LocalVM(IstanbulVM):
+    _state_class = IstanbulState.configure(computation_class=TracingComputation)
+
+    @classmethod
+    def validate_header(cls, header, parent_header):
+        # Like ganache, blocks mined within the same second share the timestamp
+        if parent_header is not None and header.timestamp == parent_header.timestamp:
+            parent_header = parent_header.copy(timestamp=parent_header.timestamp - 1)
+        super().validate_header(header, parent_header)
+
+
+class LocalLondonVM(LocalVM, LondonVM):
+    # EIP-2929 cold and warm access and the EIP-3529 refund cap, as on mainnet
+    _state_class = LondonState.configure(
+        computation_class=type(TracingComputation.__name__, (TracingComputation, LondonComputation), {})
+    )
+
+
+# VM and eth_sendTransaction transaction class of every supported `evm_version`
+HARDFORKS = {
+    'istanbul': (LocalVM, SenderTransaction),
+    'london': (
+        LocalLondonVM,
+        type(SenderTransaction.__name__, (SenderTransaction, LondonLegacyTransaction), {
+            'fields': LondonLegacyTransaction._meta.fields,
+        })
+    ),
+}
+
+
+class RecordingDB:
+    """
+    Read-only view of a database that remembers every key read through it.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.read = {}
+
+    def __getitem__(self, key):
+        value = self.read[key] = self.db[key]
+        return value
+
+    def __contains__(self, key):
+        return key in self.db
+
+
+class LocalChain(MiningChain):
+    vm_configuration = ConsensusApplier(NoProofConsensus).amend_vm_configuration(((0, LocalVM),))
+
+    @classmethod
+    def for_hardfork(cls, hardfork, chain_id):
+        vm_class = HARDFORKS[hardfork][0]
+        return cls.configure(
+            chain_id=chain_id,
+            vm_configuration=ConsensusApplier(NoProofConsensus).amend_vm_configuration(((0, vm_class),))
+        )
+
+    def create_header_from_parent(self, parent_header, **header_params):
+        return super().create_header_from_parent(
+            parent_header,
+            **{**header_params, 'gas_limit': parent_header.gas_limit}
+        )
+
+
+class LocalEvm:
+    """
+    In-process py-evm chain answering the ganache-cli v6 JSON-RPC methods that
+    brownie uses. Every transaction is mined in its own block, snapshots are
+    block hashes, so taking and reverting them is cheap.
+
+    `hardfork` picks the gas rules, the `evm_version` of ganache: 'istanbul'
+    like the ganache-cli v6 fork, or 'london' like mainnet. The London
+    base fee starts at zero, so transactions without a gas price still go.
+    """
+
+    def __init__(
+        self,
+        mnemonic='brownie',
+        accounts=10,
+        gas_limit=12_000_000,
+        chain_id=1,
+        default_balance=100 * 10**18,
+        hardfork='istanbul'
+    ):
+        if hardfork not in HARDFORKS:
+            raise ValueError(f'unsupported hardfork {hardfork}, expected one of {", ".join(HARDFORKS)}')
+
+        # ganache derives keys from any phrase without checking it against the BIP39 wordlist
+        seed = hashlib.pbkdf2_hmac('sha512', mnemonic.encode(), b'mnemonic', 2048)
+        self.keys = {}
+        for i in range(accounts):
+            key = keys.PrivateKey(HDPath(f"m/44'/60'/0'/0/{i}").derive(seed))
+            self.keys[key.public_key.to_canonical_address()] = key
+
+        genesis = {
+            'coinbase': constants.ZERO_ADDRESS,
+            'difficulty': constants.GENESIS_DIFFICULTY,
+            'extra_data': b'',
+            'gas_limit': gas_limit,
+            'mix_hash': constants.ZERO_HASH32,
+            'nonce': constants.GENESIS_NONCE,
+            'receipt_root': constants.BLANK_ROOT_HASH,
+            'timestamp': int(time.time()),
+            'transaction_root': constants.BLANK_ROOT_HASH,
+        }
+        if hardfork == 'london':
+            genesis['base_fee_per_gas'] = 0
+
+        self.hardfork = hardfork
+        self.chain_class = LocalChain.for_hardfork(hardfork, chain_id)
+        self.chain = self.chain_class.from_genesis(
+            AtomicDB(),
+            genesis,
+            {
+                address: {'balance': default_balance, 'nonce': 0, 'code': b'', 'storage': {}}
+                for address in self.keys
+            }
+        )
+        self.chain_id = chain_id
+        self.unlocked = set(self.keys)
+        self.time_offset = 0
+        self.snapshots = {}
+        self.snapshot_id = 0
+        self.recorded_root = None
+        self.transactions = {}
+        # Senders of the eth_sendTransaction transactions, pruned with `transactions`
+        self.senders = {}
+        # Transactions sent ahead of their sender's nonce, by sender and nonce
+        self.queued = {}
+        self.sender_transaction_class = HARDFORKS[hardfork][1].for_senders(self.senders)
+        self.filters = {}
+        self.filter_id = 0
+        self.lock = threading.RLock()
+
+    #
+    # Chain
+    #
+    def head(self):
+        return self.chain.get_canonical_head()
+
+    def header_at(self, block):
+        head = self.head()
+        if block in (None, 'latest', 'pending', 'safe', 'finalized'):
+            return head
+        number = 0 if block == 'earliest' else to_int(block)
+        if number > head.block_number:
+            raise RpcError(f'block {number} not found')
+        return self.chain.get_canonical_block_header_by_number(number)
+
+    def state_at(self, block):
+        return self.chain.get_vm(self.header_at(block)).state
+
+    def pending_vm(self, timestamp=None):
+        """
+        Returns the VM of the next block, timed `time_offset` seconds from now,
+        or at `timestamp`, but never before the head.
+        """
+        if timestamp is None:
+            timestamp = int(time.time()) + self.time_offset
+        timestamp = max(timestamp, self.head().timestamp)
+        self.chain.header = self.chain.header.copy(timestamp=timestamp)
+        return self.chain.get_vm(self.chain.header)
+
+    def mine(self, transaction=None, timestamp=None):
+        self.pending_vm(timestamp)
+        result = None
+        if transaction is not None:
+            result = self.chain.apply_transaction(transaction)
+        block = self.chain.mine_block()
+        if result is not None:
+            _, receipt, computation = result
+            self.transactions[transaction.hash] = {
+                'block_number': block.number,
+                'sender': transaction.sender,
+                'transaction': transaction,
+                'receipt': receipt,
+                'computation': computation,
+            }
+        return block, result
+
+    def set_head(self, header):
+        chaindb = self.chain.chaindb
+        set_canonical_head(chaindb, header)
+        self.chain = self.chain_class(chaindb.db)
+        self.transactions = {
+            tx_hash: entry for tx_hash, entry in self.transactions.items()
+            if entry['block_number'] <= header.block_number
+        }
+        self.queued = {}
+        for tx_hash in [tx_hash for tx_hash in self.senders if tx_hash not in self.transactions]:
+            del self.senders[tx_hash]
+        for log_filter in self.filters.values():
+            log_filter['last_block'] = min(log_filter['last_block'], header.block_number)
+
+    def modify_state(self, fn):
+        """
+        Applies `fn(state)` and mines the result, so snapshots keep it.
+        """
+        vm = self.pending_vm()
+        fn(vm.state)
+        vm.state.persist()
+        self.chain.header = self.chain.header.copy(state_root=vm.state.state_root)
+        self.mine()
+        return True
+
+    #
+    # Transactions
+    #
+    def build_transaction(self, params, state=None):
+        sender = to_canonical_address(params['from']) if params.get('from') else constants.ZERO_ADDRESS
+        state = state or self.pending_vm().state
+        nonce = to_int(params.get('nonce'))
+        gas_price = params.get('gasPrice', params.get('maxFeePerGas'))
+        unsigned = self.chain.create_unsigned_transaction(
+            nonce=state.get_nonce(sender) if nonce is None else nonce,
+            # The London base fee rises above zero after blocks using over half the gas limit
+            gas_price=to_int(gas_price) or getattr(self.chain.header, 'base_fee_per_gas', 0),
+            gas=to_int(params.get('gas')) or self.chain.header.gas_limit,
+            to=to_canonical_address(params['to']) if params.get('to') else b'',
+            value=to_int(params.get('value')) or 0,
+            data=to_data(params.get('data', params.get('input'))),
+        )
+        return sender, unsigned
+
+    def sign(self, sender, unsigned):
+        if sender not in self.unlocked:
+            raise RpcError(f'sender account not recognized: {to_checksum_address(sender)}')
+
+        transaction = self.sender_transaction_class(
+            **{field: getattr(unsigned, field) for field in TRANSACTION_FIELDS[:6]},
+            # EIP-155 v, r unique per sender so equal transactions of two senders get distinct hashes
+            v=35 + 2 * self.chain_id,
+            r=int.from_bytes(sender, 'big') + 1,
+            s=1
+        )
+        self.senders[transaction.hash] = sender
+        return transaction
+
+    @staticmethod
+    def error_data(computation):
+        """
+        Returns `(error type, reason, return data)` like ganache reports them.
+        """
+        error = computation.error
+        output = error.args[0] if isinstance(error, Revert) and error.args else b''
+        reason = None
+        if output[:4] == ERROR_SELECTOR:
+            reason = eth_abi.decode_abi(['string'], output[4:])[0]
+        if isinstance(error, OutOfGas):
+            return 'out of gas', reason, output
+        if isinstance(error, InvalidInstruction):
+            return 'invalid opcode', reason, output
+        return 'revert', reason, output
+
+    def raise_vm_error(self, computation, tx_hash):
+        error_type, reason, output = self.error_data(computation)
+        message = f'VM Exception while processing transaction: {error_type}'
+        if reason is not None:
+            message += f' {reason}'
+        raise RpcError(message, data={
+            hex_data(tx_hash): {
+                'error': error_type,
+                'program_counter': None,
+                'return': hex_data(output),
+                'reason': reason,
+            },
+            'name': 'RuntimeError',
+        })
+
+    def send(self, transaction):
+        # Like ganache, a transaction with a future nonce waits for the ones before it,
+        # transactions signed in parallel can arrive out of order
+        if transaction.nonce > self.state_at('latest').get_nonce(transaction.sender):
+            self.queued.setdefault(transaction.sender, {})[transaction.nonce] = transaction
+            return hex_data(transaction.hash)
+
+        self.mine_sent(transaction)
+        self.mine_queued(transaction.sender)
+        computation = self.transactions[transaction.hash]['computation']
+        if computation.is_error:
+            self.raise_vm_error(computation, transaction.hash)
+        return hex_data(transaction.hash)
+
+    def mine_sent(self, transaction):
+        try:
+            self.mine(transaction)
+        except Exception as e:
+            if transaction.hash not in self.transactions:
+                self.senders.pop(transaction.hash, None)
+            if isinstance(e, RpcError):
+                raise
+            self.chain = self.chain_class(self.chain.chaindb.db)
+            raise RpcError(str(e))
+
+    def mine_queued(self, sender):
+        queued = self.queued.get(sender, {})
+        transaction = queued.pop(self.state_at('latest').get_nonce(sender), None)
+        while transaction is not None:
+            try:
+                self.mine_sent(transaction)
+            except RpcError:
+                # dropped like an invalid transaction in ganache's pool, the later ones wait again
+                break
+            transaction = queued.pop(self.state_at('latest').get_nonce(sender), None)
+
+    def call(self, params, block='latest'):
+        if block in ('latest', 'pending', None):
+            state = self.pending_vm().state
+        else:
+            state = self.state_at(block)
+        sender, unsigned = self.build_transaction(params, state)
+        computation = state.apply_transaction(SpoofTransaction(unsigned, from_=sender))
+        if computation.is_error:
+            self.raise_vm_error(computation, keccak(unsigned.data + sender))
+        return hex_data(computation.output)
+
+    def estimate_gas(self, params, block='latest'):
+        sender, unsigned = self.build_transaction(params)
+        try:
+            return hex(self.chain.estimate_gas(SpoofTransaction(unsigned, from_=sender), self.chain.header))
+        except Exception as e:
+            raise RpcError(f'VM Exception while processing transaction: {e}')
+
+    def trace(self, tx_hash, options=None):
+        entry = self.transactions.get(to_data(tx_hash))
+        if entry is None:
+            raise RpcError(f'unknown transaction {tx_hash}')
+
+        header = self.chain.get_canonical_block_header_by_number(entry['block_number'])
+        parent = self.chain.get_block_header_by_hash(header.parent_hash)
+        vm = self.chain.get_vm(header.copy(state_root=parent.state_root, gas_used=0))
+
+        TracingComputation.tracer = steps = []
+        try:
+            computation = vm.state.apply_transaction(entry['transaction'])
+        finally:
+            TracingComputation.tracer = None
+
+        return {
+            'gas': computation.get_gas_used(),
+            'failed': computation.is_error,
+            'returnValue': computation.output.hex(),
+            'structLogs': steps,
+        }
+
+    #
+    # Formatting
+    #
+    def format_block(self, block, full_transactions):
+        header = block.header
+        transactions = [
+            self.format_transaction(tx.hash) if full_transactions else hex_data(tx.hash)
+            for tx in block.transactions
+        ]
+        return {
+            'number': hex(header.block_number),
+            'hash': hex_data(header.hash),
+            'parentHash': hex_data(header.parent_hash),
+            'mixHash': hex_data(header.mix_hash),
+            'nonce': hex_data(header.nonce),
+            'sha3Uncles': hex_data(header.uncles_hash),
+            'logsBloom': hex_data(header.bloom.to_bytes(256, 'big')),
+            'transactionsRoot': hex_data(header.transaction_root),
+            'stateRoot': hex_data(header.state_root),
+            'receiptsRoot': hex_data(header.receipt_root),
+            'miner': to_checksum_address(header.coinbase),
+            'difficulty': hex(header.difficulty),
+            'totalDifficulty': hex(self.chain.chaindb.get_score(header.hash)),
+            'extraData': hex_data(header.extra_data),
+            'size': hex(len(header.encode()) if hasattr(header, 'encode') else 0),
+            'gasLimit': hex(header.gas_limit),
+            'gasUsed': hex(header.gas_used),
+            'timestamp': hex(header.timestamp),
+            'transactions': transactions,
+            'uncles': [],
+        }
+
+    def block_by_number(self, block, full_transactions=False):
+        try:
+            header = self.header_at(block)
+        except RpcError:
+            return None
+        return self.format_block(self.chain.get_block_by_header(header), full_transactions)
+
+    def block_by_hash(self, block_hash, full_transactions=False):
+        header = self.chain.get_block_header_by_hash(to_data(block_hash))
+        if self.chain.get_canonical_block_hash(header.block_number) != header.hash:
+            return None
+        return self.format_block(self.chain.get_block_by_header(header), full_transactions)
+
+    def format_transaction(self, tx_hash):
+        entry = self.transactions.get(tx_hash if isinstance(tx_hash, bytes) else to_data(tx_hash))
+        if entry is None:
+            return None
+        transaction = entry['transaction']
+        header = self.chain.get_canonical_block_header_by_number(entry['block_number'])
+        return {
+            'hash': hex_data(transaction.hash),
+            'type': '0x0',
+            'nonce': hex(transaction.nonce),
+            'blockHash': hex_data(header.hash),
+            'blockNumber': hex(header.block_number),
+            'transactionIndex': '0x0',
+            'from': to_checksum_address(entry['sender']),
+            'to': to_checksum_address(transaction.to) if transaction.to else None,
+            'value': hex(transaction.value),
+            'gas': hex(transaction.gas),
+            'gasPrice': hex(transaction.gas_price),
+            'input': hex_data(transaction.data),
+            'v': hex(transaction.v),
+            'r': hex(transaction.r),
+            's': hex(transaction.s),
+        }
+
+    def format_logs(self, tx_hash, entry, header):
+        return [
+            {
+                'logIndex': hex(index),
+                'transactionIndex': '0x0',
+                'transactionHash': hex_data(tx_hash),
+                'blockHash': hex_data(header.hash),
+                'blockNumber': hex(header.block_number),
+                'address': to_checksum_address(log.address),
+                'data': hex_data(log.data),
+                'topics': ['0x' + format(topic, '064x') for topic in log.topics],
+                'type': 'mined',
+                'removed': False,
+            }
+            for index, log in enumerate(entry['receipt'].logs)
+        ]
+
+    def receipt(self, tx_hash):
+        tx_hash = to_data(tx_hash)
+        entry = self.transactions.get(tx_hash)
+        if entry is None:
+            return None
+        transaction = entry['transaction']
+        header = self.chain.get_canonical_block_header_by_number(entry['block_number'])
+        contract_address = None
+        if not transaction.to:
+            contract_address = to_checksum_address(generate_contract_address(entry['sender'], transaction.nonce))
+        return {
+            'transactionHash': hex_data(tx_hash),
+            'transactionIndex': '0x0',
+            'blockHash': hex_data(header.hash),
+            'blockNumber': hex(header.block_number),
+            'from': to_checksum_address(entry['sender']),
+            'to': to_checksum_address(transaction.to) if transaction.to else None,
+            'gasUsed': hex(entry['receipt'].gas_used),
+            'cumulativeGasUsed': hex(entry['receipt'].gas_used),
+            'effectiveGasPrice': hex(transaction.gas_price),
+            'contractAddress': contract_address,
+            'logs': self.format_logs(tx_hash, entry, header),
+            'logsBloom': hex_data(entry['receipt'].bloom.to_bytes(256, 'big')),
+            'status': '0x0' if entry['computation'].is_error else '0x1',
+        }
+
+    #
+    # Logs
+    #
+    def logs(self, criteria, from_block=None, to_block=None):
+        head = self.head().block_number
+        if from_block is None:
+            from_block = self.header_at(criteria.get('fromBlock', 'latest')).block_number
+        if to_block is None:
+            to_block = self.header_at(criteria.get('toBlock', 'latest')).block_number
+        to_block = min(to_block, head)
+
+        addresses = criteria.get('address') or []
+        if isinstance(addresses, str):
+            addresses = [addresses]
+        addresses = {address.lower() for address in addresses}
+        topics = criteria.get('topics') or []
+
+        logs = []
+        entries = sorted(self.transactions.items(), key=lambda item: item[1]['block_number'])
+        for tx_hash, entry in entries:
+            if not from_block <= entry['block_number'] <= to_block:
+                continue
+            header = self.chain.get_canonical_block_header_by_number(entry['block_number'])
+            for log in self.format_logs(tx_hash, entry, header):
+                if addresses and log['address'].lower() not in addresses:
+                    continue
+                if not self.topics_match(topics, log['topics']):
+                    continue
+                logs.append(log)
+        return logs
+
+    @staticmethod
+    def topics_match(criteria, topics):
+        if len(criteria) > len(topics):
+            return False
+        for expected, topic in zip(criteria, topics):
+            if expected is None:
+                continue
+            options = expected if isinstance(expected, list) else [expected]
+            if topic.lower() not in [option.lower() for option in options]:
+                return False
+        return True
+
+    def new_filter(self, criteria=None):
+        self.filter_id += 1
+        self.filters[self.filter_id] = {
+            'criteria': criteria,
+            'last_block': self.head().block_number,
+        }
+        return hex(self.filter_id)
+
+    def filter_changes(self, filter_id):
+        log_filter = self.filters.get(to_int(filter_id))
+        if log_filter is None:
+            raise RpcError('filter not found')
+        head = self.head().block_number
+        from_block, log_filter['last_block'] = log_filter['last_block'] + 1, head
+        if log_filter['criteria'] is None:
+            return [
+                hex_data(self.chain.get_canonical_block_hash(number))
+                for number in range(from_block, head + 1)
+            ]
+        return self.logs(log_filter['criteria'], from_block, head)
+
+    #
+    # State dumps
+    #
+    def accounts_at(self, state_root):
+        """
+        Returns the RLP of every account of the state, keyed by the hashed address.
+        """
+        return dict(NodeIterator(HexaryTrie(self.chain.chaindb.db, state_root)).items())
+
+    def trie_nodes(self, root):
+        """
+        Returns every node of the trie at `root`, keyed by its hash.
+        """
+        if root == constants.BLANK_ROOT_HASH:
+            return {}
+        db = RecordingDB(self.chain.chaindb.db)
+        for _ in NodeIterator(HexaryTrie(db, root)).items():
+            pass
+        return db.read
+
+    def record_state(self):
+        """
+        Marks the current state as the base of the next `dump_state`.
+        """
+        self.recorded_root = self.head().state_root
+        return True
+
+    def dump_state(self):
+        """
+        Returns the accounts changed since `record_state`, as gzipped JSON:
+        their RLP before and after, and the storage trie nodes and code they
+        need. `load_state` applies it on top of any state holding the same
+        accounts as before.
+        """
+        if self.recorded_root is None:
+            raise RpcError('no state recorded, call evm_recordState first')
+        before = self.accounts_at(self.recorded_root)
+        after = self.accounts_at(self.head().state_root)
+        changed = [
+            key for key in sorted(before.keys() | after.keys())
+            if before.get(key) != after.get(key) and key != COINBASE_KEY
+        ]
+
+        nodes = {}
+        for key in changed:
+            if key not in after:
+                continue
+            account = rlp.decode(after[key], sedes=Account)
+            nodes.update(self.trie_nodes(account.storage_root))
+            if account.code_hash != constants.EMPTY_SHA3:
+                nodes[account.code_hash] = self.chain.chaindb.db[account.code_hash]
+
+        def encode(value):
+            return value.hex() if value is not None else None
+
+        dump = {
+            'version': STATE_DUMP_VERSION,
+            'timestamp': self.head().timestamp,
+            'before': {key.hex(): encode(before.get(key)) for key in changed},
+            'after': {key.hex(): encode(after.get(key)) for key in changed},
+            'nodes': {key.hex(): value.hex() for key, value in nodes.items()},
+        }
+        return hex_data(gzip.compress(json.dumps(dump, separators=(',', ':')).encode()))
+
+    def load_state(self, data):
+        """
+        Applies a `dump_state` in a new block, no earlier than the dumped
+        head. Returns False, leaving the chain as it is, if any of the changed
+        accounts differs from what it was before the dump.
+        """
+        dump = json.loads(gzip.decompress(to_data(data)))
+        if dump['version'] != STATE_DUMP_VERSION:
+            return False
+
+        db = self.chain.chaindb.db
+        accounts = HexaryTrie(db, self.head().state_root)
+        for key, value in dump['before'].items():
+            if (accounts.get(bytes.fromhex(key)) or None) != (bytes.fromhex(value) if value else None):
+                return False
+
+        for key, value in dump['nodes'].items():
+            db[bytes.fromhex(key)] = bytes.fromhex(value)
+        for key, value in dump['after'].items():
+            if value is None:
+                del accounts[bytes.fromhex(key)]
+            else:
+                accounts[bytes.fromhex(key)] = bytes.fromhex(value)
+
+        timestamp = max(dump['timestamp'], int(time.time()) + self.time_offset)
+        self.time_offset = timestamp - int(time.time())
+        self.pending_vm(timestamp)
+        self.chain.header = self.chain.header.copy(state_root=accounts.root_hash)
+        self.mine(timestamp=timestamp)
+        return True
+
+    #
+    # JSON-RPC
+    #
+    def snapshot(self):
+        self.snapshot_id += 1
+        self.snapshots[self.snapshot_id] = (self.head(), self.time_offset)
+        return hex(self.snapshot_id)
+
+    def revert(self, snapshot_id):
+        snapshot_id = to_int(snapshot_id)
+        if snapshot_id not in self.snapshots:
+            return False
+        header, self.time_offset = self.snapshots[snapshot_id]
+        self.snapshots = {key: value for key, value in self.snapshots.items() if key < snapshot_id}
+        self.set_head(header)
+        return True
+
+    def increase_time(self, seconds):
+        self.time_offset += to_int(seconds)
+        return self.time_offset
+
+    def mine_block(self, timestamp=None):
+        if timestamp is not None:
+            self.time_offset = to_int(timestamp) - int(time.time())
+        self.mine(timestamp=to_int(timestamp))
+        return '0x0'
+
+    def send_transaction(self, params):
+        sender, unsigned = self.build_transaction(params)
+        return self.send(self.sign(sender, unsigned))
+
+    def send_raw_transaction(self, raw):
+        transaction = self.chain.get_vm().get_transaction_builder().decode(to_data(raw))
+        return self.send(transaction)
+
+    def set_code(self, address, code):
+        return self.modify_state(lambda state: state.set_code(to_canonical_address(address), to_data(code)))
+
+    def set_balance(self, address, balance):
+        return self.modify_state(lambda state: state.set_balance(to_canonical_address(address), to_int(balance)))
+
+    def set_storage(self, address, slot, value):
+        return self.modify_state(lambda state: state.set_storage(
+            to_canonical_address(address), to_int(slot), int.from_bytes(to_data(value), 'big')
+        ))
+
+    def unlock(self, address):
+        self.unlocked.add(to_canonical_address(address))
+        return True
+
+    def methods(self):
+        return {
+            'web3_clientVersion': lambda: CLIENT_VERSION,
+            'net_version': lambda: str(self.chain_id),
+            'net_listening': lambda: True,
+            'eth_chainId': lambda: hex(self.chain_id),
+            'eth_syncing': lambda: False,
+            'eth_mining': lambda: False,
+            'eth_gasPrice': lambda: '0x0',
+            'eth_accounts': lambda: [to_checksum_address(address) for address in self.keys],
+            'eth_blockNumber': lambda: hex(self.head().block_number),
+            'eth_getBlockByNumber': self.block_by_number,
+            'eth_getBlockByHash': self.block_by_hash,
+            'eth_getBalance': lambda address, block='latest': hex(
+                self.state_at(block).get_balance(to_canonical_address(address))
+            ),
+            'eth_getCode': lambda address, block='latest': hex_data(
+                self.state_at(block).get_code(to_canonical_address(address))
+            ),
+            'eth_getTransactionCount': lambda address, block='latest': hex(
+                self.state_at(block).get_nonce(to_canonical_address(address))
+            ),
+            'eth_getStorageAt': lambda address, slot, block='latest': '0x' + format(
+                self.state_at(block).get_storage(to_canonical_address(address), to_int(slot)), '064x'
+            ),
+            'eth_call': self.call,
+            'eth_estimateGas': self.estimate_gas,
+            'eth_sendTransaction': self.send_transaction,
+            'eth_sendRawTransaction': self.send_raw_transaction,
+            'eth_getTransactionByHash': self.format_transaction,
+            'eth_getTransactionReceipt': self.receipt,
+            'eth_getLogs': self.logs,
+            'eth_newFilter': self.new_filter,
+            'eth_newBlockFilter': lambda: self.new_filter(None),
+            'eth_getFilterChanges': self.filter_changes,
+            'eth_getFilterLogs': lambda filter_id: self.logs(self.filters[to_int(filter_id)]['criteria']),
+            'eth_uninstallFilter': lambda filter_id: self.filters.pop(to_int(filter_id), None) is not None,
+            'debug_traceTransaction': self.trace,
+            'evm_snapshot': self.snapshot,
+            'evm_revert': self.revert,
+            'evm_increaseTime': self.increase_time,
+            'evm_mine': self.mine_block,
+            'evm_unlockUnknownAccount': self.unlock,
+            'evm_setAccountCode': self.set_code,
+            'evm_setAccountBalance': self.set_balance,
+            'evm_setAccountStorageAt': self.set_storage,
+            'evm_recordState': self.record_state,
+            'evm_dumpState': self.dump_state,
+            'evm_loadState': self.load_state,
+        }
+
+    def handle(self, request):
+        response = {'jsonrpc': '2.0', 'id': request.get('id')}
+        method = self.methods().get(request.get('method'))
+        if method is None:
+            response['error'] = {'code': -32601, 'message': f'Method {request.get("method")} not supported'}
+            return response
+
+        try:
+            with self.lock:
+                response['result'] = method(*request.get('params', []))
+        except RpcError as e:
+            response['error'] = e.error
+        except TypeError as e:
+            response['error'] = {'code': -32602, 'message': str(e)}
+        except Exception as e:
+            # Anything else is a bug or bad input, the client still gets an answer
+            response['error'] = {'code': -32603, 'message': f'{type(e).__name__}: {e}'}
+        return response
+
+
+class LocalEvmServer:
+    """
+    Serves a LocalEvm over HTTP from a background thread of this process.
+    """
+
+    def __init__(self, evm, host='127.0.0.1', port=8545):
+        self.evm = evm
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        evm = self.evm
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # headers and body go out in separate writes, Nagle would hold the body for the ack
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                if isinstance(body, list):
+                    response = [evm.handle(request) for request in body]
+                else:
+                    response = evm.handle(body)
+
+                data = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
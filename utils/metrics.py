@@ -0,0 +1,158 @@
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key):
+    if not key:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in key) + '}'
+
+
+class Metrics:
+    """
+    In-process counters, gauges and timing summaries, rendered in the
+    Prometheus text format, plus an optional JSON-lines event log at
+    `log_path`.
+
+    Updates are a dict lookup under a lock, cheap enough for every RPC call.
+    """
+
+    def __init__(self, log_path=None, clock=time.perf_counter):
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.types = {}
+        self.values = {}
+        self.summaries = {}
+        self.log = open(log_path, 'a', buffering=1) if log_path is not None else None
+
+    def close(self):
+        if self.log is not None:
+            self.log.close()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _labels_key(labels))
+        with self.lock:
+            self.types.setdefault(name, 'counter')
+            self.values[key] = self.values.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        key = (name, _labels_key(labels))
+        with self.lock:
+            self.types.setdefault(name, 'gauge')
+            self.values[key] = value
+
+    def observe(self, name, value, **labels):
+        key = (name, _labels_key(labels))
+        with self.lock:
+            self.types.setdefault(name, 'summary')
+            summary = self.summaries.get(key)
+            if summary is None:
+                self.summaries[key] = [1, value]
+            else:
+                summary[0] += 1
+                summary[1] += value
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """
+        Observes the seconds spent in the block, also when it raises.
+        """
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.observe(name, self.clock() - start, **labels)
+
+    def summary(self, name, **labels):
+        """
+        Returns `(count, sum)` of an observed summary, `(0, 0)` if there is none.
+        """
+        with self.lock:
+            return tuple(self.summaries.get((name, _labels_key(labels)), (0, 0)))
+
+    def value(self, name, **labels):
+        with self.lock:
+            return self.values.get((name, _labels_key(labels)))
+
+    def record(self, event, **fields):
+        """
+        Appends `{"time": ..., "event": event, **fields}` to the JSON-lines log.
+        """
+        if self.log is None:
+            return
+        self.log.write(json.dumps({'time': time.time(), 'event': event, **fields}) + '\n')
+
+    def render(self):
+        with self.lock:
+            types = dict(self.types)
+            values = dict(self.values)
+            summaries = {key: list(summary) for key, summary in self.summaries.items()}
+
+        lines = []
+        for name, metric_type in sorted(types.items()):
+            lines.append(f'# TYPE {name} {metric_type}')
+            if metric_type == 'summary':
+                for (metric, labels), (count, total) in sorted(summaries.items()):
+                    if metric == name:
+                        lines.append(f'{name}_count{_format_labels(labels)} {count}')
+                        lines.append(f'{name}_sum{_format_labels(labels)} {total}')
+            else:
+                for (metric, labels), value in sorted(values.items()):
+                    if metric == name:
+                        lines.append(f'{name}{_format_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsServer:
+    """
+    Serves `metrics.render()` at /metrics for Prometheus to scrape.
+    """
+
+    def __init__(self, metrics, host='127.0.0.1', port=0):
+        # http.server is slow to import, keepers without the endpoint don't need it
+        from http.server import ThreadingHTTPServer
+
+        self.metrics = metrics
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}/metrics'
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        from http.server import BaseHTTPRequestHandler
+
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != '/metrics':
+                    self.send_error(404)
+                    return
+                data = metrics.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
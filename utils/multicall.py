@@ -0,0 +1,155 @@
+import time
+
+import eth_abi
+from eth_abi.exceptions import DecodingError
+from eth_utils import function_signature_to_4byte_selector, to_checksum_address
+
+from utils.config import ldo_token_address
+
+MULTICALL3_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'
+AGGREGATE3_SELECTOR = function_signature_to_4byte_selector('aggregate3((address,bool,bytes)[])')
+
+# BalancerLiquidityGauge.reward_data struct
+BALANCER_REWARD_FIELDS = [
+    ('token', 'address'),
+    ('distributor', 'address'),
+    ('period_finish', 'uint256'),
+    ('rate', 'uint256'),
+    ('last_update', 'uint256'),
+    ('integral', 'uint256'),
+]
+
+# RewardsManager.status struct
+STATUS_FIELDS = [
+    ('rewards_contract', 'address'),
+    ('weekly_amount', 'uint256'),
+    ('rewards_iteration', 'uint256'),
+    ('min_rewards_amount', 'uint256'),
+    ('ldo_balance', 'uint256'),
+    ('balancer_period_finish', 'uint256'),
+    ('period_finish', 'uint256'),
+    ('is_balancer_rewards_period_finished', 'bool'),
+    ('is_rewards_period_finished', 'bool'),
+    ('can_start', 'bool'),
+    ('reason', 'uint256'),
+]
+
+
+def _checksum(abi_type, value):
+    return to_checksum_address(value) if abi_type == 'address' else value
+
+
+class Call:
+    """
+    A view call to batch: `signature(args)` on `target`, decoded into a dict
+    of `fields`, or into a single value if `fields` is a bare ABI type.
+    """
+
+    def __init__(self, target, signature, input_types, args, fields):
+        self.target = to_checksum_address(target)
+        self.calldata = function_signature_to_4byte_selector(signature) + eth_abi.encode_abi(input_types, args)
+        self.fields = fields
+
+    @property
+    def key(self):
+        return (self.target, self.calldata)
+
+    def decode(self, data):
+        if isinstance(self.fields, str):
+            return _checksum(self.fields, eth_abi.decode_single(self.fields, data))
+        values = eth_abi.decode_abi([abi_type for _, abi_type in self.fields], data)
+        return {name: _checksum(abi_type, value) for (name, abi_type), value in zip(self.fields, values)}
+
+
+def reward_data_call(gauge, token):
+    return Call(gauge, 'reward_data(address)', ['address'], [token], BALANCER_REWARD_FIELDS)
+
+
+def status_call(manager):
+    return Call(manager, 'status()', [], [], STATUS_FIELDS)
+
+
+def balance_of_call(token, holder):
+    return Call(token, 'balanceOf(address)', ['address'], [holder], 'uint256')
+
+
+class MulticallReader:
+    """
+    Reads any number of view calls through Multicall3 `aggregate3`, at most
+    `batch_size` calls per eth_call, all of them at the same block.
+
+    Decoded results are cached by block number for `ttl` seconds. Calls that
+    revert, or return less data than expected, read as None.
+    """
+
+    def __init__(self, web3, address=MULTICALL3_ADDRESS, batch_size=500, ttl=12):
+        self.web3 = web3
+        self.address = to_checksum_address(address)
+        self.batch_size = batch_size
+        self.ttl = ttl
+        self.cache = {}
+        self.eth_calls = 0
+
+    def expire(self, now):
+        for key in [key for key, (added, _) in self.cache.items() if now - added > self.ttl]:
+            del self.cache[key]
+
+    def aggregate(self, calls, block_number):
+        """
+        Returns `(success, return data)` of every call.
+        """
+        results = []
+        for start in range(0, len(calls), self.batch_size):
+            batch = calls[start:start + self.batch_size]
+            data = AGGREGATE3_SELECTOR + eth_abi.encode_abi(
+                ['(address,bool,bytes)[]'],
+                [[(call.target, True, call.calldata) for call in batch]]
+            )
+            returned = self.web3.eth.call({'to': self.address, 'data': '0x' + data.hex()}, block_number)
+            self.eth_calls += 1
+            results.extend(eth_abi.decode_abi(['(bool,bytes)[]'], bytes(returned))[0])
+        return results
+
+    def read(self, calls, block_number=None):
+        """
+        Returns the decoded results of `calls` at `block_number`, the latest block by default.
+        """
+        if block_number is None:
+            block_number = self.web3.eth.block_number
+        now = time.monotonic()
+        self.expire(now)
+
+        missing = list({
+            call.key: call for call in calls if (block_number, call.key) not in self.cache
+        }.values())
+        for call, (success, data) in zip(missing, self.aggregate(missing, block_number)):
+            try:
+                value = call.decode(data) if success else None
+            except DecodingError:
+                value = None
+            self.cache[(block_number, call.key)] = (now, value)
+
+        return [self.cache[(block_number, call.key)][1] for call in calls]
+
+    def snapshot(self, reward_tokens=(), managers=(), ldo_token=ldo_token_address, block_number=None):
+        """
+        Reads `reward_data` of every `(gauge, token)` pair and the status and
+        LDO balance of every manager in one go. Returns a dict with
+        `reward_data` keyed by `(gauge, token)`, `status` and `ldo_balance`
+        keyed by manager.
+        """
+        reward_tokens = [(to_checksum_address(g), to_checksum_address(t)) for g, t in reward_tokens]
+        managers = [to_checksum_address(m) for m in managers]
+        calls = (
+            [reward_data_call(gauge, token) for gauge, token in reward_tokens]
+            + [status_call(manager) for manager in managers]
+            + [balance_of_call(ldo_token, manager) for manager in managers]
+        )
+        results = self.read(calls, block_number)
+
+        statuses = results[len(reward_tokens):len(reward_tokens) + len(managers)]
+        return {
+            'reward_data': dict(zip(reward_tokens, results[:len(reward_tokens)])),
+            'status': dict(zip(managers, statuses)),
+            'ldo_balance': dict(zip(managers, results[len(reward_tokens) + len(managers):])),
+        }
@@ -0,0 +1,54 @@
+from eth_utils import keccak, to_checksum_address
+
+from utils.evm_script import strip_byte_prefix
+
+# Init code of the EIP-1167 proxy deployed by Vyper's `create_forwarder_to`,
+# the implementation address goes in between
+FORWARDER_PREFIX = bytes.fromhex('602d3d8160093d39f3363d3d373d3d3d363d73')
+FORWARDER_SUFFIX = bytes.fromhex('5af43d82803e903d91602b57fd5bf3')
+
+
+def to_bytes32(value):
+    if isinstance(value, int):
+        return value.to_bytes(32, 'big')
+    if isinstance(value, str):
+        value = bytes.fromhex(strip_byte_prefix(value))
+    return bytes(value).rjust(32, b'\x00')
+
+
+def forwarder_init_code(implementation):
+    return FORWARDER_PREFIX + bytes.fromhex(strip_byte_prefix(str(implementation))) + FORWARDER_SUFFIX
+
+
+def create2_address(deployer, salt, init_code):
+    address = keccak(
+        b'\xff'
+        + bytes.fromhex(strip_byte_prefix(str(deployer)))
+        + to_bytes32(salt)
+        + keccak(init_code)
+    )[12:]
+    return to_checksum_address(address)
+
+
+def manager_salt(owner, min_rewards_amount, rewards_contract, salt):
+    """
+    Returns the CREATE2 salt `RewardsManagerFactory.deploy_manager_deterministic`
+    derives from the manager parameters and the caller's salt.
+    """
+    return keccak(
+        to_bytes32(str(owner))
+        + to_bytes32(min_rewards_amount)
+        + to_bytes32(str(rewards_contract))
+        + to_bytes32(salt)
+    )
+
+
+def predict_manager_address(factory, implementation, owner, min_rewards_amount, rewards_contract, salt):
+    """
+    Returns the address `RewardsManagerFactory.deploy_manager_deterministic` deploys to.
+    """
+    return create2_address(
+        factory,
+        manager_salt(owner, min_rewards_amount, rewards_contract, salt),
+        forwarder_init_code(implementation)
+    )
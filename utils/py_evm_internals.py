@@ -0,0 +1,39 @@
+from importlib.metadata import version
+
+from eth import constants
+from eth._utils.address import generate_contract_address
+
+# The private py-evm internals the local EVM and the fuzzer rely on. They change
+# between py-evm releases without notice, so any other version fails on import.
+PY_EVM_VERSION = '0.5.0a3'
+
+if version('py-evm') != PY_EVM_VERSION:
+    raise ImportError(
+        f'utils.local_evm relies on py-evm {PY_EVM_VERSION} internals, {version("py-evm")} is installed, '
+        'check utils/py_evm_internals.py against it before changing the pin'
+    )
+
+
+def set_canonical_head(chaindb, header):
+    """
+    Makes `header` the canonical head, also when it is behind the current one.
+    """
+    chaindb._set_as_canonical_chain_head(chaindb.db, header, constants.GENESIS_PARENT_HASH)
+
+
+def memory_bytes(computation):
+    return bytes(computation._memory._bytes)
+
+
+def stack_values(computation):
+    """
+    Returns the stack bottom first, as `(int or bytes, value)` pairs.
+    """
+    return computation._stack.values
+
+
+def set_block_timestamp(state, timestamp):
+    """
+    Moves the block timestamp seen by transactions applied to `state`, without mining.
+    """
+    state.execution_context._timestamp = timestamp
@@ -0,0 +1,167 @@
+import os
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+# State reads ganache makes against the fork block, plus calls that don't depend on a block
+CACHED_METHODS = {
+    'eth_getStorageAt',
+    'eth_getCode',
+    'eth_getBalance',
+    'eth_getTransactionCount',
+    'eth_getBlockByNumber',
+    'eth_chainId',
+    'net_version',
+}
+UNPINNED_BLOCKS = {'latest', 'pending', 'earliest', 'safe', 'finalized'}
+
+
+def cache_key(method, params):
+    return f'{method}:{json.dumps(params, separators=(",", ":"))}'
+
+
+def is_cacheable(method, params):
+    if method not in CACHED_METHODS:
+        return False
+    return not any([isinstance(param, str) and param in UNPINNED_BLOCKS for param in params])
+
+
+class RpcCache:
+    """
+    Upstream responses pinned to one block, kept in a gzipped JSON file.
+    """
+
+    def __init__(self, path, block=None):
+        self.path = path
+        self.block = block
+        self.responses = {}
+        self.lock = threading.Lock()
+        self.dirty = False
+
+        if os.path.exists(path):
+            with gzip.open(path, 'rt') as f:
+                data = json.load(f)
+            if block is None or data['block'] == block:
+                self.block = data['block']
+                self.responses = data['responses']
+
+    def get(self, key):
+        return self.responses.get(key)
+
+    def put(self, key, result):
+        with self.lock:
+            self.responses[key] = result
+            self.dirty = True
+
+    def save(self):
+        """
+        Writes the responses merged with the ones saved meanwhile by other processes.
+        """
+        if not self.dirty:
+            return
+        with self.lock:
+            responses = dict(self.responses)
+            if os.path.exists(self.path):
+                with gzip.open(self.path, 'rt') as f:
+                    data = json.load(f)
+                if data['block'] == self.block:
+                    responses = {**data['responses'], **responses}
+
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f'{self.path}.{os.getpid()}.tmp'
+            with gzip.open(tmp_path, 'wt') as f:
+                json.dump({'block': self.block, 'responses': responses}, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+
+class CachingRpcProxy:
+    """
+    JSON-RPC server for ganache to fork from. Cacheable requests are answered
+    from `cache` and recorded on a miss, everything else goes to `upstream`.
+    With `offline` misses fail instead of reaching the upstream.
+    """
+
+    def __init__(self, upstream, cache, offline=False, port=0):
+        self.upstream = upstream
+        self.cache = cache
+        self.offline = offline
+        self.session = requests.Session()
+        self.hits = 0
+        self.misses = 0
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def start(self):
+        if self.cache.block is None:
+            if self.offline:
+                raise ValueError(f'{self.cache.path} has no recorded responses')
+            self.cache.block = int(self.forward('eth_blockNumber', [])['result'], 16)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.cache.save()
+
+    def forward(self, method, params):
+        if self.offline:
+            return {'error': {'code': -32000, 'message': f'{method} {params} is not cached'}}
+        payload = {'jsonrpc': '2.0', 'id': 1, 'method': method, 'params': params}
+        return self.session.post(self.upstream, json=payload, timeout=60).json()
+
+    def handle(self, request):
+        method, params = request['method'], request.get('params', [])
+        response = {'jsonrpc': '2.0', 'id': request.get('id')}
+
+        if not is_cacheable(method, params):
+            upstream = self.forward(method, params)
+        else:
+            key = cache_key(method, params)
+            result = self.cache.get(key)
+            if result is not None:
+                self.hits += 1
+                response['result'] = result
+                return response
+
+            self.misses += 1
+            upstream = self.forward(method, params)
+            if 'result' in upstream:
+                self.cache.put(key, upstream['result'])
+
+        if 'error' in upstream:
+            response['error'] = upstream['error']
+        else:
+            response['result'] = upstream['result']
+        return response
+
+    def _handler(self):
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                if isinstance(body, list):
+                    response = [proxy.handle(request) for request in body]
+                else:
+                    response = proxy.handle(body)
+
+                data = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
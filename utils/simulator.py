@@ -0,0 +1,115 @@
+import numpy as np
+
+from utils.keeper import STATUS_OK, STATUS_REWARDS_DISABLED, STATUS_LOW_BALANCE
+
+SECONDS_PER_WEEK = 7 * 24 * 60 * 60
+WEEKS_PER_PERIOD = 4
+
+
+def amounts_dtype(topups, balance):
+    """
+    Returns int64 if no scenario can hold more than fits into it, Python ints
+    (object arrays) otherwise. Either way the integer math is exact.
+
+    Amounts in wei fit into int64 only up to 9.2 LDO, so real schedules run on
+    object arrays: NumPy loops over the scenarios in C but adds, divides and
+    compares every amount as a Python int, these are not vectorized. Keeping
+    amounts as int64 gwei and wei pairs vectorizes the weekly math exactly,
+    but turning the results back into wei costs more than it saves.
+    """
+    totals = np.asarray(balance, dtype=object) + np.sum(topups.astype(object), axis=1)
+    return np.int64 if max(totals, default=0) <= np.iinfo(np.int64).max else object
+
+
+def simulate(
+    topups,
+    min_rewards_amount,
+    balance=0,
+    weekly_amount=0,
+    rewards_iteration=0,
+    start=0,
+    balancer_period_finish=None
+):
+    """
+    Runs `RewardsManager.start_next_rewards_period` for a batch of scenarios,
+    one call a week, the first one at `start`. The gauge period is taken to be
+    finished by every call.
+
+    `topups` is the LDO received before each call, shaped `(scenarios, weeks)`.
+    `balance`, `weekly_amount`, `rewards_iteration` and `balancer_period_finish`
+    (`start` by default) are the state before the first call, scalars or one
+    value per scenario.
+
+    Returns a dict of `(scenarios, weeks)` arrays: `emitted` amounts, `reason`
+    with STATUS_OK for started periods and the STATUS_* code of the revert
+    otherwise, `stalled` flags and the `balance`, `weekly_amount`,
+    `rewards_iteration` and `period_finish` after every call. Amount arrays
+    have the dtype of `amounts_dtype`.
+    """
+    topups = np.atleast_2d(np.asarray(topups, dtype=object))
+    scenarios, weeks = topups.shape
+    dtype = amounts_dtype(topups, balance)
+    topups = topups.astype(dtype)
+
+    balance = np.broadcast_to(np.asarray(balance, dtype=object), (scenarios,)).astype(dtype)
+    weekly_amount = np.broadcast_to(np.asarray(weekly_amount, dtype=object), (scenarios,)).astype(dtype)
+    iteration = np.broadcast_to(np.asarray(rewards_iteration), (scenarios,)).astype(np.int64)
+    if balancer_period_finish is None:
+        balancer_period_finish = start
+    balancer_period_finish = np.broadcast_to(np.asarray(balancer_period_finish), (scenarios,)).astype(np.int64)
+
+    result = {
+        'emitted': np.zeros((scenarios, weeks), dtype=dtype),
+        'reason': np.zeros((scenarios, weeks), dtype=np.int64),
+        'balance': np.zeros((scenarios, weeks), dtype=dtype),
+        'weekly_amount': np.zeros((scenarios, weeks), dtype=dtype),
+        'rewards_iteration': np.zeros((scenarios, weeks), dtype=np.int64),
+        'period_finish': np.zeros((scenarios, weeks), dtype=np.int64),
+    }
+
+    for week in range(weeks):
+        balance = balance + topups[:, week]
+
+        # Same checks in the same order as the contract
+        recalculate = iteration == 0
+        amount = np.where(recalculate, balance // WEEKS_PER_PERIOD, weekly_amount)
+        reason = np.full(scenarios, STATUS_OK, dtype=np.int64)
+        reason[recalculate & (balance < min_rewards_amount)] = STATUS_LOW_BALANCE
+        reason[(reason == STATUS_OK) & (amount == 0)] = STATUS_REWARDS_DISABLED
+        reason[(reason == STATUS_OK) & (balance < amount)] = STATUS_LOW_BALANCE
+        started = reason == STATUS_OK
+
+        emitted = np.where(started, amount, 0).astype(dtype)
+        balance = balance - emitted
+        weekly_amount = np.where(started, amount, weekly_amount).astype(dtype)
+        iteration = np.where(started, (iteration + 1) % WEEKS_PER_PERIOD, iteration)
+        balancer_period_finish = np.where(
+            started, start + week * SECONDS_PER_WEEK + SECONDS_PER_WEEK, balancer_period_finish
+        )
+
+        result['emitted'][:, week] = emitted
+        result['reason'][:, week] = reason
+        result['balance'][:, week] = balance
+        result['weekly_amount'][:, week] = weekly_amount
+        result['rewards_iteration'][:, week] = iteration
+        result['period_finish'][:, week] = balancer_period_finish + \
+            ((WEEKS_PER_PERIOD - iteration) % WEEKS_PER_PERIOD) * SECONDS_PER_WEEK
+
+    result['stalled'] = result['reason'] != STATUS_OK
+    return result
+
+
+def delayed_topups(amount, every, weeks, max_delay, scenarios, seed=0):
+    """
+    Returns `(scenarios, weeks)` top-ups of `amount` due every `every` weeks,
+    each arriving a random 0 to `max_delay` weeks late.
+    """
+    rng = np.random.default_rng(seed)
+    due = np.arange(0, weeks, every)
+    arrival = due + rng.integers(0, max_delay + 1, size=(scenarios, len(due)))
+
+    topups = np.zeros((scenarios, weeks), dtype=object)
+    for index in range(len(due)):
+        rows = np.flatnonzero(arrival[:, index] < weeks)
+        topups[rows, arrival[rows, index]] += amount
+    return topups
@@ -1,14 +1,131 @@
-from utils.evm_script import encode_call_script, EMPTY_CALLSCRIPT
-from utils.config import ldo_token_address
+from utils.evm_script import encode_call_script, strip_byte_prefix, EMPTY_CALLSCRIPT
+from utils.config import ldo_token_address, lido_dao_agent_address, lido_dao_voting_address
 
 
 def create_vote(voting, token_manager, vote_desc, evm_script, tx_params):
+    from utils.abi_registry import encode_call
+
+    evm_script = evm_script if evm_script is not None else EMPTY_CALLSCRIPT
     new_vote_script = encode_call_script([
         (voting.address,
-         voting.newVote.encode_input(
-             evm_script if evm_script is not None else EMPTY_CALLSCRIPT,
-             vote_desc, False, False))
+         encode_call('Voting', 'newVote', [bytes.fromhex(strip_byte_prefix(evm_script)), vote_desc, False, False]))
     ])
     tx = token_manager.forward(new_vote_script, tx_params)
     vote_id = tx.events['StartVote']['voteId']
-    return (vote_id, tx)
\ No newline at end of file
+    return (vote_id, tx)
+
+
+def encode_calldata(signature, types, args):
+    from utils.abi_registry import get_registry
+
+    return get_registry().encode_signature(signature, types, args)
+
+
+def _address(contract):
+    return str(getattr(contract, 'address', contract)).lower()
+
+
+class VoteBuilder:
+    """
+    Collects manager operations for a single Aragon vote.
+
+    Actions run as the Agent by default, they are all packed into one
+    `Agent.forward` call (or `Agent.execute` if there is only one). Pass
+    `agent=None` to have the Voting call the targets itself. Repeated
+    actions are added only once.
+    """
+
+    def __init__(self, agent=lido_dao_agent_address, ldo_token=ldo_token_address):
+        self.agent = agent
+        self.ldo_token = ldo_token
+        self.actions = []
+
+    def __len__(self):
+        return len(self.actions)
+
+    def add(self, to, calldata):
+        action = (_address(to), calldata.lower())
+        if action not in self.actions:
+            self.actions.append(action)
+        return self
+
+    def transfer_ldo(self, to, amount):
+        return self.add(
+            self.ldo_token,
+            encode_calldata('transfer(address,uint256)', ['address', 'uint256'], [_address(to), amount])
+        )
+
+    def set_rewards_contract(self, manager, rewards_contract):
+        return self.add(
+            manager,
+            encode_calldata('set_rewards_contract(address)', ['address'], [_address(rewards_contract)])
+        )
+
+    def replace_me_by_other_distributor(self, manager, to):
+        return self.add(
+            manager,
+            encode_calldata('replace_me_by_other_distributor(address)', ['address'], [_address(to)])
+        )
+
+    def recover_erc20(self, manager, token, amount, recipient):
+        return self.add(
+            manager,
+            encode_calldata(
+                'recover_erc20(address,uint256,address)',
+                ['address', 'uint256', 'address'],
+                [_address(token), amount, _address(recipient)]
+            )
+        )
+
+    def recover_erc20_batch(self, manager, items):
+        """
+        Adds one `recover_erc20_batch` call for up to 16 `(token, amount, recipient)` items.
+        """
+        if len(items) > 16:
+            raise ValueError(f'vote builder: recover_erc20_batch takes up to 16 items, got {len(items)}')
+        items = [(_address(t), a, _address(r)) for t, a, r in items]
+        items += [('0x' + '00' * 20, 0, '0x' + '00' * 20)] * (16 - len(items))
+        return self.add(
+            manager,
+            encode_calldata(
+                'recover_erc20_batch(address[16],uint256[16],address[16])',
+                ['address[16]', 'uint256[16]', 'address[16]'],
+                [list(column) for column in zip(*items)]
+            )
+        )
+
+    def calls(self):
+        """
+        Returns the `(to, calldata)` pairs of the vote script.
+        """
+        if self.agent is None or not self.actions:
+            return list(self.actions)
+
+        from utils.abi_registry import encode_call
+
+        agent = _address(self.agent)
+        if len(self.actions) == 1:
+            to, calldata = self.actions[0]
+            return [(agent, encode_call('Agent', 'execute', [to, 0, bytes.fromhex(calldata[2:])]))]
+
+        script = bytes.fromhex(encode_call_script(self.actions)[2:])
+        return [(agent, encode_call('Agent', 'forward', [script]))]
+
+    def build(self):
+        return encode_call_script(self.calls())
+
+    def estimate_gas(self, web3, sender=lido_dao_voting_address):
+        """
+        Simulates every call of the script from `sender` against the node
+        behind `web3` and returns the total gas. The calls are simulated one
+        by one on the current state, and the Voting's own overhead of running
+        the script is not included.
+        """
+        sender = web3.toChecksumAddress(_address(sender))
+        return sum(
+            web3.eth.estimate_gas({'from': sender, 'to': web3.toChecksumAddress(to), 'data': calldata})
+            for to, calldata in self.calls()
+        )
+
+    def create_vote(self, voting, token_manager, vote_desc, tx_params):
+        return create_vote(voting, token_manager, vote_desc, self.build(), tx_params)